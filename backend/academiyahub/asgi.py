@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'academiyahub.settings')
 
 application = get_asgi_application()
+
+# Warm URLs, serializers and the database backend before serving (settings.WARMUP, core/warmup.py)
+from core.warmup import run_on_startup  # noqa: E402
+
+run_on_startup()
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import importlib.util
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -30,6 +32,7 @@ ALLOWED_HOSTS = []
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
 ]
+CORS_EXPOSE_HEADERS = ['X-Sync-Watermark']  # delta sync (core/sync.py)
 # Application definition
 
 INSTALLED_APPS = [
@@ -60,6 +63,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ProfilerMiddleware',
+    'core.middleware.SlowQueryMiddleware',
+    'core.middleware.MetricsMiddleware',
 ]
 
 AUTH_USER_MODEL = 'users.User'
@@ -120,6 +126,11 @@ REST_FRAMEWORK = {
 'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson instead of the stdlib encoder; MessagePack when installed (core/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ] + (['core.renderers.MessagePackRenderer'] if importlib.util.find_spec('msgpack') else []),
 }
 
 
@@ -136,7 +147,16 @@ USE_TZ = True
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend' 
+# Console in development; set EMAIL_BACKEND=django.core.mail.backends.smtp.EmailBackend
+# (plus EMAIL_HOST/EMAIL_PORT, e.g. a local aiosmtpd on 8025) to deliver the outbox
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS') == '1'
+EMAIL_TIMEOUT = 10
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'ACADEMIYA <no-reply@academiya.ma>')
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
@@ -152,9 +172,126 @@ SPECTACULAR_SETTINGS = {
     'SERVE_INCLUDE_SCHEMA': False,
     'COMPONENT_SPLIT_REQUEST': True,
 }
+
+# Worker warm-up before serving traffic (core/warmup.py, called from wsgi.py/asgi.py)
+WARMUP = {
+    'ENABLED': os.getenv('WARMUP', '1') == '1',
+    'PRELOAD': (),  # e.g. ('core.deliberation',) to import numpy before the first deliberation
+}
+
+# Delta sync ?updated_since= on the core list endpoints (core/sync.py)
+SYNC = {
+    'OVERLAP_SECONDS': 5,   # rows this close to the watermark are sent again
+    'TOMBSTONE_DAYS': 90,   # older watermarks get 410 (full resync); prune_tombstones job
+}
+
+# Academic-year archival (python manage.py archive_year, core/archive.py)
+ARCHIVE = {
+    'KEEP_YEARS': 2,   # most recent years never archived without --force
+}
+
+# Change feed for downstream consumers /api/changes/ (core/changefeed.py)
+CHANGE_FEED = {
+    'PAGE_SIZE': 100,
+    'MAX_PAGE_SIZE': 1000,
+    'RETENTION_DAYS': 30,    # prune_change_events keeps unread events regardless
+}
+
+# One-request page load /api/bootstrap/ (core/bootstrap.py)
+BOOTSTRAP = {
+    'DASHBOARD_TTL': 30,  # seconds the dashboard/performance sections are cached
+}
+
+# Grade distributions /api/notes/distribution/ (core/distributions.py)
+DISTRIBUTIONS = {
+    'BUCKET_WIDTH': 1,                   # points per histogram bucket (divides 20)
+    'PERCENTILES': (10, 25, 50, 75, 90),
+    'CACHE_TTL': 600,                    # seconds; checked against a COUNT/MAX(updated_at) fingerprint
+}
+
+# Bulk student provisioning (python manage.py import_students, core/student_import.py)
+STUDENT_IMPORT = {
+    'BATCH_SIZE': 500,       # accounts per bulk INSERT
+    'HASH_WORKERS': None,    # password hashing processes; None = one per CPU
+    'PASSWORD_LENGTH': 10,   # generated temporary passwords
+}
+
+# Prebuilt schema served by /api/schema/ (core/openapi.py)
+OPENAPI_SCHEMA = {
+    'DIR': BASE_DIR / 'openapi',
+    'CODE_VERSION': os.getenv('CODE_VERSION', ''),  # e.g. git commit; empty = digest of the API sources
+}
 from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),  # <--- Must match your api.js "Bearer ${token}"
-}
\ No newline at end of file
+}
+
+# ============================================
+# METRICS (Prometheus /metrics endpoint)
+# ============================================
+# Shared directory used to aggregate samples across worker processes.
+# Leave unset for a single-process server (runserver).
+METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR')
+METRICS_FLUSH_INTERVAL = 1.0  # seconds between per-worker dumps
+# Who may scrape /metrics: these addresses/networks, or "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_ALLOWED_IPS = [
+    ip.strip() for ip in os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()
+]
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# ============================================
+# SLOW QUERY LOG (browse with: manage.py slow_queries)
+# ============================================
+SLOW_QUERY_LOG = {
+    'ENABLED': os.environ.get('SLOW_QUERY_LOG') == '1',
+    'THRESHOLD_MS': int(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100)),
+    'CAPTURE_EXPLAIN': True,
+}
+
+# ============================================
+# REQUEST PROFILER (admin only: ?_profile=1 or header X-Profile: 1)
+# ============================================
+PROFILER = {
+    # PROFILER=1 / PROFILER=0 in the environment, defaults to DEBUG
+    'ENABLED': os.environ.get('PROFILER', '1' if DEBUG else '0') == '1',
+    'INTERVAL_MS': 2,
+    'OUTPUT_DIR': BASE_DIR / 'profiles',
+}
+
+# ============================================
+# TRANSCRIPTS (cached coefficient-weighted averages)
+# ============================================
+TRANSCRIPT_CACHE_TIMEOUT = 24 * 3600  # seconds; entries checked against a fingerprint of the student's notes
+
+# ============================================
+# PUSHED EVENTS (Server-Sent Events on /api/events/)
+# ============================================
+# InProcessBroker reaches clients of the same process: serve with a single
+# ASGI worker (e.g. uvicorn academiyahub.asgi:application) or plug a shared broker.
+EVENTS = {
+    'BROKER': 'core.events.InProcessBroker',
+    'HEARTBEAT_SECONDS': 15,
+    'QUEUE_SIZE': 100,
+}
+
+# ============================================
+# EMAIL OUTBOX (delivered by: manage.py send_emails)
+# ============================================
+EMAIL_QUEUE = {
+    'BATCH_SIZE': 100,           # emails sent per SMTP connection
+    'MAX_ATTEMPTS': 6,
+    'BACKOFF_SECONDS': 60,       # 1 min, 2 min, 4 min... between attempts
+    'MAX_BACKOFF_SECONDS': 3600,
+    'LEASE_SECONDS': 300,        # SENDING rows of a dead worker are retried after this
+}
+
+# Background jobs (python manage.py run_jobs)
+JOBS = {
+    'WORKERS': int(os.getenv('JOB_WORKERS', '2')),
+    'POLL_SECONDS': 2,
+    'HEARTBEAT_SECONDS': 10,
+    'STALE_SECONDS': 60,         # RUNNING jobs without heartbeat for this long are marked FAILED
+    'OUTPUT_DIR': BASE_DIR / 'job_outputs',
+}
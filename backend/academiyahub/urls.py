@@ -20,7 +20,8 @@ from users.views import RegisterView, MyTokenObtainPairView, login_view
 from rest_framework_simplejwt.views import TokenRefreshView
 from django.conf import settings
 from django.conf.urls.static import static
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView  # ← ADD THIS
+from drf_spectacular.views import SpectacularSwaggerView
+from core.views import metrics_view, schema_view
 
 
 urlpatterns = [
@@ -35,6 +36,10 @@ urlpatterns = [
     path('api/', include('core.urls')),
 
     # API Documentation (Swagger) - ADD THESE 3 LINES
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    # Schema prebuilt once per code version (python manage.py build_openapi_schema)
+    path('api/schema/', schema_view, name='schema'),
     path('api/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+
+    # Monitoring (Prometheus)
+    path('metrics', metrics_view, name='metrics'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'academiyahub.settings')
 
 application = get_wsgi_application()
+
+# Warm URLs, serializers and the database backend before serving (settings.WARMUP, core/warmup.py)
+from core.warmup import run_on_startup  # noqa: E402
+
+run_on_startup()
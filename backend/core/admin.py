@@ -1,6 +1,8 @@
 # In core/admin.py - Make it usable:
 from django.contrib import admin
-from .models import Departement, Filiere, Module, Inscription, Note
+from django.utils import timezone
+from . import audit, jobs
+from .models import Departement, Filiere, Module, Inscription, Note, SlowQuery, Deliberation, NoteAudit, OutboundEmail, Job, JobSchedule, ArchivedYear, ChangeEvent, ChangeFeedConsumer
 
 @admin.register(Departement)
 class DepartementAdmin(admin.ModelAdmin):
@@ -16,7 +18,7 @@ class FiliereAdmin(admin.ModelAdmin):
 class InscriptionAdmin(admin.ModelAdmin):
     list_display = ['student', 'filiere', 'status', 'created_at']
     list_filter = ['status', 'filiere__departement']
-    search_fields = ['student__username', 'student__email']
+    search_fields = ['student__username', 'student__email', 'student__cne']
 
 
 
@@ -62,4 +64,115 @@ class NoteAdmin(admin.ModelAdmin):
         ('Gouvernance', {
             'fields': ('saisie_par', 'created_at', 'updated_at')
         }),
-    )
\ No newline at end of file
+    )
+    
+    def save_model(self, request, obj, form, change):
+        # Audit log: attribute admin edits to the logged-in user
+        with audit.capture(request.user):
+            super().save_model(request, obj, form, change)
+    
+    def delete_model(self, request, obj):
+        with audit.capture(request.user):
+            super().delete_model(request, obj)
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ['view', 'action', 'calls', 'total_time_ms', 'max_time_ms', 'last_seen']
+    list_filter = ['view']
+    search_fields = ['normalized_sql', 'view']
+    readonly_fields = [f.name for f in SlowQuery._meta.fields]
+
+
+@admin.register(Deliberation)
+class DeliberationAdmin(admin.ModelAdmin):
+    list_display = ['filiere', 'semestre', 'academic_year', 'student_count', 'admitted_count', 'class_average', 'created_at']
+    list_filter = ['academic_year', 'semestre', 'filiere__departement']
+
+
+@admin.register(NoteAudit)
+class NoteAuditAdmin(admin.ModelAdmin):
+    list_display = ['note_id', 'action', 'source', 'actor_id', 'old_controle', 'new_controle', 'old_examen', 'new_examen', 'created_at']
+    list_filter = ['action', 'source']
+    search_fields = ['=note_id', '=actor_id']
+    readonly_fields = [f.name for f in NoteAudit._meta.fields]
+    
+    # Append-only
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['to_email', 'subject', 'kind', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'kind']
+    search_fields = ['to_email', 'subject']
+    readonly_fields = ['created_at', 'sent_at', 'lock_token', 'locked_at', 'last_error']
+    actions = ['retry_now']
+    
+    @admin.action(description="Renvoyer maintenant")
+    def retry_now(self, request, queryset):
+        count = queryset.exclude(status='SENT').update(
+            status='PENDING', attempts=0, next_attempt_at=timezone.now(), lock_token='', locked_at=None
+        )
+        self.message_user(request, f"{count} email(s) reprogrammé(s).")
+
+
+@admin.register(JobSchedule)
+class JobScheduleAdmin(admin.ModelAdmin):
+    list_display = ['name', 'task', 'interval_minutes', 'next_run_at', 'enabled']
+    list_filter = ['enabled', 'task']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'task', 'status', 'progress', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'task']
+    readonly_fields = [
+        'status', 'progress', 'progress_message', 'result', 'error', 'cancel_requested',
+        'created_by', 'schedule', 'worker', 'heartbeat_at', 'created_at', 'started_at', 'finished_at'
+    ]
+    actions = ['cancel_jobs']
+    
+    @admin.action(description="Annuler")
+    def cancel_jobs(self, request, queryset):
+        for job in queryset.filter(status__in=Job.ACTIVE_STATUSES):
+            jobs.cancel(job)
+        self.message_user(request, "Annulation demandée.")
+
+
+@admin.register(ArchivedYear)
+class ArchivedYearAdmin(admin.ModelAdmin):
+    list_display = ['academic_year', 'archived_at', 'archived_by', 'inscriptions_count', 'notes_count']
+    readonly_fields = [f.name for f in ArchivedYear._meta.fields]
+    
+    # Archive/restore only through `manage.py archive_year` (rows must move with the year)
+    def has_add_permission(self, request):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ChangeEvent)
+class ChangeEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'position', 'topic', 'object_id', 'departement_id', 'created_at']
+    list_filter = ['topic']
+    search_fields = ['=object_id']
+    readonly_fields = [f.name for f in ChangeEvent._meta.fields]
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ChangeFeedConsumer)
+class ChangeFeedConsumerAdmin(admin.ModelAdmin):
+    list_display = ['name', 'owner', 'position', 'updated_at']
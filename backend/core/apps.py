@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects signal receivers)
+        from . import tasks  # noqa: F401  (registers background job tasks)
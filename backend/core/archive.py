@@ -0,0 +1,131 @@
+"""
+Academic-year archival: closed years move out of the hot tables
+
+    python manage.py archive_year 2021-2022              # Inscription/Note -> ArchivedInscription/ArchivedNote
+    python manage.py archive_year 2021-2022 --restore    # and back
+
+Rows keep their ids and every column; each table is moved with one
+INSERT ... SELECT + DELETE inside a transaction. The hot-table DELETE is
+a raw delete: archiving is not a user deletion, so no audit entry,
+leaderboard update or pushed event. Delta-sync clients get tombstones (the
+rows left the live lists); restored rows get a new updated_at so they show
+up in the next delta.
+
+Archived years stay readable (read-only) through /api/archives/ and in
+transcripts. The ARCHIVE['KEEP_YEARS'] most recent academic years cannot
+be archived, and writes to an archived year are refused (is_archived()).
+"""
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from . import transcripts
+from .models import ArchivedInscription, ArchivedNote, ArchivedYear, Inscription, Note, Tombstone
+
+
+DEFAULTS = {
+    'KEEP_YEARS': 2,   # most recent academic years always kept in the hot tables
+}
+
+# (hot model, archive model)
+TABLES = [(Note, ArchivedNote), (Inscription, ArchivedInscription)]
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'ARCHIVE', {})}
+
+
+def is_archived(academic_year):
+    return ArchivedYear.objects.filter(academic_year=academic_year).exists()
+
+
+def hot_years():
+    """Academic years present in the hot tables, most recent first"""
+    years = set(Inscription.objects.values_list('academic_year', flat=True).distinct().order_by())
+    years |= set(Note.objects.values_list('academic_year', flat=True).distinct().order_by())
+    return sorted(years, reverse=True)
+
+
+def _move(source, target, academic_year, extra=None):
+    """INSERT INTO target SELECT ... FROM source WHERE academic_year = %s; returns rows moved"""
+    columns = [field.column for field in source._meta.concrete_fields]
+    quote = connection.ops.quote_name
+    select = [quote(column) for column in columns]
+    params = []
+    for column, value in (extra or {}).items():
+        select[columns.index(column)] = '%s'
+        params.append(value)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(target._meta.db_table)} ({', '.join(map(quote, columns))}) "
+            f"SELECT {', '.join(select)} FROM {quote(source._meta.db_table)} WHERE {quote('academic_year')} = %s",
+            params + [academic_year],
+        )
+        cursor.execute(
+            f"DELETE FROM {quote(source._meta.db_table)} WHERE {quote('academic_year')} = %s",
+            [academic_year],
+        )
+        return cursor.rowcount
+
+
+def archive_year(academic_year, user=None, force=False):
+    """Move one academic year to the archive tables; returns the ArchivedYear"""
+    if is_archived(academic_year):
+        raise ArchiveError(f"L'année {academic_year} est déjà archivée.")
+    years = hot_years()
+    if academic_year not in years:
+        raise ArchiveError(f"Aucune inscription ni note pour l'année {academic_year}.")
+    recent = years[:get_config()['KEEP_YEARS']]
+    if academic_year in recent and not force:
+        raise ArchiveError(
+            f"L'année {academic_year} fait partie des {len(recent)} années en cours ({', '.join(recent)})."
+        )
+    if not force and Inscription.objects.filter(academic_year=academic_year, status='PENDING').exists():
+        raise ArchiveError(f"L'année {academic_year} a encore des inscriptions en attente.")
+
+    with transaction.atomic():
+        now = timezone.now()
+        student_ids = set(Note.objects.filter(academic_year=academic_year).values_list('student_id', flat=True).order_by())
+        tombstones = [
+            Tombstone(model=model._meta.model_name, object_id=pk, student_id=student_id, deleted_at=now)
+            for model, _ in TABLES
+            for pk, student_id in model.objects.filter(academic_year=academic_year).values_list('id', 'student_id').order_by()
+        ]
+        counts = {model: _move(model, target, academic_year) for model, target in TABLES}
+        Tombstone.objects.bulk_create(tombstones, batch_size=1000)
+        archived = ArchivedYear.objects.create(
+            academic_year=academic_year,
+            archived_by=user,
+            inscriptions_count=counts[Inscription],
+            notes_count=counts[Note],
+        )
+    transcripts.invalidate_students(student_ids)
+    return archived
+
+
+def restore_year(academic_year):
+    """Move an archived year back to the hot tables; returns {model_name: rows}"""
+    try:
+        archived = ArchivedYear.objects.get(academic_year=academic_year)
+    except ArchivedYear.DoesNotExist:
+        raise ArchiveError(f"L'année {academic_year} n'est pas archivée.")
+
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    student_ids = set(ArchivedNote.objects.filter(academic_year=academic_year).values_list('student_id', flat=True).order_by())
+    try:
+        with transaction.atomic():
+            # Reverse order of archive_year: Inscription first
+            counts = {
+                model._meta.model_name: _move(target, model, academic_year, extra={'updated_at': now})
+                for model, target in reversed(TABLES)
+            }
+            archived.delete()
+    except IntegrityError as e:
+        # e.g. rows written for this year in the hot tables since the archival
+        raise ArchiveError(f"Restauration impossible de l'année {academic_year}: {e}")
+    transcripts.invalidate_students(student_ids)
+    return counts
@@ -0,0 +1,106 @@
+"""
+Append-only grade audit log (NoteAudit)
+
+Every write path records old/new grades, actor and timestamp:
+    - Note.save() / delete()          -> signals (core/signals.py)
+    - bulk_update_grades              -> signals, buffered by capture(batch=True)
+    - set-based writes (grade import) -> record_many()
+
+The actor and source of ORM writes come from the innermost capture() block,
+falling back to Note.saisie_par. Inside capture(batch=True) entries are kept
+in memory and written with one bulk INSERT when the block exits, so the
+audit costs no extra query per grade.
+"""
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.utils import timezone
+
+from .models import NoteAudit
+
+
+_local = threading.local()
+
+_UNSET = object()
+
+
+def encode(value):
+    """Grade -> hundredths of a point (12.5 -> 1250)"""
+    if value is None:
+        return None
+    return int((Decimal(str(value)) * 100).to_integral_value())
+
+
+def decode(value):
+    return None if value is None else float(Decimal(value) / 100)
+
+
+def _context():
+    return getattr(_local, 'context', None)
+
+
+@contextmanager
+def capture(actor=None, source=NoteAudit.SOURCE_OTHER, batch=False):
+    """Attribute the Note writes of the block to `actor`; batch=True buffers the inserts"""
+    previous = _context()
+    context = {
+        'actor_id': getattr(actor, 'pk', actor),
+        'source': source,
+        'buffer': [] if batch else None,
+    }
+    _local.context = context
+    try:
+        yield
+        if context['buffer']:
+            record_many(context['buffer'])
+    finally:
+        _local.context = previous
+
+
+def entry(note_id, action, old=(None, None), new=(None, None), actor_id=None, source=NoteAudit.SOURCE_OTHER, when=None):
+    """Unsaved NoteAudit row; old/new are (note_controle, note_examen) pairs"""
+    return NoteAudit(
+        note_id=note_id,
+        actor_id=actor_id,
+        action=action,
+        source=source,
+        old_controle=encode(old[0]),
+        old_examen=encode(old[1]),
+        new_controle=encode(new[0]),
+        new_examen=encode(new[1]),
+        created_at=when or timezone.now(),
+    )
+
+
+def record_many(entries, batch_size=1000):
+    NoteAudit.objects.bulk_create(entries, batch_size=batch_size)
+
+
+def record_note(note, action):
+    """Audit one ORM write of `note` (called by the Note signals)"""
+    current = (note.note_controle, note.note_examen)
+    if action == NoteAudit.ACTION_DELETE:
+        old, new = current, (None, None)
+    elif action == NoteAudit.ACTION_CREATE:
+        old, new = (None, None), current
+    else:
+        old = getattr(note, '_audit_snapshot', _UNSET)
+        if old is _UNSET:
+            old = (None, None)
+        new = current
+        if encode(old[0]) == encode(new[0]) and encode(old[1]) == encode(new[1]):
+            return  # grades untouched
+    note._audit_snapshot = new
+
+    context = _context()
+    actor_id = context['actor_id'] if context and context['actor_id'] else note.saisie_par_id
+    row = entry(
+        note.pk, action, old, new,
+        actor_id=actor_id,
+        source=context['source'] if context else NoteAudit.SOURCE_OTHER,
+    )
+    if context and context['buffer'] is not None:
+        context['buffer'].append(row)
+    else:
+        row.save()
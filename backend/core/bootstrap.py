@@ -0,0 +1,265 @@
+"""
+Page bootstrap: everything a page needs on load, in one request
+
+    GET /api/bootstrap/                       -> every section of the user's role
+    GET /api/bootstrap/?include=dashboard,filieres
+
+Sections per role (SECTIONS):
+    ETUDIANT    inscriptions, notes, transcript, filieres
+    ENSEIGNANT  modules, filieres
+    ADMIN       dashboard, pending_inscriptions, modules, departements, filieres
+    DIRECTION   dashboard, performance, departements, filieres
+
+Scoping is computed once per request (Scope) and shared by the sections.
+Reference data (departements, filieres) is cached with a generation key
+bumped by the Departement/Filiere signals; the dashboard and performance
+payloads are cached for BOOTSTRAP['DASHBOARD_TTL'] seconds. The
+/api/admin/dashboard/ and /api/admin/performance/ views use the same
+builders, uncached.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from users.models import User
+
+from . import projections, transcripts
+from .models import Departement, EnrollmentRollup, Filiere, Inscription, LeaderboardEntry, Module, Note
+
+
+DEFAULTS = {
+    'DASHBOARD_TTL': 30,   # seconds; 0 = computed on every bootstrap
+}
+
+SECTIONS = {
+    'ETUDIANT': ('inscriptions', 'notes', 'transcript', 'filieres'),
+    'ENSEIGNANT': ('modules', 'filieres'),
+    'ADMIN': ('dashboard', 'pending_inscriptions', 'modules', 'departements', 'filieres'),
+    'DIRECTION': ('dashboard', 'performance', 'departements', 'filieres'),
+}
+
+_GENERATION_KEY = 'bootstrap:reference:generation'
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'BOOTSTRAP', {})}
+
+
+# ============================================
+# PAYLOAD BUILDERS (shared with the dashboard views)
+# ============================================
+def dashboard():
+    """KPI cards, monthly enrollment trend and distribution per department"""
+    total_students = User.objects.filter(role='ETUDIANT').count()
+    counts = Inscription.objects.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='PENDING')),
+        validated=Count('id', filter=Q(status='VALIDATED')),
+    )
+
+    # Taux de remplissage: inscriptions validées / capacité totale des filières
+    total_capacity = Filiere.objects.aggregate(Sum('capacity'))['capacity__sum'] or 1
+    active_students = counts['validated']
+    occupancy_rate = round((active_students / total_capacity) * 100, 1) if total_capacity > 0 else 0
+
+    # Taux d'admission (sélectivité)
+    admission_rate = round((active_students / (counts['total'] or 1)) * 100, 1)
+
+    kpi_data = [
+        {"label": "Total Étudiants", "value": total_students, "icon": "Users", "color": "blue"},
+        {"label": "Dossiers en Attente", "value": counts['pending'], "icon": "Clock", "color": "amber"},
+        {"label": "Taux de Remplissage", "value": f"{occupancy_rate}%", "icon": "Maximize", "color": "emerald"},
+        {"label": "Taux d'Admission", "value": f"{admission_rate}%", "icon": "Filter", "color": "purple"},
+    ]
+
+    # Tendance mensuelle lue depuis la table de rollup (pas de TruncMonth par inscription)
+    trends_query = EnrollmentRollup.objects.annotate(month=TruncMonth('date')).values('month').annotate(count=Sum('validated_count')).filter(count__gt=0).order_by('month')
+    enrollment_trends = [{"name": item['month'].strftime('%b'), "count": item['count']} for item in trends_query if item['month']]
+
+    dept_query = Inscription.objects.filter(status='VALIDATED').values('filiere__departement__name').annotate(value=Count('id')).order_by()
+    department_dist = [{"name": item['filiere__departement__name'], "value": item['value']} for item in dept_query]
+
+    return {
+        "kpi": kpi_data,
+        "enrollment_trends": enrollment_trends,
+        "department_dist": department_dist,
+    }
+
+
+def performance():
+    """School average, success rate, average per filiere and top 5 students"""
+    # Moyennes pondérées par le coefficient du module: Σ(note × coef) / Σ(coef)
+    graded = Note.objects.filter(note_finale__isnull=False)
+    weighted = {
+        'weighted_sum': Sum(F('note_finale') * F('module__coefficient')),
+        'weights': Sum('module__coefficient'),
+    }
+
+    totals = graded.aggregate(**weighted)
+    global_avg = (totals['weighted_sum'] / totals['weights']) if totals['weights'] else 0
+
+    # Taux de réussite (notes >= 10)
+    counts = Note.objects.aggregate(total=Count('id'), passing=Count('id', filter=Q(note_finale__gte=10)))
+    success_rate = round((counts['passing'] / (counts['total'] or 1)) * 100, 1)
+
+    perf_by_filiere = graded.values('module__filiere__name').annotate(**weighted).order_by()
+    chart_data = sorted(
+        [
+            {"name": item['module__filiere__name'], "value": round(item['weighted_sum'] / item['weights'], 2)}
+            for item in perf_by_filiere if item['module__filiere__name'] and item['weights']
+        ],
+        key=lambda item: -item['value']
+    )
+
+    # Majors de promo, lus depuis le leaderboard (index sur la moyenne)
+    top_students = LeaderboardEntry.objects.select_related('student', 'filiere').order_by('-average')[:5]
+    top_list = [
+        {
+            "name": f"{s.student.last_name.upper()} {s.student.first_name}",
+            "filiere": s.filiere.name,
+            "average": round(s.average, 2)
+        }
+        for s in top_students
+    ]
+
+    return {
+        "global_average": round(global_avg, 2),
+        "success_rate": success_rate,
+        "chart_data": chart_data,
+        "top_students": top_list,
+    }
+
+
+def teacher_modules(user):
+    """Modules taught by `user` with their number of validated students"""
+    modules = (
+        Module.objects.filter(enseignant=user)
+        .annotate(student_count=Count('filiere__inscriptions', filter=Q(filiere__inscriptions__status='VALIDATED')))
+        .values('id', 'name', 'code', 'filiere__name', 'semestre', 'student_count')
+    )
+    return [
+        {
+            'id': module['id'],
+            'name': module['name'],
+            'code': module['code'],
+            'filiere': module['filiere__name'],
+            'semestre': module['semestre'],
+            'student_count': module['student_count'],
+        }
+        for module in modules
+    ]
+
+
+# ============================================
+# CACHED DATA
+# ============================================
+def _reference_key():
+    generation = cache.get_or_set(_GENERATION_KEY, 1, None)
+    return f'bootstrap:reference:{generation}'
+
+
+def invalidate_reference():
+    """Departement/Filiere changes: bump the key generation (O(1))"""
+    try:
+        cache.incr(_GENERATION_KEY)
+    except ValueError:
+        cache.set(_GENERATION_KEY, 2, None)
+
+
+def reference_data():
+    """{'departements': [...], 'filieres': [...]}, rows of the list endpoints"""
+    from .serializers import DepartementSerializer, FiliereListSerializer
+
+    key = _reference_key()
+    data = cache.get(key)
+    if data is None:
+        departements = Departement.objects.select_related('manager').prefetch_related('filieres')
+        filieres = list(Filiere.objects.select_related('departement'))
+        rows = FiliereListSerializer(filieres, many=True).data
+        data = {
+            'departements': list(DepartementSerializer(departements, many=True).data),
+            # + departement id, used to scope the list of an ADMIN
+            'filieres': [{**row, 'departement': f.departement_id} for row, f in zip(rows, filieres)],
+        }
+        cache.set(key, data, None)
+    return data
+
+
+def _cached(name, builder):
+    ttl = get_config()['DASHBOARD_TTL']
+    if not ttl:
+        return builder()
+    return cache.get_or_set(f'bootstrap:{name}', builder, ttl)
+
+
+# ============================================
+# ASSEMBLY
+# ============================================
+class Scope:
+    """Per-request scoping, resolved once and shared by every section"""
+    def __init__(self, user):
+        self.user = user
+        self._department_ids = None
+
+    @property
+    def department_ids(self):
+        """Departments managed by an ADMIN (None = not restricted)"""
+        if self.user.role != 'ADMIN':
+            return None
+        if self._department_ids is None:
+            self._department_ids = set(self.user.managed_departments.values_list('id', flat=True))
+        return self._department_ids
+
+    def reference(self, name):
+        rows = reference_data()[name]
+        if self.department_ids is None:
+            return rows
+        field = 'id' if name == 'departements' else 'departement'
+        return [row for row in rows if row[field] in self.department_ids]
+
+
+def _inscriptions(scope):
+    return list(projections.inscriptions(Inscription.objects.filter(student=scope.user)))
+
+
+def _pending_inscriptions(scope):
+    queryset = Inscription.objects.filter(status='PENDING', filiere__departement__in=scope.department_ids)
+    return list(projections.inscriptions(queryset))
+
+
+def _notes(scope):
+    return list(projections.notes(Note.objects.filter(student=scope.user)))
+
+
+def _modules(scope):
+    if scope.user.role == 'ENSEIGNANT':
+        return teacher_modules(scope.user)
+    module_ids = Module.objects.filter(filiere__departement__in=scope.department_ids).values('id')
+    return sorted(projections.modules(module_ids).values(), key=lambda module: module['code'])
+
+
+BUILDERS = {
+    'inscriptions': _inscriptions,
+    'pending_inscriptions': _pending_inscriptions,
+    'notes': _notes,
+    'transcript': lambda scope: transcripts.get_transcript(scope.user.id),
+    'modules': _modules,
+    'dashboard': lambda scope: _cached('dashboard', dashboard),
+    'performance': lambda scope: _cached('performance', performance),
+    'departements': lambda scope: scope.reference('departements'),
+    'filieres': lambda scope: scope.reference('filieres'),
+}
+
+
+def build(user, include=None):
+    """Payload of `user`'s page; include: section names (default: all of the role)"""
+    from users.serializers import UserSerializer
+
+    allowed = SECTIONS.get(user.role, ())
+    sections = allowed if include is None else [name for name in allowed if name in include]
+    scope = Scope(user)
+    payload = {'user': UserSerializer(user).data, 'role': user.role}
+    for name in sections:
+        payload[name] = BUILDERS[name](scope)
+    return payload
@@ -0,0 +1,223 @@
+"""
+Change feed for downstream consumers (finance office, library...)
+
+Transactional outbox: ChangeEvent rows are inserted in the same transaction
+as the change they describe, so an event exists if and only if the change
+was committed.
+    inscription.validated / inscription.rejected   Inscription.transition(), bulk_validate
+    grade.published                                 a Note with a final grade is written
+    grade.deleted                                   a Note with a final grade is deleted
+
+Consumers read it by cursor (the event position) and commit their offset:
+    GET  /api/changes/?consumer=finance&limit=500   -> events after the committed offset
+    POST /api/changes/ack/ {"consumer": "finance", "position": <next_cursor>}
+
+Ordering guarantee: ids are allocated before commit, so a slow transaction
+can commit a lower id after a higher one has been served. The cursor is
+therefore not the id but `position`, assigned by sequence() to events that
+are already committed, one sequencer at a time, above every position handed
+out before. An event committed after a page was read always gets a higher
+position than that page: a consumer resuming from its offset never skips
+an event. Events are only served once sequenced (read() sequences first).
+
+Events already read by every consumer and older than RETENTION_DAYS are
+pruned (prune_change_events job).
+"""
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .models import ChangeEvent, ChangeFeedConsumer, Inscription, Module, Note
+
+
+DEFAULTS = {
+    'PAGE_SIZE': 100,
+    'MAX_PAGE_SIZE': 1000,
+    'SEQUENCE_BATCH': 1000,
+    'RETENTION_DAYS': 30,
+}
+
+TOPICS = ('inscription.validated', 'inscription.rejected', 'grade.published', 'grade.deleted')
+
+# pg_advisory_xact_lock key of the sequencer
+SEQUENCER_LOCK_ID = 0x63686665
+
+_local = threading.local()
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'CHANGE_FEED', {})}
+
+
+# ============================================
+# OUTBOX (request path, inside the writing transaction)
+# ============================================
+def record_inscriptions(inscription_ids):
+    """inscription.<status> events for processed inscriptions: one SELECT + one INSERT"""
+    rows = Inscription.objects.filter(id__in=inscription_ids).values(
+        'id', 'status', 'academic_year', 'validation_date', 'rejection_reason',
+        'student_id', 'student__cne', 'student__first_name', 'student__last_name', 'student__email',
+        'filiere_id', 'filiere__code', 'filiere__name', 'filiere__departement_id',
+    ).order_by('id')
+    return ChangeEvent.objects.bulk_create([
+        ChangeEvent(
+            topic=f"inscription.{row['status'].lower()}",
+            object_id=row['id'],
+            departement_id=row['filiere__departement_id'],
+            payload={
+                'inscription_id': row['id'],
+                'status': row['status'],
+                'academic_year': row['academic_year'],
+                'validation_date': row['validation_date'],
+                'rejection_reason': row['rejection_reason'] or '',
+                'student': {
+                    'id': row['student_id'], 'cne': row['student__cne'], 'email': row['student__email'],
+                    'first_name': row['student__first_name'], 'last_name': row['student__last_name'],
+                },
+                'filiere': {'id': row['filiere_id'], 'code': row['filiere__code'], 'name': row['filiere__name']},
+            },
+        )
+        for row in rows if row['status'] in ('VALIDATED', 'REJECTED')
+    ])
+
+
+def record_grades(note_ids):
+    """grade.published events for notes with a final grade: one SELECT + one INSERT"""
+    if getattr(_local, 'buffer', None) is not None:
+        _local.buffer.update(note_ids)
+        return []
+    rows = Note.objects.filter(id__in=note_ids, note_finale__isnull=False).values(
+        'id', 'academic_year', 'note_controle', 'note_examen', 'note_finale', 'updated_at',
+        'student_id', 'student__cne', 'module_id', 'module__code', 'module__name',
+        'module__semestre', 'module__filiere__departement_id',
+    ).order_by('id')
+    return ChangeEvent.objects.bulk_create([
+        ChangeEvent(
+            topic='grade.published',
+            object_id=row['id'],
+            departement_id=row['module__filiere__departement_id'],
+            payload={
+                'note_id': row['id'],
+                'academic_year': row['academic_year'],
+                'note_controle': row['note_controle'],
+                'note_examen': row['note_examen'],
+                'note_finale': row['note_finale'],
+                'updated_at': row['updated_at'],
+                'student': {'id': row['student_id'], 'cne': row['student__cne']},
+                'module': {
+                    'id': row['module_id'], 'code': row['module__code'],
+                    'name': row['module__name'], 'semestre': row['module__semestre'],
+                },
+            },
+        )
+        for row in rows
+    ])
+
+
+def record_grade_deleted(note):
+    if note.note_finale is None:
+        return None
+    # Module still exists here, also when its deletion cascades to the note
+    departement_id = Module.objects.filter(id=note.module_id).values_list('filiere__departement_id', flat=True).first()
+    return ChangeEvent.objects.create(
+        topic='grade.deleted',
+        object_id=note.pk,
+        departement_id=departement_id,
+        payload={
+            'note_id': note.pk, 'academic_year': note.academic_year,
+            'student': {'id': note.student_id}, 'module': {'id': note.module_id},
+        },
+    )
+
+
+@contextmanager
+def collect():
+    """Grade writes of the block are recorded with one SELECT + INSERT when it exits (bulk paths)"""
+    previous = getattr(_local, 'buffer', None)
+    buffer = _local.buffer = set()
+    try:
+        yield
+    finally:
+        _local.buffer = previous
+    if buffer:
+        record_grades(buffer)
+
+
+# ============================================
+# FEED (consumers)
+# ============================================
+def _lock_sequencer():
+    """Serialize sequence(): two sequencers would hand out the same positions"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [SEQUENCER_LOCK_ID])
+        else:
+            # SQLite: take the database write lock before reading MAX(position)
+            cursor.execute(f'UPDATE {ChangeEvent._meta.db_table} SET position = NULL WHERE 1 = 0')
+
+
+def sequence(config=None):
+    """Give the next positions to committed events that have none yet, in id order"""
+    config = config or get_config()
+    if not ChangeEvent.objects.filter(position__isnull=True).exists():
+        return 0
+    sequenced = 0
+    while True:
+        with transaction.atomic():
+            _lock_sequencer()
+            last = latest_position()
+            pending = list(
+                ChangeEvent.objects.filter(position__isnull=True)
+                .order_by('id').values_list('id', flat=True)[:config['SEQUENCE_BATCH']]
+            )
+            ChangeEvent.objects.bulk_update(
+                [ChangeEvent(id=event_id, position=last + offset) for offset, event_id in enumerate(pending, 1)],
+                ['position'],
+            )
+        sequenced += len(pending)
+        if len(pending) < config['SEQUENCE_BATCH']:
+            return sequenced
+
+
+def latest_position():
+    return ChangeEvent.objects.aggregate(position=Max('position'))['position'] or 0
+
+
+def read(after, limit, topics=None, departement_ids=None, config=None):
+    """(events, next_cursor, has_more) after position `after`"""
+    config = config or get_config()
+    sequence(config)
+    queryset = ChangeEvent.objects.filter(position__gt=after)
+    if topics:
+        queryset = queryset.filter(topic__in=topics)
+    if departement_ids is not None:
+        queryset = queryset.filter(departement_id__in=departement_ids)
+    events = list(queryset.order_by('position')[:limit + 1])
+    has_more = len(events) > limit
+    events = events[:limit]
+    return events, (events[-1].position if events else after), has_more
+
+
+def acknowledge(consumer, position, reset=False):
+    """Commit the offset; it only moves forward unless reset=True (replay)"""
+    updated = ChangeFeedConsumer.objects.filter(pk=consumer.pk)
+    if not reset:
+        updated = updated.filter(position__lt=position)
+    updated.update(position=position, updated_at=timezone.now())
+    consumer.refresh_from_db(fields=['position', 'updated_at'])
+    return consumer
+
+
+def prune(config=None):
+    """Delete events read by every consumer and older than RETENTION_DAYS"""
+    config = config or get_config()
+    queryset = ChangeEvent.objects.filter(created_at__lt=timezone.now() - timedelta(days=config['RETENTION_DAYS']))
+    slowest = ChangeFeedConsumer.objects.aggregate(position=Min('position'))['position']
+    if slowest is not None:
+        queryset = queryset.filter(position__lte=slowest)
+    return queryset.delete()[0]
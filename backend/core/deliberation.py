@@ -0,0 +1,150 @@
+"""
+Vectorized deliberation engine (jury de fin de semestre)
+
+For one filiere / semestre / academic_year:
+    1. load the (student x module) grade matrix with a single Note query
+    2. compute with NumPy:
+        - coefficient-weighted semester average (missing grade counts as 0)
+        - module status: validated (>= passing), compensated, failed or
+          missing, each module in exactly one of them
+        - decision: ADMIS, COMPENSE (average >= passing, no grade below the
+          eliminatory note, some modules < passing) or AJOURNE
+        - missing grade rule: a student with a missing grade is AJOURNE (the
+          jury cannot validate an incomplete record); the missing module is
+          neither failed nor eliminatory
+        - competition rank by average (1, 2, 2, 4...)
+    3. persist a Deliberation snapshot + DeliberationResult rows (bulk_create)
+"""
+import time
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+
+from .models import Deliberation, DeliberationResult, Inscription, Module, Note
+
+
+def load_matrix(filiere, semestre, academic_year):
+    """Returns (student_ids, module_ids, coefficients, grades) with NaN for missing grades"""
+    modules = list(
+        Module.objects.filter(filiere=filiere, semestre=semestre)
+        .order_by('id').values_list('id', 'coefficient')
+    )
+    module_ids = np.array([m[0] for m in modules], dtype=np.int64)
+    coefficients = np.array([float(m[1]) for m in modules], dtype=np.float64)
+
+    # Students of the promotion (validated inscription for the year)
+    student_ids = np.array(sorted(
+        Inscription.objects.filter(
+            filiere=filiere, academic_year=academic_year, status='VALIDATED'
+        ).values_list('student_id', flat=True).order_by().distinct()
+    ), dtype=np.int64)
+
+    grades = np.full((len(student_ids), len(module_ids)), np.nan)
+    if not len(student_ids) or not len(module_ids):
+        return student_ids, module_ids, coefficients, grades
+
+    # The whole grade matrix in one query
+    rows = Note.objects.filter(
+        module__filiere=filiere,
+        module__semestre=semestre,
+        academic_year=academic_year,
+        note_finale__isnull=False,
+    ).values_list('student_id', 'module_id', 'note_finale')
+    data = np.array([(s, m, float(n)) for s, m, n in rows], dtype=np.float64).reshape(-1, 3)
+    if len(data):
+        s_idx = np.searchsorted(student_ids, data[:, 0].astype(np.int64))
+        m_idx = np.searchsorted(module_ids, data[:, 1].astype(np.int64))
+        # Ignore grades of students without a validated inscription
+        s_ok = (s_idx < len(student_ids)) & (student_ids[np.minimum(s_idx, len(student_ids) - 1)] == data[:, 0])
+        grades[s_idx[s_ok], m_idx[s_ok]] = data[s_ok, 2]
+    return student_ids, module_ids, coefficients, grades
+
+
+def compute(grades, coefficients, passing=10.0, eliminatory=5.0):
+    """Pure NumPy deliberation on a (students x modules) matrix"""
+    missing = np.isnan(grades)
+    filled = np.where(missing, 0.0, grades)
+
+    total_coefficient = coefficients.sum()
+    if total_coefficient > 0:
+        averages = filled @ coefficients / total_coefficient
+    else:
+        averages = np.zeros(len(grades))
+    averages = np.round(averages, 2)
+
+    # Module statuses on the grades that exist only: missing is its own status
+    graded = ~missing
+    below_passing = graded & (filled < passing)
+    eliminated = (graded & (filled < eliminatory)).any(axis=1)
+    incomplete = missing.any(axis=1)
+    admitted = averages >= passing
+    compensable = admitted & ~eliminated & ~incomplete
+
+    validated_count = (graded & ~below_passing).sum(axis=1)
+    failed_count = below_passing.sum(axis=1)
+    compensated_count = np.where(compensable, failed_count, 0)
+    failed_count = np.where(compensable, 0, failed_count)
+
+    decisions = np.where(
+        compensable & (compensated_count == 0), 'ADMIS',
+        np.where(compensable, 'COMPENSE', 'AJOURNE')
+    )
+
+    # Competition ranking: rank = 1 + number of strictly better averages
+    sorted_desc = np.sort(-averages)
+    ranks = np.searchsorted(sorted_desc, -averages, side='left') + 1
+
+    return {
+        'averages': averages,
+        'ranks': ranks,
+        'decisions': decisions,
+        'validated': validated_count,
+        'compensated': compensated_count,
+        'failed': failed_count,
+        'missing': missing.sum(axis=1),
+    }
+
+
+def deliberate(filiere, semestre, academic_year, passing=10, eliminatory=5, user=None):
+    """Run the deliberation and persist a snapshot, returns the Deliberation"""
+    start = time.perf_counter()
+    student_ids, module_ids, coefficients, grades = load_matrix(filiere, semestre, academic_year)
+    result = compute(grades, coefficients, float(passing), float(eliminatory))
+
+    with transaction.atomic():
+        deliberation = Deliberation.objects.create(
+            filiere=filiere,
+            semestre=semestre,
+            academic_year=academic_year,
+            passing_average=passing,
+            eliminatory_note=eliminatory,
+            student_count=len(student_ids),
+            module_count=len(module_ids),
+            admitted_count=int((result['decisions'] != 'AJOURNE').sum()),
+            class_average=Decimal(str(round(float(result['averages'].mean()), 2))) if len(student_ids) else None,
+            created_by=user,
+        )
+        DeliberationResult.objects.bulk_create(
+            [
+                DeliberationResult(
+                    deliberation=deliberation,
+                    student_id=int(student_id),
+                    average=Decimal(str(average)),
+                    rank=int(rank),
+                    decision=str(decision),
+                    modules_validated=int(validated),
+                    modules_compensated=int(compensated),
+                    modules_failed=int(failed),
+                    modules_missing=int(missing),
+                )
+                for student_id, average, rank, decision, validated, compensated, failed, missing in zip(
+                    student_ids, result['averages'].tolist(), result['ranks'], result['decisions'],
+                    result['validated'], result['compensated'], result['failed'], result['missing'],
+                )
+            ],
+            batch_size=1000,
+        )
+        deliberation.duration_ms = (time.perf_counter() - start) * 1000
+        deliberation.save(update_fields=['duration_ms'])
+    return deliberation
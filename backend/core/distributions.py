@@ -0,0 +1,188 @@
+"""
+Grade distributions of a module, filiere or department
+
+    GET /api/notes/distribution/?module=12&academic_year=2024-2025
+        {"scope": {...}, "count": 87, "fields": {"note_finale": {
+            "count", "mean", "stddev", "min", "max", "out_of_range", "median",
+            "percentiles": {"p10": ..., "p90": ...},
+            "histogram": [{"min": 0, "max": 1, "count": 3}, ...]}, ...}}
+
+For note_controle, note_examen and note_finale:
+    - histogram buckets, count, mean, stddev, min and max come from one
+      aggregate query (one conditional COUNT per bucket, computed in SQL);
+    - percentiles come from one streamed pass over values_list(): grades
+      are counted per hundredth (2001 slots per field, no model instances,
+      no sort), then read back by cumulative count.
+
+Grades outside 0-20 (legacy rows, writes now reject them) are reported as
+"out_of_range", left out of the histogram and clamped to 0 or 20 for the
+percentiles.
+
+Percentiles interpolate linearly between order statistics (numpy's default).
+Payloads are cached per scope and academic year (DISTRIBUTIONS['CACHE_TTL'])
+and validated by a COUNT/MAX(updated_at) fingerprint of the scope, so any
+write, deletion, recompute or archival shows up on the next call. Archived
+years are read from ArchivedNote.
+"""
+import math
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Avg, Count, F, FloatField, Max, Min, Q
+
+from . import archive
+from .models import ArchivedNote, Note
+
+
+DEFAULTS = {
+    'BUCKET_WIDTH': 1,                     # points per histogram bucket (divides 20)
+    'PERCENTILES': (10, 25, 50, 75, 90),
+    'CACHE_TTL': 600,                      # seconds; 0 = computed on every call
+}
+
+FIELDS = ('note_controle', 'note_examen', 'note_finale')
+SCOPES = {
+    'module': 'module_id',
+    'filiere': 'module__filiere_id',
+    'departement': 'module__filiere__departement_id',
+}
+MAX_GRADE = 20
+_SLOTS = MAX_GRADE * 100 + 1   # one counter per hundredth, 0.00 .. 20.00
+
+
+def get_config():
+    config = {**DEFAULTS, **getattr(settings, 'DISTRIBUTIONS', {})}
+    width = Decimal(str(config['BUCKET_WIDTH']))
+    if width <= 0 or MAX_GRADE % width:
+        raise ImproperlyConfigured(f"DISTRIBUTIONS['BUCKET_WIDTH'] must divide {MAX_GRADE}, got {config['BUCKET_WIDTH']}")
+    return config
+
+
+def notes_in_scope(scope, scope_id, academic_year=None):
+    """Notes (hot or archived table) of one module / filiere / departement"""
+    model = ArchivedNote if academic_year and archive.is_archived(academic_year) else Note
+    queryset = model.objects.filter(**{SCOPES[scope]: scope_id})
+    if academic_year:
+        queryset = queryset.filter(academic_year=academic_year)
+    return queryset
+
+
+def _buckets(width):
+    width = Decimal(str(width))
+    edges = [i * width for i in range(int(MAX_GRADE / width) + 1)]
+    return list(zip(edges, edges[1:]))
+
+
+def _aggregates(queryset, buckets):
+    """One query: count, moments and histogram counts of every field"""
+    aggregates = {'rows': Count('id')}
+    for field in FIELDS:
+        aggregates[f'{field}__count'] = Count(field)
+        aggregates[f'{field}__mean'] = Avg(field)
+        # STDDEV is not portable (and SQLite's breaks on NULLs): E[x²] - E[x]²
+        aggregates[f'{field}__squares'] = Avg(F(field) * F(field), output_field=FloatField())
+        aggregates[f'{field}__min'] = Min(field)
+        aggregates[f'{field}__max'] = Max(field)
+        aggregates[f'{field}__out_of_range'] = Count('id', filter=Q(**{f'{field}__lt': 0}) | Q(**{f'{field}__gt': MAX_GRADE}))
+        for i, (low, high) in enumerate(buckets):
+            # Last bucket includes 20
+            upper = Q(**{f'{field}__lte': high}) if i == len(buckets) - 1 else Q(**{f'{field}__lt': high})
+            aggregates[f'{field}__bucket{i}'] = Count('id', filter=Q(**{f'{field}__gte': low}) & upper)
+    return queryset.aggregate(**aggregates)
+
+
+def _frequencies(queryset):
+    """One streamed pass: {field: [count of each hundredth]}"""
+    counts = {field: [0] * _SLOTS for field in FIELDS}
+    columns = [counts[field] for field in FIELDS]
+    for row in queryset.values_list(*FIELDS).order_by().iterator(chunk_size=5000):
+        for value, slots in zip(row, columns):
+            if value is not None:
+                slots[min(max(int(value * 100), 0), _SLOTS - 1)] += 1
+    return counts
+
+
+def percentiles(slots, total, ranks):
+    """{p: value} for percentiles `ranks` of the grades counted in `slots` (hundredths)"""
+    if not total:
+        return {p: None for p in ranks}
+    # Order statistics needed, then one cumulative walk over the slots
+    wanted = sorted({k for p in ranks for k in (math.floor(p / 100 * (total - 1)), math.ceil(p / 100 * (total - 1)))})
+    values = {}
+    seen = 0
+    position = 0
+    for hundredths, count in enumerate(slots):
+        seen += count
+        while position < len(wanted) and wanted[position] < seen:
+            values[wanted[position]] = hundredths
+            position += 1
+        if position == len(wanted):
+            break
+    result = {}
+    for p in ranks:
+        k = p / 100 * (total - 1)
+        low, high = values[math.floor(k)], values[math.ceil(k)]
+        result[p] = round((low + (high - low) * (k - math.floor(k))) / 100, 2)
+    return result
+
+
+def _round(value):
+    return round(float(value), 2) if value is not None else None
+
+
+def _stddev(mean, squares):
+    """Population standard deviation from the first two moments"""
+    if mean is None:
+        return None
+    return math.sqrt(max(squares - float(mean) ** 2, 0))
+
+
+def compute(queryset, config=None):
+    """Distribution payload of the notes of `queryset` (two queries)"""
+    config = config or get_config()
+    buckets = _buckets(config['BUCKET_WIDTH'])
+    ranks = tuple(config['PERCENTILES'])
+    aggregates = _aggregates(queryset, buckets)
+    frequencies = _frequencies(queryset)
+
+    fields = {}
+    for field in FIELDS:
+        total = aggregates[f'{field}__count']
+        values = percentiles(frequencies[field], total, sorted(set(ranks) | {50}))
+        fields[field] = {
+            'count': total,
+            'mean': _round(aggregates[f'{field}__mean']),
+            'stddev': _round(_stddev(aggregates[f'{field}__mean'], aggregates[f'{field}__squares'])),
+            'min': _round(aggregates[f'{field}__min']),
+            'max': _round(aggregates[f'{field}__max']),
+            'out_of_range': aggregates[f'{field}__out_of_range'],
+            'median': values[50],
+            'percentiles': {f'p{p}': values[p] for p in ranks},
+            'histogram': [
+                {'min': float(low), 'max': float(high), 'count': aggregates[f'{field}__bucket{i}']}
+                for i, (low, high) in enumerate(buckets)
+            ],
+        }
+    return {'count': aggregates['rows'], 'fields': fields}
+
+
+def get_distribution(scope, scope_id, academic_year=None):
+    """Cached compute() of one scope and academic year"""
+    config = get_config()
+    queryset = notes_in_scope(scope, scope_id, academic_year)
+    payload_scope = {'type': scope, 'id': scope_id, 'academic_year': academic_year}
+    if not config['CACHE_TTL']:
+        return {'scope': payload_scope, **compute(queryset, config)}
+
+    # Cheap validator: any insert, update or delete in the scope changes it
+    state = queryset.aggregate(rows=Count('id'), updated=Max('updated_at'))
+    fingerprint = (state['rows'], state['updated'] and state['updated'].isoformat(), config['BUCKET_WIDTH'], tuple(config['PERCENTILES']))
+    key = f'distribution:{scope}:{scope_id}:{academic_year or "all"}'
+    cached = cache.get(key)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    payload = {'scope': payload_scope, **compute(queryset, config)}
+    cache.set(key, (fingerprint, payload), config['CACHE_TTL'])
+    return payload
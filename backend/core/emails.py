@@ -1,3 +1,216 @@
+"""
+Transactional email outbox
+
+Request path: enqueue() inserts an OutboundEmail row inside the current
+transaction (one INSERT, no network I/O), so an email exists if and only if
+the status change that triggered it was committed.
+
+Worker (python manage.py send_emails): claims due rows in batches with a
+lease, sends each batch over one SMTP connection and reschedules failures
+with exponential backoff until MAX_ATTEMPTS. Bodies of REDACTED_KINDS
+(temporary passwords) are cleared once the email has been sent or has
+failed for good; the accounts of failed ones need a password reset
+(undelivered_credentials()).
+"""
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Case, F, Q, TextField, Value, When
+from django.utils import timezone
+
+from . import metrics
+from .models import Inscription, OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 6,
+    'BACKOFF_SECONDS': 60,
+    'MAX_BACKOFF_SECONDS': 3600,
+    'LEASE_SECONDS': 300,
+}
+
+KIND_INSCRIPTION_DECISION = 'inscription_decision'
+KIND_ACCOUNT_CREATED = 'account_created'
+
+# Credentials are not kept in the outbox after delivery
+REDACTED_KINDS = (KIND_ACCOUNT_CREATED,)
+REDACTED_BODY = "(contenu effacé après l'envoi)"
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'EMAIL_QUEUE', {})}
+
+
+# ============================================
+# ENQUEUE (request path)
+# ============================================
+def enqueue(to_email, subject, body, kind=''):
+    if not to_email:
+        return None
+    return OutboundEmail.objects.create(kind=kind, to_email=to_email, subject=subject, body=body)
+
+
+def enqueue_many(messages):
+    """messages: iterable of (to_email, subject, body, kind); one INSERT"""
+    rows = [
+        OutboundEmail(kind=kind, to_email=to_email, subject=subject, body=body)
+        for to_email, subject, body, kind in messages if to_email
+    ]
+    return OutboundEmail.objects.bulk_create(rows)
+
+
+def inscription_decision_message(first_name, last_name, filiere_name, academic_year, status, rejection_reason=''):
+    """(subject, body) of the decision email"""
+    greeting = f"Bonjour {first_name} {last_name},".replace('  ', ' ')
+    if status == 'VALIDATED':
+        subject = f"Inscription validée - {filiere_name} ({academic_year})"
+        decision = (
+            f"Votre inscription en {filiere_name} pour l'année {academic_year} a été validée.\n"
+            "Vous pouvez dès à présent accéder à votre espace étudiant."
+        )
+    else:
+        subject = f"Inscription rejetée - {filiere_name} ({academic_year})"
+        decision = f"Votre inscription en {filiere_name} pour l'année {academic_year} a été rejetée."
+        if rejection_reason:
+            decision += f"\nMotif : {rejection_reason}"
+    return subject, f"{greeting}\n\n{decision}\n\nL'équipe ACADEMIYA"
+
+
 def send_inscription_confirmation(inscription):
-    """Send email when inscription is validated/rejected"""
-    pass
\ No newline at end of file
+    """Queue the email when inscription is validated/rejected"""
+    student = inscription.student
+    subject, body = inscription_decision_message(
+        student.first_name, student.last_name, inscription.filiere.name,
+        inscription.academic_year, inscription.status, inscription.rejection_reason or '',
+    )
+    return enqueue(student.email, subject, body, kind=KIND_INSCRIPTION_DECISION)
+
+
+def send_inscription_confirmations(inscription_ids, status, rejection_reason=''):
+    """Bulk variant: one SELECT + one INSERT for a batch of processed inscriptions"""
+    rows = Inscription.objects.filter(id__in=inscription_ids).values_list(
+        'student__email', 'student__first_name', 'student__last_name', 'filiere__name', 'academic_year'
+    ).order_by()
+    return enqueue_many(
+        (email, *inscription_decision_message(first, last, filiere, year, status, rejection_reason),
+         KIND_INSCRIPTION_DECISION)
+        for email, first, last, filiere, year in rows
+    )
+
+
+# ============================================
+# DELIVERY (worker)
+# ============================================
+def backoff(attempts, config=None):
+    config = config or get_config()
+    return timedelta(seconds=min(config['BACKOFF_SECONDS'] * 2 ** (attempts - 1), config['MAX_BACKOFF_SECONDS']))
+
+
+def claim_batch(batch_size, config=None):
+    """Lease up to batch_size due emails to this worker (safe with several workers)"""
+    config = config or get_config()
+    now = timezone.now()
+    due = (
+        Q(status='PENDING', next_attempt_at__lte=now)
+        | Q(status='SENDING', locked_at__lt=now - timedelta(seconds=config['LEASE_SECONDS']))
+    )
+    ids = list(OutboundEmail.objects.filter(due).order_by('next_attempt_at', 'id').values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    # Conditional UPDATE: rows claimed concurrently by another worker no longer match `due`
+    OutboundEmail.objects.filter(due, id__in=ids).update(status='SENDING', lock_token=token, locked_at=now)
+    return list(OutboundEmail.objects.filter(lock_token=token, status='SENDING').order_by('id'))
+
+
+def deliver(emails, connection=None, config=None):
+    """Send claimed emails over one connection; returns {'sent', 'retry', 'failed'}"""
+    config = config or get_config()
+    stats = {'sent': 0, 'retry': 0, 'failed': 0}
+    if not emails:
+        return stats
+
+    connection = connection or get_connection(fail_silently=False)
+    sent_ids = []
+    failures = []
+    try:
+        connection.open()
+    except Exception as e:
+        # Server unreachable: the whole batch is retried later
+        failures = [(email, e) for email in emails]
+    else:
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject, email.body, settings.DEFAULT_FROM_EMAIL, [email.to_email], connection=connection
+                )
+                try:
+                    message.send()
+                    sent_ids.append(email.id)
+                except Exception as e:
+                    failures.append((email, e))
+        finally:
+            connection.close()
+
+    now = timezone.now()
+    if sent_ids:
+        OutboundEmail.objects.filter(id__in=sent_ids).update(
+            status='SENT', sent_at=now, lock_token='', locked_at=None, last_error='',
+            body=Case(When(kind__in=REDACTED_KINDS, then=Value(REDACTED_BODY, output_field=TextField())), default=F('body')),
+        )
+        stats['sent'] = len(sent_ids)
+
+    for email, error in failures:
+        email.attempts += 1
+        email.last_error = f"{type(error).__name__}: {error}"[:2000]
+        email.lock_token = ''
+        email.locked_at = None
+        if email.attempts >= config['MAX_ATTEMPTS']:
+            email.status = 'FAILED'
+            stats['failed'] += 1
+            if email.kind in REDACTED_KINDS:
+                email.body = REDACTED_BODY
+                logger.warning("Identifiants non remis à %s: réinitialiser le mot de passe du compte", email.to_email)
+        else:
+            email.status = 'PENDING'
+            email.next_attempt_at = now + backoff(email.attempts, config)
+            stats['retry'] += 1
+    if failures:
+        OutboundEmail.objects.bulk_update(
+            [email for email, _ in failures],
+            ['attempts', 'last_error', 'lock_token', 'locked_at', 'status', 'next_attempt_at', 'body'],
+        )
+
+    for outcome, count in stats.items():
+        if count:
+            metrics.EMAILS_SENT.inc(count, status=outcome)
+    return stats
+
+
+def process_queue(batch_size=None, max_batches=None, connection=None):
+    """Drain due emails batch by batch; returns cumulated stats"""
+    config = get_config()
+    batch_size = batch_size or config['BATCH_SIZE']
+    totals = {'sent': 0, 'retry': 0, 'failed': 0}
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        emails = claim_batch(batch_size, config)
+        if not emails:
+            break
+        for outcome, count in deliver(emails, connection, config).items():
+            totals[outcome] += count
+        batches += 1
+    return totals
+
+
+def undelivered_credentials():
+    """Addresses whose temporary password was never delivered: their accounts need a password reset"""
+    return list(
+        OutboundEmail.objects.filter(status='FAILED', kind__in=REDACTED_KINDS)
+        .values_list('to_email', flat=True).order_by('to_email').distinct()
+    )
@@ -0,0 +1,288 @@
+"""
+Server-pushed domain events (Server-Sent Events)
+
+Published after the surrounding transaction commits:
+    inscription.created                         pending_delta +1
+    inscription.validated / inscription.rejected  pending_delta -1
+    grades.published                            one event per module/year and transaction
+
+Every event carries a server-side scope (departement, enseignant, students)
+used to route it:
+    DIRECTION / superuser -> everything
+    ADMIN                 -> events of the departments they manage
+    ENSEIGNANT            -> grade events of their modules
+    ETUDIANT              -> events about themselves
+
+The broker is pluggable (settings.EVENTS['BROKER']). The default
+InProcessBroker delivers to clients connected to the same process; it is the
+one used by tests and single-process ASGI deployments.
+"""
+import asyncio
+import itertools
+import json
+import queue
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+DEFAULTS = {
+    'BROKER': 'core.events.InProcessBroker',
+    'HEARTBEAT_SECONDS': 15,
+    'QUEUE_SIZE': 100,  # per client; a full queue asks the client to resync
+}
+
+_local = threading.local()
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'EVENTS', {})}
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(get_config()['BROKER'])()
+    return _broker
+
+
+# ============================================
+# SUBSCRIPTIONS / BROKER
+# ============================================
+class Subscription:
+    """Thread-safe queue consumed by a blocking (WSGI) stream"""
+    def __init__(self, accept, maxsize):
+        self.accept = accept
+        self.overflowed = False
+        self._queue = queue.Queue(maxsize)
+
+    def put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscription(Subscription):
+    """asyncio queue consumed by an ASGI stream; fed from any thread"""
+    def __init__(self, accept, maxsize):
+        self.accept = accept
+        self.overflowed = False
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize)
+
+    def put(self, event):
+        try:
+            self._loop.call_soon_threadsafe(self._put_nowait, event)
+        except RuntimeError:
+            pass  # event loop closed, the stream is gone
+
+    def _put_nowait(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, accept, asynchronous=False):
+        cls = AsyncSubscription if asynchronous else Subscription
+        subscription = cls(accept, get_config()['QUEUE_SIZE'])
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event):
+        event = {**event, 'id': next(self._ids)}
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if subscription.accept(event):
+                subscription.put(event)
+        return event
+
+
+# ============================================
+# PUBLISHING
+# ============================================
+class _PendingEvents:
+    """Events of one transaction merged by coalesce key, sent on commit"""
+    def __init__(self):
+        self.events = {}
+
+    def add(self, key, event):
+        current = self.events.get(key)
+        if current is None:
+            self.events[key] = event
+        else:
+            current['data']['count'] += event['data']['count']
+            current['scope']['student_ids'] |= event['scope']['student_ids']
+
+    def flush(self):
+        if getattr(_local, 'pending', None) is self:
+            _local.pending = None
+        broker = get_broker()
+        for event in self.events.values():
+            broker.publish(event)
+
+
+def _transaction_batch():
+    """Pending events of the current transaction, None outside a transaction"""
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        return None
+    pending = getattr(_local, 'pending', None)
+    # A rolled-back transaction drops its on_commit callbacks: start a new batch
+    if pending is None or not any(entry[1] == pending.flush for entry in connection.run_on_commit):
+        pending = _local.pending = _PendingEvents()
+        transaction.on_commit(pending.flush)
+    return pending
+
+
+def publish(event_type, data, departement_id=None, enseignant_id=None, student_ids=(), coalesce=None):
+    """
+    Send an event once the current transaction commits (immediately outside one).
+    Events sharing a `coalesce` key inside one transaction are merged
+    (data['count'] summed, students united).
+    """
+    event = {
+        'type': event_type,
+        'data': data,
+        'scope': {
+            'departement_id': departement_id,
+            'enseignant_id': enseignant_id,
+            'student_ids': set(student_ids),
+        },
+    }
+    batch = _transaction_batch() if coalesce is not None else None
+    if batch is not None:
+        batch.add((event_type, coalesce), event)
+    else:
+        transaction.on_commit(lambda: get_broker().publish(event))
+
+
+def publish_grades(module_id, academic_year, student_ids, count=None):
+    from .models import Module
+
+    student_ids = set(student_ids)
+    count = count or len(student_ids)
+    key = ('grades.published', (module_id, academic_year))
+    batch = _transaction_batch()
+    if batch is not None and key in batch.events:
+        # Already announced in this transaction (bulk save): merge without a query
+        batch.add(key, {'data': {'count': count}, 'scope': {'student_ids': student_ids}})
+        return
+
+    module = Module.objects.filter(pk=module_id).values('filiere__departement_id', 'enseignant_id').first()
+    if module is None:
+        return
+    publish(
+        'grades.published',
+        {'module_id': module_id, 'academic_year': academic_year, 'count': count},
+        departement_id=module['filiere__departement_id'],
+        enseignant_id=module['enseignant_id'],
+        student_ids=student_ids,
+        coalesce=key[1],
+    )
+
+
+# ============================================
+# ROUTING (per connected user)
+# ============================================
+def audience(user):
+    """Predicate selecting the events `user` may receive (evaluated in the broker)"""
+    if user.is_superuser or user.role == 'DIRECTION':
+        return lambda event: True
+    if user.role == 'ADMIN':
+        departements = set(user.managed_departments.values_list('id', flat=True))
+        return lambda event: event['scope']['departement_id'] in departements
+    if user.role == 'ENSEIGNANT':
+        return lambda event: (
+            event['type'].startswith('grades.') and event['scope']['enseignant_id'] == user.id
+        )
+    return lambda event: user.id in event['scope']['student_ids']
+
+
+def snapshot(user):
+    """Initial state sent on connection; later events are deltas"""
+    from .models import Inscription
+
+    if user.is_superuser or user.role == 'DIRECTION':
+        pending = Inscription.objects.filter(status='PENDING')
+    elif user.role == 'ADMIN':
+        pending = Inscription.objects.filter(
+            status='PENDING', filiere__departement__in=user.managed_departments.all()
+        )
+    else:
+        return {}
+    return {'pending_count': pending.count()}
+
+
+# ============================================
+# SSE STREAMS
+# ============================================
+def format_sse(event_type, data, event_id=None):
+    lines = [f'id: {event_id}'] if event_id else []
+    lines += [f'event: {event_type}', f'data: {json.dumps(data, default=str)}']
+    return '\n'.join(lines) + '\n\n'
+
+
+def _frames(subscription, event):
+    frames = []
+    if subscription.overflowed:
+        # Events were dropped for this slow client: it must re-fetch its state
+        subscription.overflowed = False
+        frames.append(format_sse('resync', {}))
+    if event is not None:
+        frames.append(format_sse(event['type'], event['data'], event['id']))
+    return frames or [': keepalive\n\n']
+
+
+def stream(subscription, initial_state):
+    """Blocking stream (WSGI): holds one worker thread per client"""
+    heartbeat = get_config()['HEARTBEAT_SECONDS']
+    try:
+        yield 'retry: 5000\n' + format_sse('snapshot', initial_state)
+        while True:
+            yield from _frames(subscription, subscription.get(heartbeat))
+    finally:
+        get_broker().unsubscribe(subscription)
+
+
+async def astream(subscription, initial_state):
+    """Event-loop stream (ASGI): no thread held while idle"""
+    heartbeat = get_config()['HEARTBEAT_SECONDS']
+    try:
+        yield 'retry: 5000\n' + format_sse('snapshot', initial_state)
+        while True:
+            for frame in _frames(subscription, await subscription.get(heartbeat)):
+                yield frame
+    finally:
+        get_broker().unsubscribe(subscription)
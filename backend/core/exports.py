@@ -0,0 +1,63 @@
+"""
+CSV exports shared by management commands and background jobs
+"""
+import csv
+
+
+INSCRIPTION_HEADER = [
+    'ID',
+    'Étudiant (CNE)',
+    'Nom Complet',
+    'Email',
+    'Filière',
+    'Département',
+    'Année Académique',
+    'Statut',
+    'Date Candidature',
+    'Validé par',
+    'Date Validation',
+    'Motif Rejet'
+]
+
+
+def inscriptions_queryset(status=None, filiere=None):
+    from .models import Inscription
+
+    inscriptions = Inscription.objects.select_related(
+        'student', 'filiere', 'filiere__departement', 'validated_by'
+    ).order_by('id')
+    if status:
+        inscriptions = inscriptions.filter(status=status)
+    if filiere:
+        inscriptions = inscriptions.filter(filiere_id=filiere)
+    return inscriptions
+
+
+def inscription_row(inscription):
+    return [
+        inscription.id,
+        inscription.student.cne or 'N/A',
+        f"{inscription.student.first_name} {inscription.student.last_name}",
+        inscription.student.email,
+        inscription.filiere.name,
+        inscription.filiere.departement.name,
+        inscription.academic_year,
+        inscription.status,
+        inscription.created_at.strftime('%Y-%m-%d %H:%M'),
+        inscription.validated_by.username if inscription.validated_by else 'N/A',
+        inscription.validation_date.strftime('%Y-%m-%d %H:%M') if inscription.validation_date else 'N/A',
+        inscription.rejection_reason or 'N/A'
+    ]
+
+
+def write_inscriptions_csv(csvfile, inscriptions, on_progress=None, every=500):
+    """Stream rows (server-side chunks); on_progress(done) is called every `every` rows"""
+    writer = csv.writer(csvfile)
+    writer.writerow(INSCRIPTION_HEADER)
+    done = 0
+    for inscription in inscriptions.iterator(chunk_size=2000):
+        writer.writerow(inscription_row(inscription))
+        done += 1
+        if on_progress and done % every == 0:
+            on_progress(done)
+    return done
@@ -0,0 +1,273 @@
+"""
+Streaming bulk grade import (CSV / XLSX)
+
+File layout (header optional, columns in this order when absent):
+    cne ; note_controle ; note_examen
+
+The file is read row by row and processed in batches:
+    1. CNEs of the batch resolved to students with one query
+    2. grades validated column by column (format, 0-20 range, duplicates)
+    3. valid rows written with one INSERT ... ON CONFLICT DO UPDATE (bulk_create)
+    4. grade changes appended to the audit log with one bulk INSERT
+Memory stays bounded by the batch size whatever the file length.
+
+The whole file is written in one transaction: a line that cannot be read
+(encoding, corrupt XLSX) rolls back the batches already written. A blank
+grade cell keeps the grade already stored (a new note gets no grade).
+Archived academic years are read-only: GradeImporter raises ArchiveError.
+"""
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from . import archive, audit, changefeed, events, metrics, rankings, transcripts
+from .models import Module, Note, NoteAudit
+
+User = get_user_model()
+
+COLUMNS = ('cne', 'note_controle', 'note_examen')
+MAX_REPORTED_ERRORS = 1000
+
+
+# ============================================
+# FILE READERS (generators: one row at a time)
+# ============================================
+def iter_csv(fileobj):
+    """Yields (line_number, cells). Detects ';' or ',' delimiters and UTF-8 BOM."""
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    first_line = text.readline()
+    delimiter = ';' if first_line.count(';') >= first_line.count(',') and ';' in first_line else ','
+    reader = csv.reader(_chain_first(first_line, text), delimiter=delimiter)
+    for line_number, cells in enumerate(reader, start=1):
+        yield line_number, cells
+    text.detach()
+
+
+def _chain_first(first_line, rest):
+    yield first_line
+    yield from rest
+
+
+def iter_xlsx(fileobj):
+    """Yields (line_number, cells) from the first sheet (read-only streaming mode)"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        for line_number, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+            yield line_number, ['' if value is None else str(value) for value in row]
+    finally:
+        workbook.close()
+
+
+def iter_rows(fileobj, filename):
+    if filename.lower().endswith(('.xlsx', '.xlsm')):
+        return iter_xlsx(fileobj)
+    return iter_csv(fileobj)
+
+
+# ============================================
+# IMPORTER
+# ============================================
+class GradeImporter:
+    def __init__(self, module, academic_year, user=None, batch_size=1000, dry_run=False):
+        self.module = module
+        self.academic_year = academic_year
+        self.user = user
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        # Same rule as the other grade writes, whatever the entry point (API, command)
+        if archive.is_archived(academic_year):
+            raise archive.ArchiveError(f"L'année {academic_year} est archivée (lecture seule).")
+        # Grading policy of the module, read once for the whole file
+        self.poids_controle = Module.poids_controle_of(module.pk)
+
+        self.lines = 0
+        self.imported = 0
+        self.error_count = 0
+        self.errors = []
+        self._seen_cnes = set()
+        self._positions = None
+        self._student_ids = set()
+
+    def run(self, rows):
+        """rows: iterable of (line_number, cells). Returns the report dict."""
+        batch = []
+        # All or nothing: reading errors surface while the file is streamed
+        with transaction.atomic():
+            for line_number, cells in rows:
+                if self._positions is None:
+                    self._positions = self._detect_header(cells)
+                    if self._positions is not None:
+                        continue
+                    self._positions = {name: i for i, name in enumerate(COLUMNS)}
+                if not any(str(c).strip() for c in cells):
+                    continue
+                self.lines += 1
+                batch.append((line_number, [self._cell(cells, name) for name in COLUMNS]))
+                if len(batch) >= self.batch_size:
+                    self._process(batch)
+                    batch = []
+            if batch:
+                self._process(batch)
+
+        if self.imported and not self.dry_run:
+            # Derived data not maintained by signals for set-based writes
+            transcripts.invalidate_students(self._student_ids)
+            rankings.refresh_partition(self.module.filiere_id, self.academic_year)
+            metrics.NOTES_WRITTEN.inc(self.imported, source='import')
+            events.publish_grades(self.module.id, self.academic_year, self._student_ids, count=self.imported)
+
+        return {
+            'module_id': self.module.id,
+            'academic_year': self.academic_year,
+            'dry_run': self.dry_run,
+            'lines': self.lines,
+            'imported': self.imported,
+            'error_count': self.error_count,
+            'errors': sorted(self.errors, key=lambda e: e['line']),
+        }
+
+    def _detect_header(self, cells):
+        names = [str(c).strip().lower() for c in cells]
+        if 'cne' not in names:
+            return None
+        missing = [name for name in COLUMNS if name not in names]
+        if missing:
+            raise ValueError(f"Colonnes manquantes dans l'en-tête: {', '.join(missing)}")
+        return {name: names.index(name) for name in COLUMNS}
+
+    def _cell(self, cells, name):
+        index = self._positions[name]
+        return str(cells[index]).strip() if index < len(cells) else ''
+
+    def _error(self, line_number, cne, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'cne': cne, 'error': message})
+
+    def _process(self, batch):
+        # Column-wise validation: CNE column first, then each grade column
+        line_numbers = [line for line, _ in batch]
+        cnes = [values[0] for _, values in batch]
+        valid = [True] * len(batch)
+
+        for i, cne in enumerate(cnes):
+            if not cne:
+                self._error(line_numbers[i], cne, 'CNE manquant')
+                valid[i] = False
+            elif cne in self._seen_cnes:
+                self._error(line_numbers[i], cne, 'CNE en double dans le fichier')
+                valid[i] = False
+            else:
+                self._seen_cnes.add(cne)
+
+        grade_columns = []
+        for column, label in ((1, 'note_controle'), (2, 'note_examen')):
+            parsed = []
+            for i, (_, values) in enumerate(batch):
+                value, error = parse_grade(values[column])
+                if error and valid[i]:
+                    self._error(line_numbers[i], cnes[i], f'{label}: {error}')
+                    valid[i] = False
+                parsed.append(value)
+            grade_columns.append(parsed)
+
+        # Resolve CNEs of the batch in one query
+        students = dict(
+            User.objects.filter(role='ETUDIANT', cne__in=[c for c, ok in zip(cnes, valid) if ok])
+            .values_list('cne', 'id')
+        )
+
+        # Stored grades of the batch: kept for blank cells, old values of the audit log
+        previous = {}
+        if not self.dry_run:
+            previous = {
+                student_id: (note_id, (controle, examen))
+                for student_id, note_id, controle, examen in Note.objects.filter(
+                    module=self.module, academic_year=self.academic_year, student_id__in=students.values(),
+                ).values_list('student_id', 'id', 'note_controle', 'note_examen').order_by()
+            }
+
+        now = timezone.now()
+        notes = []
+        for i, cne in enumerate(cnes):
+            if not valid[i]:
+                continue
+            student_id = students.get(cne)
+            if student_id is None:
+                self._error(line_numbers[i], cne, 'Étudiant introuvable')
+                continue
+            stored = previous[student_id][1] if student_id in previous else (None, None)
+            controle, examen = (
+                stored[0] if grade_columns[0][i] is None else grade_columns[0][i],
+                stored[1] if grade_columns[1][i] is None else grade_columns[1][i],
+            )
+            notes.append(Note(
+                student_id=student_id,
+                module=self.module,
+                academic_year=self.academic_year,
+                note_controle=controle,
+                note_examen=examen,
+                note_finale=Note.compute_finale(controle, examen, self.poids_controle),
+                saisie_par=self.user,
+                created_at=now,
+                updated_at=now,
+            ))
+            self._student_ids.add(student_id)
+
+        if notes and not self.dry_run:
+            Note.objects.bulk_create(
+                notes,
+                update_conflicts=True,
+                unique_fields=['student', 'module', 'academic_year'],
+                update_fields=['note_controle', 'note_examen', 'note_finale', 'saisie_par', 'updated_at'],
+            )
+            audit.record_many(self._audit_entries(notes, previous, now))
+            changefeed.record_grades(Note.objects.filter(
+                module=self.module, academic_year=self.academic_year,
+                student_id__in=[note.student_id for note in notes],
+            ).values_list('id', flat=True))
+        self.imported += len(notes)
+
+    def _audit_entries(self, notes, previous, now):
+        actor_id = self.user.pk if self.user else None
+        # Backends that cannot return ids from an upsert: one lookup for the new notes
+        missing = [note.student_id for note in notes if note.pk is None and note.student_id not in previous]
+        created_ids = dict(
+            Note.objects.filter(
+                module=self.module, academic_year=self.academic_year, student_id__in=missing,
+            ).values_list('student_id', 'id').order_by()
+        ) if missing else {}
+        entries = []
+        for note in notes:
+            new = (note.note_controle, note.note_examen)
+            if note.student_id in previous:
+                note_id, old = previous[note.student_id]
+                if [audit.encode(v) for v in old] == [audit.encode(v) for v in new]:
+                    continue
+                action = NoteAudit.ACTION_UPDATE
+            else:
+                note_id, old, action = note.pk or created_ids.get(note.student_id), (None, None), NoteAudit.ACTION_CREATE
+            entries.append(audit.entry(
+                note_id, action, old, new, actor_id=actor_id, source=NoteAudit.SOURCE_IMPORT, when=now,
+            ))
+        return entries
+
+
+def parse_grade(raw):
+    """'' -> None, '12,5' -> Decimal('12.50'); returns (value, error)"""
+    if raw == '':
+        return None, None
+    try:
+        value = Decimal(raw.replace(',', '.'))
+    except InvalidOperation:
+        return None, f"valeur invalide '{raw}'"
+    if not value.is_finite() or value < 0 or value > 20:
+        return None, f'{raw} hors de l\'intervalle 0-20'
+    return value.quantize(Decimal('0.01')), None
@@ -0,0 +1,101 @@
+"""
+Grading policy and set-based recompute of note_finale
+
+    note_finale = poids × note_controle + (1 - poids) × note_examen
+
+poids is Module.poids_controle, or the filiere's when the module has none.
+Note.save() applies it to one grade; when a policy changes, recompute()
+re-derives every affected grade with one UPDATE per batch, in SQL, with
+the arithmetic of Note.compute_finale (integer hundredths, half up):
+
+    FLOOR((c × w + e × (100 - w) + 50) / 100) / 100     c, e, w in hundredths
+
+Only rows whose value changes are written (updated_at bumped for delta
+sync, grade.published change-feed events). No per-row save(): the
+leaderboards of the touched filieres are rebuilt and the transcript cache
+invalidated once at the end.
+
+    python manage.py recompute_grades --filiere 3     # or the recompute_grades job
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, FloatField, IntegerField, Q, Value
+from django.db.models.functions import Cast, Coalesce, Floor, Round
+from django.utils import timezone
+
+from . import changefeed, rankings, transcripts
+from .models import Module, Note
+
+
+def _hundredths(expression):
+    return Cast(Round(expression * 100), IntegerField())
+
+
+def finale_expression(poids):
+    """SQL expression of note_finale for a contrôle weight `poids` (Decimal, 2 places)"""
+    weight = int(Decimal(poids) * 100)
+    total = (
+        _hundredths(F('note_controle')) * Value(weight)
+        + _hundredths(F('note_examen')) * Value(100 - weight)
+        + Value(50)
+    )
+    return Cast(Floor(Cast(total, FloatField()) / Value(100.0)) / Value(100.0), DecimalField(max_digits=5, decimal_places=2))
+
+
+def affected_modules(module_ids=None, filiere_id=None):
+    """[(module_id, filiere_id, effective poids)] of the modules to recompute"""
+    modules = Module.objects.all()
+    if module_ids is not None:
+        modules = modules.filter(id__in=module_ids)
+    if filiere_id is not None:
+        # A filiere policy change does not affect modules with their own weight
+        modules = modules.filter(filiere_id=filiere_id, poids_controle__isnull=True)
+    return list(
+        modules.annotate(poids=Coalesce('poids_controle', 'filiere__poids_controle'))
+        .values_list('id', 'filiere_id', 'poids').order_by('id')
+    )
+
+
+def recompute(module_ids=None, filiere_id=None, batch_size=2000, progress=None):
+    """
+    Re-derive note_finale of the notes of the given modules / filiere (everything by default).
+    progress(done, total) is called after each batch. Returns a summary dict.
+    """
+    modules = affected_modules(module_ids, filiere_id)
+    graded = Note.objects.filter(note_controle__isnull=False, note_examen__isnull=False)
+    total = graded.filter(module_id__in=[module_id for module_id, _, _ in modules]).count()
+    done = changed = 0
+    touched_filieres = set()
+
+    for module_id, module_filiere_id, poids in modules:
+        expression = finale_expression(poids)
+        notes = graded.filter(module_id=module_id)
+        last_id = 0
+        while True:
+            batch = list(notes.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+            if not batch:
+                break
+            in_batch = notes.filter(id__gt=last_id, id__lte=batch[-1])
+            last_id = batch[-1]
+            # Only rows whose final grade actually changes are written
+            stale = list(
+                in_batch.annotate(expected=expression)
+                .filter(Q(note_finale__isnull=True) | ~Q(note_finale=F('expected')))
+                .values_list('id', flat=True)
+            )
+            if stale:
+                with transaction.atomic():
+                    Note.objects.filter(id__in=stale).update(note_finale=expression, updated_at=timezone.now())
+                    changefeed.record_grades(stale)
+                changed += len(stale)
+                touched_filieres.add(module_filiere_id)
+            done += len(batch)
+            if progress:
+                progress(done, total)
+
+    for touched in touched_filieres:
+        rankings.refresh_filiere(touched)
+    if changed:
+        transcripts.invalidate_all()
+    return {'modules': len(modules), 'notes': done, 'changed': changed}
@@ -0,0 +1,258 @@
+"""
+Database-backed background jobs
+
+    job = jobs.enqueue('export_inscriptions', {'status': 'PENDING'}, user=request.user)
+
+Jobs are rows of core_job, executed by `python manage.py run_jobs`, which
+forks a pool of worker processes. Each worker claims the oldest QUEUED job
+with a conditional UPDATE, runs the registered task and stores its result.
+
+Tasks (see core/tasks.py) receive a JobContext as first argument:
+    job.progress(done, total, message)   # also raises JobCancelled when cancel was requested
+    job.check_cancelled()
+
+While a job runs, a heartbeat thread refreshes heartbeat_at and watches the
+cancel flag; RUNNING jobs whose heartbeat stopped (worker killed) are marked
+FAILED by the scheduler. JobSchedule rows are enqueued by the same scheduler.
+"""
+import inspect
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import metrics
+from .models import Job, JobSchedule
+
+
+DEFAULTS = {
+    'WORKERS': 2,
+    'POLL_SECONDS': 2,
+    'HEARTBEAT_SECONDS': 10,
+    'STALE_SECONDS': 60,  # RUNNING job without heartbeat for this long -> FAILED
+    'OUTPUT_DIR': None,   # files produced by jobs (exports)
+}
+
+TASKS = {}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def get_config():
+    config = {**DEFAULTS, **getattr(settings, 'JOBS', {})}
+    if not config['OUTPUT_DIR']:
+        config['OUTPUT_DIR'] = os.path.join(settings.BASE_DIR, 'job_outputs')
+    return config
+
+
+# ============================================
+# REGISTRY / ENQUEUE
+# ============================================
+def task(name, label='', api=True, roles=None):
+    """
+    Register a task; api=False keeps it out of POST /api/jobs/ (shell/schedules only),
+    roles restricts who may start it from the API (default: every role allowed on /api/jobs/)
+    """
+    def decorator(func):
+        TASKS[name] = {'func': func, 'label': label or name, 'api': api, 'roles': tuple(roles or ())}
+        return func
+    return decorator
+
+
+def startable(task_name, user):
+    """Can `user` start this task through POST /api/jobs/?"""
+    spec = TASKS.get(task_name)
+    if spec is None or not spec['api']:
+        return False
+    return not spec['roles'] or user.role in spec['roles']
+
+
+def validate(task_name, params):
+    """Reject unknown tasks and parameters before anything is queued"""
+    if task_name not in TASKS:
+        raise ValueError(f"Tâche inconnue: {task_name}")
+    try:
+        inspect.signature(TASKS[task_name]['func']).bind(None, **params)
+    except TypeError as e:
+        raise ValueError(f"Paramètres invalides pour {task_name}: {e}")
+
+
+def enqueue(task_name, params=None, user=None, schedule=None):
+    params = params or {}
+    validate(task_name, params)
+    return Job.objects.create(task=task_name, params=params, created_by=user, schedule=schedule)
+
+
+def cancel(job):
+    """QUEUED jobs are cancelled at once, RUNNING ones stop at their next progress() call"""
+    now = timezone.now()
+    if Job.objects.filter(pk=job.pk, status='QUEUED').update(status='CANCELLED', cancel_requested=True, finished_at=now):
+        job.refresh_from_db()
+        return job
+    Job.objects.filter(pk=job.pk, status='RUNNING').update(cancel_requested=True)
+    job.refresh_from_db()
+    return job
+
+
+# ============================================
+# EXECUTION
+# ============================================
+class JobContext:
+    def __init__(self, job):
+        self.job = job
+        self.params = job.params
+        self._cancelled = threading.Event()
+        self._last_write = 0.0
+
+    def check_cancelled(self):
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def progress(self, done, total=None, message=''):
+        self.check_cancelled()
+        percent = min(100, int(done * 100 / total)) if total else done
+        now = time.monotonic()
+        # Throttled: at most one UPDATE per second
+        if now - self._last_write >= 1 or percent >= 100:
+            self._last_write = now
+            Job.objects.filter(pk=self.job.pk).update(progress=percent, progress_message=message[:255])
+
+    def output_path(self, filename):
+        directory = get_config()['OUTPUT_DIR']
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"job{self.job.pk}_{filename}")
+
+
+def output_file(filename):
+    """Absolute path of a job output, None if missing or outside OUTPUT_DIR"""
+    directory = os.path.realpath(get_config()['OUTPUT_DIR'])
+    path = os.path.realpath(os.path.join(directory, filename))
+    if os.path.dirname(path) != directory or not os.path.isfile(path):
+        return None
+    return path
+
+
+def save_upload(upload):
+    """Store an uploaded file for a job (input files live next to the outputs); returns its path"""
+    directory = get_config()['OUTPUT_DIR']
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"upload_{uuid.uuid4().hex}{os.path.splitext(upload.name)[1].lower()}")
+    with open(path, 'wb') as f:
+        for chunk in upload.chunks():
+            f.write(chunk)
+    return path
+
+
+def _heartbeat(job_id, context, stop, interval):
+    """Runs in a thread next to the task: keeps the job alive, relays cancellation"""
+    try:
+        while not stop.wait(interval):
+            Job.objects.filter(pk=job_id).update(heartbeat_at=timezone.now())
+            if Job.objects.filter(pk=job_id, cancel_requested=True).exists():
+                context._cancelled.set()
+    finally:
+        connection.close()
+
+
+def claim_next(worker_name):
+    """Oldest QUEUED job, claimed with a conditional UPDATE (safe across workers)"""
+    while True:
+        job_id = Job.objects.filter(status='QUEUED').order_by('created_at', 'id').values_list('id', flat=True).first()
+        if job_id is None:
+            return None
+        now = timezone.now()
+        if Job.objects.filter(pk=job_id, status='QUEUED').update(
+            status='RUNNING', worker=worker_name, started_at=now, heartbeat_at=now
+        ):
+            return Job.objects.get(pk=job_id)
+
+
+def execute(job):
+    """Run one claimed job to completion; returns its final status"""
+    config = get_config()
+    context = JobContext(job)
+    stop = threading.Event()
+    beat = threading.Thread(
+        target=_heartbeat, args=(job.pk, context, stop, config['HEARTBEAT_SECONDS']), daemon=True
+    )
+    beat.start()
+    changes = {}
+    try:
+        result = TASKS[job.task]['func'](context, **job.params)
+        changes = {'status': 'SUCCEEDED', 'progress': 100, 'result': result}
+    except JobCancelled:
+        changes = {'status': 'CANCELLED'}
+    except Exception as e:
+        changes = {'status': 'FAILED', 'error': f"{type(e).__name__}: {e}\n\n{traceback.format_exc()}"[:10000]}
+    finally:
+        stop.set()
+        beat.join()
+        Job.objects.filter(pk=job.pk).update(finished_at=timezone.now(), **changes)
+        metrics.JOBS.inc(task=job.task, status=changes.get('status', 'FAILED'))
+    return changes['status']
+
+
+def worker_loop(stop_event=None, poll_seconds=None, max_jobs=None):
+    """Claim and run jobs until stop_event is set (or max_jobs jobs ran)"""
+    poll_seconds = poll_seconds or get_config()['POLL_SECONDS']
+    worker_name = f"{socket.gethostname()}:{os.getpid()}"
+    done = 0
+    while not (stop_event and stop_event.is_set()):
+        close_old_connections()
+        job = claim_next(worker_name)
+        if job is None:
+            if max_jobs is not None:
+                return done
+            time.sleep(poll_seconds)
+            continue
+        execute(job)
+        done += 1
+        if max_jobs is not None and done >= max_jobs:
+            return done
+    return done
+
+
+# ============================================
+# SCHEDULER (run_jobs parent process)
+# ============================================
+def enqueue_due_schedules(now=None):
+    """Enqueue every due JobSchedule once, even with several schedulers running"""
+    now = now or timezone.now()
+    enqueued = []
+    for schedule in JobSchedule.objects.filter(enabled=True, next_run_at__lte=now):
+        next_run_at = now + timedelta(minutes=schedule.interval_minutes)
+        with transaction.atomic():
+            # Compare-and-set on next_run_at: only one scheduler wins this run
+            if not JobSchedule.objects.filter(pk=schedule.pk, next_run_at=schedule.next_run_at).update(next_run_at=next_run_at):
+                continue
+            # Previous run still queued/running: skip this occurrence
+            if schedule.jobs.filter(status__in=Job.ACTIVE_STATUSES).exists():
+                continue
+            try:
+                enqueued.append(enqueue(schedule.task, schedule.params, schedule=schedule))
+            except ValueError as e:
+                # Misconfigured schedule: keep a visible trace instead of stopping the scheduler
+                Job.objects.create(
+                    task=schedule.task, params=schedule.params, schedule=schedule,
+                    status='FAILED', error=str(e), finished_at=now,
+                )
+    return enqueued
+
+
+def reap_stale_jobs(now=None):
+    """RUNNING jobs whose worker stopped sending heartbeats"""
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=get_config()['STALE_SECONDS'])
+    return Job.objects.filter(status='RUNNING').filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True)
+    ).update(status='FAILED', error='Worker arrêté pendant l\'exécution (heartbeat perdu).', finished_at=now)
@@ -0,0 +1,61 @@
+"""
+Management command moving a closed academic year to the archive tables
+Usage: python manage.py archive_year 2021-2022 [--dry-run] [--force]
+       python manage.py archive_year 2021-2022 --restore
+       python manage.py archive_year --list
+
+See core/archive.py. --force archives a year among ARCHIVE['KEEP_YEARS']
+most recent ones or with pending inscriptions.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core import archive
+from core.models import ArchivedYear, Inscription, Note
+
+
+class Command(BaseCommand):
+    help = 'Archive (or restore) the inscriptions and grades of one academic year'
+
+    def add_arguments(self, parser):
+        parser.add_argument('academic_year', nargs='?', help='Format: 2021-2022')
+        parser.add_argument('--restore', action='store_true', help='Move the archived year back to the hot tables')
+        parser.add_argument('--dry-run', action='store_true', help='Show what would be moved without moving it')
+        parser.add_argument('--force', action='store_true', help='Archive even a current year or one with pending inscriptions')
+        parser.add_argument('--list', action='store_true', help='List hot and archived academic years')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            self.stdout.write(self.style.MIGRATE_HEADING('🔥 Hot years'))
+            for year in archive.hot_years():
+                self.stdout.write(f'   {year}')
+            self.stdout.write(self.style.MIGRATE_HEADING('🧊 Archived years'))
+            for archived in ArchivedYear.objects.all():
+                self.stdout.write(f'   {archived}')
+            return
+
+        year = options['academic_year']
+        if not year:
+            raise CommandError('academic_year is required (or --list)')
+
+        if options['dry_run']:
+            if options['restore']:
+                self.stdout.write(f"Would restore {year}: archived={archive.is_archived(year)}")
+            else:
+                inscriptions = Inscription.objects.filter(academic_year=year).count()
+                notes = Note.objects.filter(academic_year=year).count()
+                self.stdout.write(f'Would archive {year}: {inscriptions} inscriptions, {notes} notes')
+            return
+
+        try:
+            if options['restore']:
+                counts = archive.restore_year(year)
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ {year} restored: {counts['inscription']} inscriptions, {counts['note']} notes"
+                ))
+            else:
+                archived = archive.archive_year(year, force=options['force'])
+                self.stdout.write(self.style.SUCCESS(
+                    f'✅ {year} archived: {archived.inscriptions_count} inscriptions, {archived.notes_count} notes'
+                ))
+        except archive.ArchiveError as e:
+            raise CommandError(str(e))
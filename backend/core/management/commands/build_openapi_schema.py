@@ -0,0 +1,27 @@
+"""
+Management command generating the OpenAPI schema served by /api/schema/
+Usage: python manage.py build_openapi_schema [--force]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import openapi
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema for the current code version (run at build/deploy time)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate even if the schema of this version exists')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        version, created = openapi.build(force=options['force'])
+        if not created:
+            self.stdout.write(self.style.SUCCESS(f'✅ Schema of version {version} already built'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Schema of version {version} written to {openapi.get_config()["DIR"]} '
+            f'in {time.perf_counter() - start:.2f}s'
+        ))
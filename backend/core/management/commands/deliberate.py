@@ -0,0 +1,34 @@
+"""
+Management command to run a semester deliberation for a whole filiere
+Usage: python manage.py deliberate --filiere 1 --semestre 1 --academic-year 2024-2025 [--passing 10] [--eliminatory 5]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.deliberation import deliberate
+from core.models import Filiere
+
+
+class Command(BaseCommand):
+    help = 'Compute pass/fail, compensation and rank for every student of a filiere'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filiere', type=int, required=True, help='Filiere ID')
+        parser.add_argument('--semestre', type=int, required=True, help='Semestre (1-6)')
+        parser.add_argument('--academic-year', type=str, required=True, help='Format: 2024-2025')
+        parser.add_argument('--passing', type=float, default=10, help='Moyenne de validation (default: 10)')
+        parser.add_argument('--eliminatory', type=float, default=5, help='Note éliminatoire (default: 5)')
+
+    def handle(self, *args, **options):
+        try:
+            filiere = Filiere.objects.get(id=options['filiere'])
+        except Filiere.DoesNotExist:
+            raise CommandError(f"Filiere {options['filiere']} not found")
+
+        result = deliberate(
+            filiere, options['semestre'], options['academic_year'],
+            passing=options['passing'], eliminatory=options['eliminatory'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Délibération #{result.id}: {result.admitted_count}/{result.student_count} admis '
+            f'({result.module_count} modules, moyenne {result.class_average}) en {result.duration_ms:.0f} ms'
+        ))
@@ -0,0 +1,41 @@
+"""
+Management command queuing a background job (executed by run_jobs)
+Usage: python manage.py enqueue_job export_inscriptions status=PENDING filiere=1
+       python manage.py enqueue_job --list
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = 'Queue a background job with key=value parameters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('task', nargs='?', help='Task name (see --list)')
+        parser.add_argument('params', nargs='*', help='key=value parameters (values parsed as JSON when possible)')
+        parser.add_argument('--list', action='store_true', help='List the available tasks')
+
+    def handle(self, *args, **options):
+        if options['list'] or not options['task']:
+            for name, spec in sorted(jobs.TASKS.items()):
+                self.stdout.write(f"   • {name}: {spec['label']}")
+            return
+
+        params = {}
+        for item in options['params']:
+            key, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f'Paramètre invalide "{item}" (attendu: clé=valeur)')
+            try:
+                params[key] = json.loads(value)
+            except ValueError:
+                params[key] = value
+
+        try:
+            job = jobs.enqueue(options['task'], params)
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f'✅ Tâche #{job.id} ({job.task}) mise en file'))
@@ -0,0 +1,54 @@
+"""
+Management command to import a grade sheet (CSV or XLSX) for one module
+Usage: python manage.py import_grades --module 1 --academic-year 2024-2025 --file notes.csv [--dry-run]
+"""
+import time
+import zipfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.archive import ArchiveError
+from core.grade_import import GradeImporter, iter_rows
+from core.models import Module
+
+
+class Command(BaseCommand):
+    help = 'Bulk import grades (cne ; note_controle ; note_examen) for a module'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', type=int, required=True, help='Module ID')
+        parser.add_argument('--academic-year', type=str, required=True, help='Format: 2024-2025')
+        parser.add_argument('--file', type=str, required=True, help='Path to a .csv or .xlsx file')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, write nothing')
+
+    def handle(self, *args, **options):
+        try:
+            module = Module.objects.get(id=options['module'])
+        except Module.DoesNotExist:
+            raise CommandError(f"Module {options['module']} not found")
+
+        try:
+            importer = GradeImporter(
+                module, options['academic_year'],
+                batch_size=options['batch_size'], dry_run=options['dry_run'],
+            )
+        except ArchiveError as e:
+            raise CommandError(str(e))
+        start = time.perf_counter()
+        try:
+            with open(options['file'], 'rb') as f:
+                report = importer.run(iter_rows(f, options['file']))
+        except OSError as e:
+            raise CommandError(str(e))
+        except (ValueError, UnicodeDecodeError, zipfile.BadZipFile) as e:
+            raise CommandError(f'Fichier illisible: {e}')
+        elapsed = time.perf_counter() - start
+
+        for error in report['errors']:
+            self.stdout.write(self.style.WARNING(f"  Ligne {error['line']} ({error['cne']}): {error['error']}"))
+        verb = 'validées' if report['dry_run'] else 'importées'
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {report['imported']}/{report['lines']} notes {verb} "
+            f"({report['error_count']} erreurs) en {elapsed:.1f}s"
+        ))
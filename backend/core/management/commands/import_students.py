@@ -0,0 +1,49 @@
+"""
+Management command to provision student accounts from a CSV or XLSX file
+Usage: python manage.py import_students --file etudiants.csv [--dry-run] [--workers 8] [--no-emails]
+
+File columns: cne ; last_name ; first_name ; email [; password]
+See core/student_import.py.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.grade_import import iter_rows
+from core.student_import import StudentImporter
+
+
+class Command(BaseCommand):
+    help = 'Bulk create student accounts (cne ; last_name ; first_name ; email [; password])'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', type=str, required=True, help='Path to a .csv or .xlsx file')
+        parser.add_argument('--batch-size', type=int, default=None, help='Accounts per INSERT')
+        parser.add_argument('--workers', type=int, default=None, help='Password hashing processes (default: one per CPU)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, write nothing')
+        parser.add_argument('--no-emails', action='store_true', help='Do not queue the welcome emails')
+
+    def handle(self, *args, **options):
+        importer = StudentImporter(
+            batch_size=options['batch_size'],
+            hash_workers=options['workers'],
+            dry_run=options['dry_run'],
+            send_emails=not options['no_emails'],
+            progress=lambda lines: self.stdout.write(f'   {lines} lignes traitées', ending='\r'),
+        )
+        try:
+            with open(options['file'], 'rb') as f:
+                report = importer.run(iter_rows(f, options['file']))
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            self.stdout.write(self.style.WARNING(f"  Ligne {error['line']} ({error['cne']}): {error['error']}"))
+        if report['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {report['created']}/{report['lines']} comptes valides ({report['error_count']} erreurs)"
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {report['created']}/{report['lines']} comptes créés ({report['error_count']} erreurs) "
+            f"en {report['elapsed_seconds']}s - {report['users_per_second']} utilisateurs/s "
+            f"(hachage: {report['hash_seconds']}s), {report['emails_queued']} emails en file"
+        ))
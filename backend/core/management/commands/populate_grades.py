@@ -4,6 +4,7 @@ from core.models import Inscription, Module, Note
 
 class Command(BaseCommand):
     help = 'Génère des notes réalistes pour les étudiants validés'
+    stealth_options = ('progress',)  # callback(done, total) passed by the background job
 
     def handle(self, *args, **kwargs):
         self.stdout.write(self.style.WARNING("🚀 Démarrage de la génération des notes..."))
@@ -19,9 +20,13 @@ class Command(BaseCommand):
         count = 0
         updated = 0
 
-        self.stdout.write(f"ℹ️  Traitement de {inscriptions.count()} étudiants...")
+        total = inscriptions.count()
+        progress = kwargs.get('progress')
+        self.stdout.write(f"ℹ️  Traitement de {total} étudiants...")
 
-        for inscription in inscriptions:
+        for done, inscription in enumerate(inscriptions, 1):
+            if progress:
+                progress(done, total)
             student = inscription.student
             filiere = inscription.filiere
             academic_year = inscription.academic_year
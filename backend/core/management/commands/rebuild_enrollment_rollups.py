@@ -0,0 +1,16 @@
+"""
+Management command to rebuild the enrollment rollup table from inscriptions (archived years included)
+Usage: python manage.py rebuild_enrollment_rollups
+"""
+from django.core.management.base import BaseCommand
+
+from core import rollups
+from core.models import ArchivedInscription, EnrollmentRollup, Inscription
+
+
+class Command(BaseCommand):
+    help = 'Recompute daily enrollment rollups (created/validated/rejected per filiere)'
+
+    def handle(self, *args, **options):
+        buckets = rollups.rebuild(Inscription, EnrollmentRollup, ArchivedInscription)
+        self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt {buckets} daily rollup rows'))
@@ -0,0 +1,27 @@
+"""
+Management command to rebuild the per-filiere leaderboard
+Usage: python manage.py rebuild_rankings [--filiere 1]
+"""
+from django.core.management.base import BaseCommand
+
+from core import rankings
+
+
+class Command(BaseCommand):
+    help = 'Recompute leaderboard averages and dense ranks (per filiere and academic year)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--filiere',
+            type=int,
+            help='Only rebuild this filiere',
+        )
+
+    def handle(self, *args, **options):
+        if options['filiere']:
+            rankings.refresh_filiere(options['filiere'])
+            self.stdout.write(self.style.SUCCESS(f"✅ Leaderboard of filiere {options['filiere']} rebuilt"))
+            return
+
+        partitions = rankings.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt {partitions} leaderboard partitions (filiere × année)'))
@@ -0,0 +1,47 @@
+"""
+Management command to rebuild the search index (users, modules, filieres)
+Usage: python manage.py rebuild_search_index [--batch-size 1000]
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core import search
+from core.models import Filiere, Module, SearchEntry
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search index used by /api/search/'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Documents inserted per bulk_create (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        use_fts = search.uses_fts()
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                # Drop the FTS5 table and triggers, reload documents, then index them in one pass
+                if use_fts:
+                    for sql in search.DROP_FTS_SQL:
+                        cursor.execute(sql)
+                total = search.rebuild(User, Module, Filiere, SearchEntry, batch_size=options['batch_size'])
+                if use_fts:
+                    for sql in search.CREATE_FTS_SQL:
+                        cursor.execute(sql)
+                    cursor.execute(search.REBUILD_FTS_SQL)
+
+        elapsed = time.perf_counter() - start
+        backend = 'FTS5' if use_fts else 'LIKE fallback'
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Indexed {total} documents in {elapsed:.2f}s ({backend})')
+        )
@@ -0,0 +1,35 @@
+"""
+Management command re-deriving note_finale from the grading policy
+Usage: python manage.py recompute_grades                  # every module
+       python manage.py recompute_grades --module 12 --module 13
+       python manage.py recompute_grades --filiere 3      # modules following the filiere policy
+
+See core/grading.py. Changing Module/Filiere.poids_controle already
+enqueues the recompute_grades job; this command is for manual repairs.
+"""
+from django.core.management.base import BaseCommand
+
+from core import grading
+
+
+class Command(BaseCommand):
+    help = 'Recompute the final grades with the per-module grading policy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', type=int, action='append', help='Module id (repeatable)')
+        parser.add_argument('--filiere', type=int, help='Filiere id')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Notes per UPDATE')
+
+    def handle(self, *args, **options):
+        def progress(done, total):
+            self.stdout.write(f'   {done}/{total} notes', ending='\r')
+
+        summary = grading.recompute(
+            module_ids=options['module'],
+            filiere_id=options['filiere'],
+            batch_size=options['batch_size'],
+            progress=progress if options['verbosity'] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {summary['modules']} modules, {summary['notes']} notes checked, {summary['changed']} updated"
+        ))
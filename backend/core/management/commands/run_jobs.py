@@ -0,0 +1,83 @@
+"""
+Management command running background jobs (core.jobs) with a pool of worker processes
+Usage: python manage.py run_jobs [--workers 2] [--interval 2] [--once]
+"""
+import multiprocessing
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import jobs
+
+
+def _worker_main(stop_event, poll_seconds):
+    """Entry point of a worker process (works with fork and spawn start methods)"""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    # Ctrl-C / SIGTERM are handled by the parent, which sets stop_event:
+    # workers then exit after their current job
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    from core import jobs as worker_jobs
+    worker_jobs.worker_loop(stop_event, poll_seconds)
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs, scheduled jobs and stale job recovery'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: JOBS["WORKERS"])')
+        parser.add_argument('--interval', type=float, default=None, help='Polling interval in seconds')
+        parser.add_argument('--once', action='store_true', help='Run due schedules and queued jobs in this process, then exit')
+
+    def handle(self, *args, **options):
+        config = jobs.get_config()
+        interval = options['interval'] or config['POLL_SECONDS']
+
+        if options['once']:
+            jobs.reap_stale_jobs()
+            jobs.enqueue_due_schedules()
+            done = jobs.worker_loop(max_jobs=10 ** 9)
+            self.stdout.write(self.style.SUCCESS(f'✅ {done} tâche(s) exécutée(s)'))
+            return
+
+        workers = options['workers'] or config['WORKERS']
+        stop_event = multiprocessing.Event()
+        # Children must not inherit the parent's database connections
+        connections.close_all()
+        pool = [self._start(stop_event, interval) for _ in range(workers)]
+        self.stdout.write(self.style.SUCCESS(f'🚀 {workers} worker(s) démarré(s)'))
+
+        # SIGTERM behaves like Ctrl-C (setting the Event from a signal handler could deadlock)
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            while not stop_event.is_set():
+                reaped = jobs.reap_stale_jobs()
+                if reaped:
+                    self.stdout.write(self.style.WARNING(f'⚠️  {reaped} tâche(s) sans heartbeat marquée(s) en échec'))
+                for job in jobs.enqueue_due_schedules():
+                    self.stdout.write(f'⏰ Tâche planifiée #{job.id} ({job.task}) mise en file')
+                connections.close_all()
+                # Restart crashed workers (their job is recovered by reap_stale_jobs)
+                for i, process in enumerate(pool):
+                    if not process.is_alive():
+                        self.stdout.write(self.style.WARNING(f'⚠️  Worker {process.pid} arrêté, redémarrage'))
+                        pool[i] = self._start(stop_event, interval)
+                stop_event.wait(interval)
+        except KeyboardInterrupt:
+            stop_event.set()
+        self.stdout.write('⏳ Arrêt: fin des tâches en cours...')
+        for process in pool:
+            process.join()
+        self.stdout.write(self.style.SUCCESS('✅ Workers arrêtés'))
+
+    def _start(self, stop_event, interval):
+        process = multiprocessing.Process(target=_worker_main, args=(stop_event, interval), daemon=False)
+        process.start()
+        return process
@@ -0,0 +1,32 @@
+"""
+Management command delivering the email outbox (OutboundEmail)
+Usage: python manage.py send_emails [--once] [--batch-size 100] [--interval 5]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.emails import process_queue, undelivered_credentials
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails in batches over one SMTP connection, with retries and backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the due emails then exit')
+        parser.add_argument('--batch-size', type=int, default=None, help='Emails per SMTP connection')
+        parser.add_argument('--interval', type=float, default=5, help='Polling interval in seconds (default: 5)')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = process_queue(batch_size=options['batch_size'])
+            if any(stats.values()) or options['once']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ {stats['sent']} envoyés, {stats['retry']} reprogrammés, {stats['failed']} en échec"
+                ))
+            if stats['failed']:
+                for address in undelivered_credentials():
+                    self.stdout.write(self.style.WARNING(f"  Identifiants non remis à {address}: réinitialiser le mot de passe"))
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,97 @@
+"""
+Management command to browse the slow-query log
+Usage: python manage.py slow_queries [--limit 20] [--order total|max|calls|recent] [--view core:inscription-list]
+       python manage.py slow_queries --show 12
+       python manage.py slow_queries --clear
+"""
+from django.core.management.base import BaseCommand, CommandError
+from core.models import SlowQuery
+
+
+ORDERINGS = {
+    'total': '-total_time_ms',
+    'max': '-max_time_ms',
+    'calls': '-calls',
+    'recent': '-last_seen',
+}
+
+
+class Command(BaseCommand):
+    help = 'List slow queries captured by SlowQueryMiddleware (grouped by SQL fingerprint)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Number of fingerprints to show (default: 20)',
+        )
+        parser.add_argument(
+            '--order',
+            choices=ORDERINGS.keys(),
+            default='total',
+            help='Sort by total time, max time, call count or last seen',
+        )
+        parser.add_argument(
+            '--view',
+            type=str,
+            help='Only show queries issued by this view name',
+        )
+        parser.add_argument(
+            '--show',
+            type=int,
+            help='Show full SQL and EXPLAIN plan for one entry',
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete every captured entry',
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted = SlowQuery.objects.all().delete()[0]
+            self.stdout.write(self.style.SUCCESS(f'✅ Deleted {deleted} slow-query entries'))
+            return
+
+        if options['show']:
+            self.show(options['show'])
+            return
+
+        queries = SlowQuery.objects.order_by(ORDERINGS[options['order']])
+        if options['view']:
+            queries = queries.filter(view=options['view'])
+        queries = queries[:options['limit']]
+
+        if not queries:
+            self.stdout.write(self.style.SUCCESS('✅ No slow queries recorded'))
+            return
+
+        self.stdout.write(
+            f"{'ID':>5}  {'CALLS':>6}  {'TOTAL ms':>10}  {'AVG ms':>8}  {'MAX ms':>8}  CALL SITE / SQL"
+        )
+        for query in queries:
+            avg = query.total_time_ms / query.calls if query.calls else 0
+            self.stdout.write(
+                f'{query.id:>5}  {query.calls:>6}  {query.total_time_ms:>10.1f}  '
+                f'{avg:>8.1f}  {query.max_time_ms:>8.1f}  {query.view}:{query.action}'
+            )
+            self.stdout.write(f'{"":>46}{query.normalized_sql[:120]}')
+
+    def show(self, pk):
+        try:
+            query = SlowQuery.objects.get(pk=pk)
+        except SlowQuery.DoesNotExist:
+            raise CommandError(f'Slow query {pk} not found')
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Slow query #{query.id}'))
+        self.stdout.write(f'Call site   : {query.view}:{query.action}')
+        self.stdout.write(f'Calls       : {query.calls} (total {query.total_time_ms:.1f} ms, max {query.max_time_ms:.1f} ms)')
+        self.stdout.write(f'Params      : ({query.params_shape})')
+        self.stdout.write(f'First/last  : {query.first_seen:%Y-%m-%d %H:%M} / {query.last_seen:%Y-%m-%d %H:%M}')
+        self.stdout.write(self.style.MIGRATE_HEADING('\nNormalized SQL'))
+        self.stdout.write(query.normalized_sql)
+        self.stdout.write(self.style.MIGRATE_HEADING('\nSample SQL'))
+        self.stdout.write(query.sample_sql)
+        self.stdout.write(self.style.MIGRATE_HEADING('\nEXPLAIN'))
+        self.stdout.write(query.explain_plan or '(not captured)')
@@ -0,0 +1,104 @@
+"""
+Management command measuring worker cold start (fresh interpreter per run)
+Usage: python manage.py startup_profile [--path /api/filieres/] [--runs 3] [--no-warmup] [--top 20]
+
+Phases: interpreter + django.setup(), WSGI handler, warm-up (core/warmup.py),
+first request, second request. Import time per package and the slowest
+modules come from `python -X importtime`.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+CHILD = r'''
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+phases = {'setup': time.perf_counter() - start}
+
+mark = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+phases['wsgi_handler'] = time.perf_counter() - mark
+
+mark = time.perf_counter()
+if sys.argv[2] == '1':
+    from core.warmup import warm_up
+    warm_up()
+phases['warmup'] = time.perf_counter() - mark
+
+from django.test import Client
+client = Client(SERVER_NAME='localhost')
+for name in ('first_request', 'second_request'):
+    mark = time.perf_counter()
+    status = client.get(sys.argv[1]).status_code
+    phases[name] = time.perf_counter() - mark
+phases['total'] = time.perf_counter() - start
+print(json.dumps({'phases': phases, 'status': status}))
+'''
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from `-X importtime` output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+class Command(BaseCommand):
+    help = 'Measure cold start: import time per package, setup, warm-up and first request latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/filieres/', help='URL of the first request (default: /api/filieres/)')
+        parser.add_argument('--runs', type=int, default=3, help='Fresh interpreters to start (median reported)')
+        parser.add_argument('--no-warmup', action='store_true', help='Skip core.warmup before the first request')
+        parser.add_argument('--top', type=int, default=15, help='Packages/modules listed (default: 15)')
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)}
+        warm = '0' if options['no_warmup'] else '1'
+        runs = []
+        for _ in range(options['runs']):
+            proc = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', CHILD, options['path'], warm],
+                capture_output=True, text=True, env=env, cwd=settings.BASE_DIR,
+            )
+            if proc.returncode != 0:
+                raise CommandError(proc.stderr[-2000:])
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            runs.append((result, parse_importtime(proc.stderr)))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"⏱️  Cold start, median of {len(runs)} run(s), warm-up {'on' if warm == '1' else 'off'}, "
+            f"GET {options['path']} -> {runs[-1][0]['status']}"
+        ))
+        for phase in runs[0][0]['phases']:
+            value = statistics.median(result['phases'][phase] for result, _ in runs)
+            self.stdout.write(f"   {phase:<16} {value * 1000:9.1f} ms")
+
+        # Import breakdown of the last run
+        modules = runs[-1][1]
+        by_package = defaultdict(int)
+        for name, self_us, _, _ in modules:
+            by_package[name.split('.')[0]] += self_us
+        total_us = sum(by_package.values())
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n📦 Import time by package (self, total {total_us / 1000:.1f} ms)'))
+        for package, us in sorted(by_package.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f"   {package:<32} {us / 1000:8.1f} ms  {us * 100 / total_us:5.1f}%")
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\n🐢 Slowest module imports (cumulative)'))
+        for name, _, cumulative_us, depth in sorted(modules, key=lambda m: -m[2])[:options['top']]:
+            self.stdout.write(f"   {name:<48} {cumulative_us / 1000:8.1f} ms  (depth {depth})")
@@ -0,0 +1,363 @@
+"""
+In-process metrics registry for ACADEMIYA-Hub (Prometheus text format)
+
+Usage:
+    from core import metrics
+    metrics.INSCRIPTIONS_CREATED.inc()
+    metrics.REQUEST_LATENCY.observe(0.12, route='inscriptions/', action='list', ...)
+
+Multi-process (gunicorn/uvicorn workers):
+    Set METRICS_MULTIPROC_DIR to a directory shared by all workers.
+    Each worker periodically dumps its own samples to <dir>/<pid>.json and
+    the /metrics endpoint merges every file, so counters and histograms are
+    summed across processes.
+    Files left by dead workers are folded into <dir>/archive.json (and so are
+    stale files found by a new worker that reuses a PID), which keeps the
+    directory bounded and the totals monotonic. PID liveness is checked with
+    os.kill(pid, 0): the directory must not be shared across hosts.
+
+Access:
+    /metrics answers clients listed in METRICS_ALLOWED_IPS, or requests
+    carrying "Authorization: Bearer <METRICS_TOKEN>". See scrape_allowed().
+"""
+import hmac
+import ipaddress
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, dev servers are single-process
+    fcntl = None
+
+from django.conf import settings
+
+
+# Default latency buckets (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# ============================================
+# METRIC TYPES
+# ============================================
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def snapshot(self):
+        """Return a JSON-friendly copy of the samples: {label_tuple: value}"""
+        with self._lock:
+            return {key: self._copy(value) for key, value in self._values.items()}
+
+    def _copy(self, value):
+        return value
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            sample = self._values.get(key)
+            if sample is None:
+                # [bucket counts..., +Inf count, sum]
+                sample = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    sample[i] += 1
+            sample[len(self.buckets)] += 1
+            sample[-1] += value
+
+    def _copy(self, value):
+        return list(value)
+
+
+# ============================================
+# REGISTRY
+# ============================================
+ARCHIVE_FILE = 'archive.json'
+LOCK_FILE = '.lock'
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._last_flush = 0.0
+        self._flushed_pid = None
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    # ---- multi-process support ----
+    def _multiproc_dir(self):
+        return getattr(settings, 'METRICS_MULTIPROC_DIR', None)
+
+    def flush(self, force=False):
+        """Dump this process' samples to the shared directory (rate limited)"""
+        directory = self._multiproc_dir()
+        if not directory:
+            return
+        now = time.monotonic()
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0)
+        if not force and now - self._last_flush < interval:
+            return
+        self._last_flush = now
+
+        data = {
+            name: [[list(key), value] for key, value in metric.snapshot().items()]
+            for name, metric in self._metrics.items()
+        }
+        os.makedirs(directory, exist_ok=True)
+        pid = os.getpid()
+        path = os.path.join(directory, f'{pid}.json')
+        if self._flushed_pid != pid:
+            # First dump of this process: a file with our PID belongs to a dead
+            # worker (PID reuse), archive it rather than overwrite its totals
+            with _locked(directory):
+                _archive(directory, path)
+            self._flushed_pid = pid
+        _write_json(path, data)
+
+    def collect(self):
+        """Return merged samples {name: {label_tuple: value}} for all processes"""
+        directory = self._multiproc_dir()
+        if not directory:
+            return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+        self.flush(force=True)
+        merged = {name: {} for name in self._metrics}
+        with _locked(directory):
+            # Fold dead workers into the archive first, then merge what is left
+            for filename in os.listdir(directory):
+                pid = filename[:-len('.json')]
+                if filename.endswith('.json') and pid.isdigit() and not _alive(int(pid)):
+                    _archive(directory, os.path.join(directory, filename))
+            for filename in os.listdir(directory):
+                if filename.endswith('.json'):
+                    _merge(merged, _read_json(os.path.join(directory, filename)))
+        return merged
+
+    # ---- exposition ----
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        samples = self.collect()
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            for key, value in sorted(samples.get(name, {}).items()):
+                labels = list(zip(metric.labelnames, key))
+                if metric.type == 'histogram':
+                    for bound, count in zip(metric.buckets, value):
+                        lines.append(f'{name}_bucket{_labels(labels + [("le", repr(bound))])} {count}')
+                    lines.append(f'{name}_bucket{_labels(labels + [("le", "+Inf")])} {value[len(metric.buckets)]}')
+                    lines.append(f'{name}_count{_labels(labels)} {value[len(metric.buckets)]}')
+                    lines.append(f'{name}_sum{_labels(labels)} {value[-1]}')
+                else:
+                    lines.append(f'{name}{_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _merge(merged, data):
+    """Add the samples of one dump into merged (only for known metric names)"""
+    for name, samples in data.items():
+        if name not in merged:
+            continue
+        for key, value in samples:
+            key = tuple(key)
+            current = merged[name].get(key)
+            if current is None:
+                merged[name][key] = value
+            elif isinstance(value, list):
+                merged[name][key] = [a + b for a, b in zip(current, value)]
+            else:
+                merged[name][key] = current + value
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path, data):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _archive(directory, path):
+    """Fold a dead worker's dump into archive.json and remove it (caller holds the lock)"""
+    if not os.path.exists(path):
+        return
+    data = _read_json(path)
+    archive_path = os.path.join(directory, ARCHIVE_FILE)
+    merged = {}
+    for source in (_read_json(archive_path), data):
+        for name in source:
+            merged.setdefault(name, {})
+        _merge(merged, source)
+    _write_json(archive_path, {
+        name: [[list(key), value] for key, value in samples.items()]
+        for name, samples in merged.items()
+    })
+    os.remove(path)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _locked:
+    """Exclusive lock on the shared directory (no-op without fcntl)"""
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, LOCK_FILE)
+        self.file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self.file = open(self.path, 'a')
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self.file is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+
+
+# ============================================
+# ACCESS CONTROL
+# ============================================
+def scrape_allowed(request):
+    """True if the client IP is in METRICS_ALLOWED_IPS or presents METRICS_TOKEN"""
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if token and header.startswith('Bearer '):
+        if hmac.compare_digest(header[len('Bearer '):].strip().encode(), token.encode()):
+            return True
+
+    try:
+        client = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    for allowed in getattr(settings, 'METRICS_ALLOWED_IPS', ()):
+        try:
+            if client in ipaddress.ip_network(allowed, strict=False):
+                return True
+        except ValueError:
+            continue
+    return False
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+REGISTRY = Registry()
+
+
+# ============================================
+# APPLICATION METRICS
+# ============================================
+HTTP_LABELS = ('route', 'action', 'method', 'role', 'status')
+
+REQUESTS_TOTAL = REGISTRY.counter(
+    'academiya_http_requests_total',
+    'Total HTTP requests by route, action, role and status.',
+    HTTP_LABELS,
+)
+REQUEST_LATENCY = REGISTRY.histogram(
+    'academiya_http_request_duration_seconds',
+    'HTTP request latency in seconds.',
+    ('route', 'action', 'method'),
+)
+DB_QUERIES = REGISTRY.histogram(
+    'academiya_db_queries_per_request',
+    'Number of database queries executed per request.',
+    ('route', 'action'),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+DB_QUERIES_TOTAL = REGISTRY.counter(
+    'academiya_db_queries_total',
+    'Total database queries executed while serving requests.',
+    ('route', 'action'),
+)
+
+# Domain counters
+INSCRIPTIONS_CREATED = REGISTRY.counter(
+    'academiya_inscriptions_created_total',
+    'Inscriptions submitted by students.',
+)
+INSCRIPTIONS_PROCESSED = REGISTRY.counter(
+    'academiya_inscriptions_processed_total',
+    'Inscriptions validated or rejected by admins.',
+    ('status',),
+)
+NOTES_WRITTEN = REGISTRY.counter(
+    'academiya_notes_written_total',
+    'Grades created or updated.',
+    ('source',),
+)
+STUDENTS_PROVISIONED = REGISTRY.counter(
+    'academiya_students_provisioned_total',
+    'Student accounts created by bulk import.',
+)
+EMAILS_SENT = REGISTRY.counter(
+    'academiya_emails_total',
+    'Outbox emails by delivery outcome (sent, retry, failed).',
+    ('status',),
+)
+JOBS = REGISTRY.counter(
+    'academiya_jobs_total',
+    'Background jobs finished, by task and final status.',
+    ('task', 'status'),
+)
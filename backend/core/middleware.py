@@ -0,0 +1,156 @@
+import time
+
+from django.db import connection
+from django.http import HttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import metrics, profiling, slow_queries
+
+
+def resolve_action(view_func, method):
+    """Viewset action name (list, validate, ...) or view class/function name"""
+    # ViewSets expose their method -> action mapping on the view function
+    actions = getattr(view_func, 'actions', None)
+    if actions:
+        return actions.get(method.lower(), '')
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    return view_class.__name__ if view_class else view_func.__name__
+
+
+# ============================================
+# METRICS MIDDLEWARE
+# ============================================
+class MetricsMiddleware:
+    """
+    Records latency, request count and DB query count for every request,
+    labelled by route, viewset action, user role and status code.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request._metrics_action = ''
+        queries = [0]
+
+        def count_queries(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(count_queries):
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        route = match.route.replace('^', '').replace('$', '') if match else 'unmatched'
+        action = request._metrics_action
+        user = getattr(request, 'user', None)
+        role = getattr(user, 'role', '') if user is not None and user.is_authenticated else 'ANONYMOUS'
+
+        metrics.REQUESTS_TOTAL.inc(
+            route=route, action=action, method=request.method,
+            role=role, status=response.status_code,
+        )
+        metrics.REQUEST_LATENCY.observe(duration, route=route, action=action, method=request.method)
+        metrics.DB_QUERIES.observe(queries[0], route=route, action=action)
+        metrics.DB_QUERIES_TOTAL.inc(queries[0], route=route, action=action)
+        metrics.REGISTRY.flush()
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_action = resolve_action(view_func, request.method)
+
+
+# ============================================
+# SLOW QUERY LOG MIDDLEWARE (opt-in)
+# ============================================
+class SlowQueryMiddleware:
+    """
+    Collects queries above SLOW_QUERY_LOG['THRESHOLD_MS'] and stores them
+    with their call site (view + action) and EXPLAIN plan.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = slow_queries.get_config()
+        if not config['ENABLED']:
+            return self.get_response(request)
+
+        request._slow_query_action = ''
+        collector = slow_queries.QueryCollector(config['THRESHOLD_MS'])
+        with connection.execute_wrapper(collector):
+            response = self.get_response(request)
+
+        if collector.slow:
+            match = request.resolver_match
+            view = match.view_name if match else request.path
+            slow_queries.record(collector.slow, view=view, action=request._slow_query_action)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._slow_query_action = resolve_action(view_func, request.method)
+
+
+# ============================================
+# REQUEST PROFILER MIDDLEWARE (admin only)
+# ============================================
+class ProfilerMiddleware:
+    """
+    Runs a single request under the sampling profiler when asked to by an admin.
+
+    Trigger with the header `X-Profile: 1` or the query flag `?_profile=1`:
+        _profile=1          -> normal response, report stored in PROFILER['OUTPUT_DIR']
+                               (id returned in the X-Profile-Id header)
+        _profile=tree       -> the call tree is returned instead of the response
+        _profile=collapsed  -> collapsed stacks (speedscope / flamegraph.pl)
+    `true`, `yes` and `on` work like `1`; any other value (`0`, `false`...) is ignored.
+    """
+    SAVE_VALUES = ('1', 'true', 'yes', 'on')
+    MODES = ('tree', 'collapsed')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = (request.GET.get('_profile') or request.headers.get('X-Profile') or '').strip().lower()
+        if mode in self.SAVE_VALUES:
+            mode = 'save'
+        config = profiling.get_config()
+        if (mode != 'save' and mode not in self.MODES) or not config['ENABLED'] or not self.is_allowed(request):
+            return self.get_response(request)
+
+        profiler = profiling.SamplingProfiler(interval=config['INTERVAL_MS'] / 1000)
+        profiler.start()
+        try:
+            with connection.execute_wrapper(profiler.db_wrapper):
+                response = self.get_response(request)
+        finally:
+            profiler.stop()
+
+        if mode == 'tree':
+            return HttpResponse(profiler.call_tree(config['MIN_PERCENT']), content_type='text/plain; charset=utf-8')
+        if mode == 'collapsed':
+            return HttpResponse(profiler.collapsed(), content_type='text/plain; charset=utf-8')
+
+        profile_id = profiler.save(config['OUTPUT_DIR'], label=f'{request.method} {request.get_full_path()}')
+        response['X-Profile-Id'] = profile_id
+        response['X-Profile-Samples'] = str(profiler.samples)
+        response['X-Profile-DB-Time-Ms'] = f'{profiler.db_time * 1000:.1f}'
+        return response
+
+    def is_allowed(self, request):
+        """Only ADMIN users (session or JWT) may profile requests"""
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            try:
+                result = JWTAuthentication().authenticate(request)
+            except AuthenticationFailed:
+                return False
+            if result is None:
+                return False
+            user = result[0]
+        return user.is_superuser or user.role == 'ADMIN'
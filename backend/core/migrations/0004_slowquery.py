@@ -0,0 +1,36 @@
+# Generated by Django 6.0.2 on 2026-10-19 00:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_note'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=40, unique=True)),
+                ('normalized_sql', models.TextField()),
+                ('sample_sql', models.TextField(help_text='Première requête brute observée')),
+                ('params_shape', models.CharField(blank=True, max_length=500)),
+                ('view', models.CharField(blank=True, max_length=200)),
+                ('action', models.CharField(blank=True, max_length=100)),
+                ('explain_plan', models.TextField(blank=True)),
+                ('calls', models.PositiveIntegerField(default=0)),
+                ('total_time_ms', models.FloatField(default=0)),
+                ('max_time_ms', models.FloatField(default=0)),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Requête lente',
+                'verbose_name_plural': 'Requêtes lentes',
+                'ordering': ['-total_time_ms'],
+            },
+        ),
+    ]
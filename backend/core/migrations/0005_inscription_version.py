@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 00:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_slowquery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inscription',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,135 @@
+# Generated by Django 6.0.2 on 2026-10-19 00:35
+
+import unicodedata
+
+from django.db import migrations, models
+
+# Frozen copy of core/search.py as of this migration: later changes to the
+# live module must not alter what this migration does.
+FTS_TABLE = 'core_search_fts'
+
+CREATE_FTS_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, search_text,
+        content='core_searchentry', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS core_searchentry_ai AFTER INSERT ON core_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, search_text) VALUES (new.id, new.title, new.search_text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS core_searchentry_ad AFTER DELETE ON core_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, search_text) VALUES ('delete', old.id, old.title, old.search_text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS core_searchentry_au AFTER UPDATE ON core_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, search_text) VALUES ('delete', old.id, old.title, old.search_text);
+        INSERT INTO {FTS_TABLE}(rowid, title, search_text) VALUES (new.id, new.title, new.search_text);
+    END
+    """,
+]
+
+REBUILD_FTS_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+DROP_FTS_SQL = [
+    'DROP TRIGGER IF EXISTS core_searchentry_ai',
+    'DROP TRIGGER IF EXISTS core_searchentry_ad',
+    'DROP TRIGGER IF EXISTS core_searchentry_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def _join(*parts):
+    return ' '.join(str(p) for p in parts if p)
+
+
+def user_document(user):
+    return {
+        'title': _join((user.last_name or '').upper(), user.first_name) or user.username,
+        'subtitle': _join(user.role, user.cne or user.matricule or user.email),
+        'search_text': normalize(_join(
+            user.username, user.first_name, user.last_name, user.email, user.cne, user.matricule
+        )),
+    }
+
+
+def module_document(module):
+    filiere = module.filiere
+    return {
+        'title': f"{module.code} - {module.name}",
+        'subtitle': f"{filiere.code} - {filiere.name} (S{module.semestre})",
+        'search_text': normalize(_join(module.code, module.name, filiere.code, filiere.name, module.description)),
+    }
+
+
+def filiere_document(filiere):
+    departement = filiere.departement
+    return {
+        'title': f"{filiere.code} - {filiere.name}",
+        'subtitle': f"{departement.code} - {departement.name} ({filiere.niveau})",
+        'search_text': normalize(_join(
+            filiere.code, filiere.name, filiere.niveau, departement.code, departement.name, filiere.description
+        )),
+    }
+
+
+def create_fts_index(apps, schema_editor):
+    SearchEntry = apps.get_model('core', 'SearchEntry')
+    sources = [
+        ('user', apps.get_model('users', 'User').objects.all(), user_document),
+        ('module', apps.get_model('core', 'Module').objects.select_related('filiere'), module_document),
+        ('filiere', apps.get_model('core', 'Filiere').objects.select_related('departement'), filiere_document),
+    ]
+    for kind, queryset, builder in sources:
+        SearchEntry.objects.bulk_create(
+            (SearchEntry(kind=kind, object_id=obj.pk, **builder(obj)) for obj in queryset.iterator(chunk_size=1000)),
+            batch_size=1000,
+        )
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in CREATE_FTS_SQL:
+            schema_editor.execute(sql)
+        schema_editor.execute(REBUILD_FTS_SQL)
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in DROP_FTS_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_inscription_version'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(max_length=300)),
+                ('subtitle', models.CharField(blank=True, max_length=300)),
+                ('search_text', models.TextField(help_text='Texte normalisé (minuscules, sans accents)')),
+            ],
+            options={
+                'verbose_name': 'Entrée de recherche',
+                'verbose_name_plural': 'Index de recherche',
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
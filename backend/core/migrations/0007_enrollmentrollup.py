@@ -0,0 +1,62 @@
+# Generated by Django 6.0.2 on 2026-10-19 00:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_rollups(apps, schema_editor):
+    # Frozen copy of rollups.rebuild() as of this migration
+    Inscription = apps.get_model('core', 'Inscription')
+    EnrollmentRollup = apps.get_model('core', 'EnrollmentRollup')
+    fields = {'VALIDATED': 'validated_count', 'REJECTED': 'rejected_count'}
+    buckets = {}
+
+    def add(day, filiere_id, academic_year, field):
+        row = buckets.setdefault((day, filiere_id, academic_year), {
+            'created_count': 0, 'validated_count': 0, 'rejected_count': 0,
+        })
+        row[field] += 1
+
+    rows = Inscription.objects.values_list('filiere_id', 'academic_year', 'status', 'created_at', 'validation_date')
+    for filiere_id, academic_year, status, created_at, validation_date in rows.iterator(chunk_size=2000):
+        add(timezone.localdate(created_at), filiere_id, academic_year, 'created_count')
+        if status in fields and validation_date:
+            add(timezone.localdate(validation_date), filiere_id, academic_year, fields[status])
+
+    EnrollmentRollup.objects.bulk_create(
+        [
+            EnrollmentRollup(date=day, filiere_id=filiere_id, academic_year=academic_year, **counts)
+            for (day, filiere_id, academic_year), counts in buckets.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_searchentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnrollmentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('academic_year', models.CharField(max_length=9)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('validated_count', models.PositiveIntegerField(default=0)),
+                ('rejected_count', models.PositiveIntegerField(default=0)),
+                ('filiere', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollment_rollups', to='core.filiere')),
+            ],
+            options={
+                'verbose_name': "Statistique d'inscription (jour)",
+                'verbose_name_plural': "Statistiques d'inscription (jour)",
+                'ordering': ['date'],
+                'unique_together': {('date', 'filiere', 'academic_year')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
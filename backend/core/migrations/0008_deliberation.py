@@ -0,0 +1,60 @@
+# Generated by Django 6.0.2 on 2026-10-19 00:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_enrollmentrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Deliberation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semestre', models.IntegerField(choices=[(1, 'S1'), (2, 'S2'), (3, 'S3'), (4, 'S4'), (5, 'S5'), (6, 'S6')])),
+                ('academic_year', models.CharField(max_length=9, verbose_name='Année Universitaire')),
+                ('passing_average', models.DecimalField(decimal_places=2, default=10, max_digits=4)),
+                ('eliminatory_note', models.DecimalField(decimal_places=2, default=5, help_text='Une note de module inférieure bloque la compensation', max_digits=4)),
+                ('student_count', models.PositiveIntegerField(default=0)),
+                ('module_count', models.PositiveIntegerField(default=0)),
+                ('admitted_count', models.PositiveIntegerField(default=0)),
+                ('class_average', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('duration_ms', models.FloatField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deliberations', to=settings.AUTH_USER_MODEL)),
+                ('filiere', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliberations', to='core.filiere', verbose_name='Filière')),
+            ],
+            options={
+                'verbose_name': 'Délibération',
+                'verbose_name_plural': 'Délibérations',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DeliberationResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('average', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('rank', models.PositiveIntegerField()),
+                ('decision', models.CharField(choices=[('ADMIS', 'Admis'), ('COMPENSE', 'Admis par compensation'), ('AJOURNE', 'Ajourné')], max_length=10)),
+                ('modules_validated', models.PositiveSmallIntegerField(default=0)),
+                ('modules_compensated', models.PositiveSmallIntegerField(default=0)),
+                ('modules_failed', models.PositiveSmallIntegerField(default=0)),
+                ('modules_missing', models.PositiveSmallIntegerField(default=0)),
+                ('deliberation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='core.deliberation')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliberation_results', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Résultat de délibération',
+                'verbose_name_plural': 'Résultats de délibération',
+                'ordering': ['deliberation', 'rank'],
+                'unique_together': {('deliberation', 'student')},
+            },
+        ),
+    ]
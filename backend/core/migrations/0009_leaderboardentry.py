@@ -0,0 +1,72 @@
+# Generated by Django 6.0.2 on 2026-10-19 00:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+
+
+def backfill_leaderboard(apps, schema_editor):
+    # Frozen copy of rankings.rebuild_all() as of this migration, dense ranks computed here
+    Note = apps.get_model('core', 'Note')
+    LeaderboardEntry = apps.get_model('core', 'LeaderboardEntry')
+    rows = (
+        Note.objects.filter(note_finale__isnull=False)
+        .values('student_id', 'module__filiere_id', 'academic_year')
+        .annotate(
+            weighted_sum=Sum(F('note_finale') * F('module__coefficient')),
+            weights=Sum('module__coefficient'),
+            note_count=Count('id'),
+        )
+        .order_by()
+    )
+    partitions = {}
+    for row in rows:
+        average = round(row['weighted_sum'] / row['weights'], 2) if row['weights'] else 0
+        partitions.setdefault((row['module__filiere_id'], row['academic_year']), []).append(
+            (average, row['student_id'], row['note_count'])
+        )
+
+    entries = []
+    for (filiere_id, academic_year), students in partitions.items():
+        rank, previous = 0, None
+        for average, student_id, note_count in sorted(students, key=lambda s: (-s[0], s[1])):
+            if average != previous:
+                rank, previous = rank + 1, average
+            entries.append(LeaderboardEntry(
+                filiere_id=filiere_id, academic_year=academic_year, student_id=student_id,
+                average=average, note_count=note_count, rank=rank,
+            ))
+    LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_deliberation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('academic_year', models.CharField(max_length=9)),
+                ('average', models.DecimalField(decimal_places=2, help_text='Moyenne pondérée par coefficient', max_digits=5)),
+                ('rank', models.PositiveIntegerField(default=0, help_text='Rang dense dans la filière')),
+                ('note_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('filiere', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard', to='core.filiere')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Classement',
+                'verbose_name_plural': 'Classements',
+                'ordering': ['filiere', 'academic_year', 'rank'],
+                'indexes': [models.Index(fields=['filiere', 'academic_year', 'rank'], name='core_leader_rank_idx'), models.Index(fields=['-average'], name='core_leader_average_idx')],
+                'unique_together': {('filiere', 'academic_year', 'student')},
+            },
+        ),
+        migrations.RunPython(backfill_leaderboard, migrations.RunPython.noop),
+    ]
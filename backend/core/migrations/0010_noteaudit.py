@@ -0,0 +1,35 @@
+# Generated by Django 6.0.2 on 2026-10-19 00:48
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteAudit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('note_id', models.IntegerField()),
+                ('actor_id', models.IntegerField(blank=True, null=True)),
+                ('action', models.PositiveSmallIntegerField(choices=[(1, 'Création'), (2, 'Modification'), (3, 'Suppression')])),
+                ('source', models.PositiveSmallIntegerField(choices=[(0, 'Autre'), (1, 'API'), (2, 'Saisie groupée'), (3, 'Import fichier')], default=0)),
+                ('old_controle', models.SmallIntegerField(blank=True, null=True)),
+                ('new_controle', models.SmallIntegerField(blank=True, null=True)),
+                ('old_examen', models.SmallIntegerField(blank=True, null=True)),
+                ('new_examen', models.SmallIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Historique de note',
+                'verbose_name_plural': 'Historique des notes',
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['note_id', 'id'], name='core_noteaudit_note_idx'), models.Index(fields=['actor_id', 'id'], name='core_noteaudit_actor_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 6.0.2 on 2026-10-19 01:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_outboundemail'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('task', models.CharField(max_length=100)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('interval_minutes', models.PositiveIntegerField(help_text='Ex: 1440 = tous les jours')),
+                ('next_run_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('enabled', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name': 'Tâche planifiée',
+                'verbose_name_plural': 'Tâches planifiées',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=100)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('QUEUED', 'En file'), ('RUNNING', 'En cours'), ('SUCCEEDED', 'Terminé'), ('FAILED', 'Échec'), ('CANCELLED', 'Annulé')], default='QUEUED', max_length=10)),
+                ('progress', models.PositiveSmallIntegerField(default=0, help_text='Pourcentage (0-100)')),
+                ('progress_message', models.CharField(blank=True, max_length=255)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('cancel_requested', models.BooleanField(default=False)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to=settings.AUTH_USER_MODEL)),
+                ('schedule', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='core.jobschedule')),
+            ],
+            options={
+                'verbose_name': 'Tâche de fond',
+                'verbose_name_plural': 'Tâches de fond',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='core_job_queue_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 6.0.2 on 2026-10-19 01:38
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=30)),
+                ('object_id', models.IntegerField()),
+                ('student_id', models.IntegerField(blank=True, null=True)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Suppression (synchronisation)',
+                'verbose_name_plural': 'Suppressions (synchronisation)',
+                'ordering': ['deleted_at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='departement',
+            index=models.Index(fields=['updated_at', 'id'], name='core_departement_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='filiere',
+            index=models.Index(fields=['updated_at', 'id'], name='core_filiere_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscription',
+            index=models.Index(fields=['updated_at', 'id'], name='core_inscription_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='module',
+            index=models.Index(fields=['updated_at', 'id'], name='core_module_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['updated_at', 'id'], name='core_note_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['model', 'deleted_at'], name='core_tombstone_sync_idx'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 6.0.2 on 2026-10-19 01:39
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_sync_tombstones'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedYear',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('academic_year', models.CharField(max_length=9, unique=True, verbose_name='Année Universitaire')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('inscriptions_count', models.PositiveIntegerField(default=0)),
+                ('notes_count', models.PositiveIntegerField(default=0)),
+                ('archived_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Année archivée',
+                'verbose_name_plural': 'Années archivées',
+                'ordering': ['-academic_year'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedInscription',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('academic_year', models.CharField(max_length=9, verbose_name='Année Universitaire')),
+                ('status', models.CharField(choices=[('PENDING', 'En Attente'), ('VALIDATED', 'Validée'), ('REJECTED', 'Rejetée')], max_length=20, verbose_name='Statut')),
+                ('photo_identite', models.ImageField(blank=True, upload_to='inscriptions/photos/')),
+                ('releve_notes', models.FileField(blank=True, upload_to='inscriptions/releves/')),
+                ('certificat_scolarite', models.FileField(blank=True, upload_to='inscriptions/certificats/')),
+                ('validation_date', models.DateTimeField(blank=True, null=True)),
+                ('rejection_reason', models.TextField(blank=True, null=True, verbose_name='Motif de rejet')),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(verbose_name='Date de demande')),
+                ('updated_at', models.DateTimeField()),
+                ('filiere', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_inscriptions', to='core.filiere', verbose_name='Filière')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_inscriptions', to=settings.AUTH_USER_MODEL, verbose_name='Étudiant')),
+                ('validated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Validé par')),
+            ],
+            options={
+                'verbose_name': 'Inscription archivée',
+                'verbose_name_plural': 'Inscriptions archivées',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['academic_year', 'student'], name='core_archinscription_year_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedNote',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('academic_year', models.CharField(max_length=9, verbose_name='Année Universitaire')),
+                ('note_controle', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, verbose_name='Note Contrôle')),
+                ('note_examen', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, verbose_name='Note Examen')),
+                ('note_finale', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, verbose_name='Note Finale')),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('module', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notes', to='core.module', verbose_name='Module')),
+                ('saisie_par', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Saisi par')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notes', to=settings.AUTH_USER_MODEL, verbose_name='Étudiant')),
+            ],
+            options={
+                'verbose_name': 'Note archivée',
+                'verbose_name_plural': 'Notes archivées',
+                'ordering': ['-academic_year', 'module', 'student'],
+                'indexes': [models.Index(fields=['academic_year', 'student'], name='core_archnote_year_idx'), models.Index(fields=['student', 'academic_year'], name='core_archnote_student_idx')],
+            },
+        ),
+    ]
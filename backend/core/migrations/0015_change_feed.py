@@ -0,0 +1,51 @@
+# Generated by Django 6.0.2 on 2026-10-19 01:42
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_academic_year_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('topic', models.CharField(max_length=50)),
+                ('object_id', models.IntegerField()),
+                ('departement_id', models.IntegerField(blank=True, null=True)),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Événement (flux de changements)',
+                'verbose_name_plural': 'Événements (flux de changements)',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['topic', 'id'], name='core_changeevent_topic_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ChangeFeedConsumer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('position', models.BigIntegerField(default=0, help_text='Dernier événement traité')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='change_feed_consumers', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Consommateur du flux',
+                'verbose_name_plural': 'Consommateurs du flux',
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-19 01:44
+
+import django.core.validators
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_change_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='filiere',
+            name='poids_controle',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.40'), help_text="Entre 0 et 1, l'examen compte pour le reste", max_digits=3, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(1)], verbose_name='Poids du contrôle'),
+        ),
+        migrations.AddField(
+            model_name='module',
+            name='poids_controle',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Vide = politique de la filière', max_digits=3, null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(1)], verbose_name='Poids du contrôle'),
+        ),
+    ]
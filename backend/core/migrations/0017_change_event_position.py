@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:04
+
+from django.db import migrations, models
+
+
+def number_existing_events(apps, schema_editor):
+    # Existing rows are committed: their id was the cursor, keep consumer offsets valid
+    ChangeEvent = apps.get_model('core', 'ChangeEvent')
+    ChangeEvent.objects.update(position=models.F('id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_grading_policy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changeevent',
+            name='position',
+            field=models.BigIntegerField(blank=True, null=True, unique=True),
+        ),
+        migrations.RunPython(number_existing_events, migrations.RunPython.noop),
+    ]
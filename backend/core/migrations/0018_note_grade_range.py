@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:06
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_change_event_position'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='note',
+            name='note_controle',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Note sur 20', max_digits=5, null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(20)], verbose_name='Note Contrôle'),
+        ),
+        migrations.AlterField(
+            model_name='note',
+            name='note_examen',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Note sur 20', max_digits=5, null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(20)], verbose_name='Note Examen'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_note_grade_range'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='noteaudit',
+            name='new_controle',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='noteaudit',
+            name='new_examen',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='noteaudit',
+            name='old_controle',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='noteaudit',
+            name='old_examen',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
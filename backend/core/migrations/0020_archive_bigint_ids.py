@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_noteaudit_integer_grades'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedinscription',
+            name='id',
+            field=models.BigIntegerField(primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='archivednote',
+            name='id',
+            field=models.BigIntegerField(primary_key=True, serialize=False),
+        ),
+    ]
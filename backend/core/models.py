@@ -1,5 +1,11 @@
-from django.db import models
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 
 # ============================================
 # DEPARTEMENT MODEL
@@ -27,6 +33,9 @@ class Departement(models.Model):
         verbose_name = "Département"
         verbose_name_plural = "Départements"
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='core_departement_sync_idx'),  # delta sync (?updated_since=)
+        ]
     
     def __str__(self):
         return f"{self.code} - {self.name}"
@@ -61,6 +70,14 @@ class Filiere(models.Model):
     capacity = models.PositiveIntegerField(default=30, verbose_name="Capacité d'accueil")
     description = models.TextField(blank=True, null=True)
     
+    # Grading policy: note_finale = poids × contrôle + (1 - poids) × examen (see core/grading.py)
+    poids_controle = models.DecimalField(
+        max_digits=3, decimal_places=2, default=Decimal('0.40'),
+        validators=[MinValueValidator(0), MaxValueValidator(1)],
+        verbose_name="Poids du contrôle",
+        help_text="Entre 0 et 1, l'examen compte pour le reste"
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -69,7 +86,42 @@ class Filiere(models.Model):
         verbose_name_plural = "Filières"
         ordering = ['departement', 'name']
         unique_together = ['code', 'departement']  # Same code can exist in different depts
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='core_filiere_sync_idx'),  # delta sync (?updated_since=)
+        ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Policy as loaded: a change triggers a grade recompute (core/signals.py)
+        instance._loaded_poids_controle = instance.__dict__.get('poids_controle')
+        return instance
+
+    @classmethod
+    def available_seats(cls, buckets):
+        """
+        {(filiere_id, academic_year): free seats} for the given buckets.
+        Call inside transaction.atomic(): the filiere rows stay locked
+        (SELECT ... FOR UPDATE, in id order) until commit, so concurrent
+        validations of the same filiere wait instead of overbooking. SQLite
+        has no row locks but only allows one writing transaction at a time.
+        """
+        filiere_ids = sorted({filiere_id for filiere_id, _ in buckets})
+        capacity = dict(
+            cls.objects.select_for_update().filter(id__in=filiere_ids).order_by('id').values_list('id', 'capacity')
+        )
+        validated = {
+            (row['filiere_id'], row['academic_year']): row['count']
+            for row in Inscription.objects.filter(
+                status='VALIDATED', filiere_id__in=filiere_ids,
+                academic_year__in={academic_year for _, academic_year in buckets},
+            ).values('filiere_id', 'academic_year').annotate(count=models.Count('id')).order_by()
+        }
+        return {
+            (filiere_id, academic_year): capacity.get(filiere_id, 0) - validated.get((filiere_id, academic_year), 0)
+            for filiere_id, academic_year in buckets
+        }
+
     def __str__(self):
         return f"{self.code} - {self.name} ({self.departement.code})"
 
@@ -107,6 +159,12 @@ class Module(models.Model):
         verbose_name="Semestre"
     )
     coefficient = models.DecimalField(max_digits=4, decimal_places=2, default=1.0)
+    poids_controle = models.DecimalField(
+        max_digits=3, decimal_places=2, null=True, blank=True,
+        validators=[MinValueValidator(0), MaxValueValidator(1)],
+        verbose_name="Poids du contrôle",
+        help_text="Vide = politique de la filière"
+    )
     heures_cm = models.PositiveIntegerField(default=0, verbose_name="Heures CM")
     heures_td = models.PositiveIntegerField(default=0, verbose_name="Heures TD")
     heures_tp = models.PositiveIntegerField(default=0, verbose_name="Heures TP")
@@ -121,6 +179,44 @@ class Module(models.Model):
         verbose_name_plural = "Modules"
         ordering = ['filiere', 'semestre', 'name']
         unique_together = ['code', 'filiere']
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='core_module_sync_idx'),  # delta sync (?updated_since=)
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Policy as loaded: a change triggers a grade recompute (core/signals.py)
+        instance._loaded_poids_controle = instance.__dict__.get('poids_controle')
+        # Leaderboard and transcripts only depend on these (core/signals.py)
+        instance._loaded_fields = {
+            field: instance.__dict__.get(field) for field in ('filiere_id', 'coefficient', 'semestre')
+        }
+        return instance
+    
+    @staticmethod
+    def poids_controle_of(module_id):
+        """Effective weight of the contrôle: the module's, else its filiere's"""
+        return Module.objects.filter(pk=module_id).values_list(
+            Coalesce('poids_controle', 'filiere__poids_controle'), flat=True
+        ).first()
+    
+    def effective_poids_controle(self):
+        """
+        poids_controle_of() for a loaded module, read once per instance:
+        notes saved in a loop with the same module share it
+        """
+        key = (self.poids_controle, self.filiere_id)
+        cached = self.__dict__.get('_effective_poids_controle')
+        if cached is None or cached[0] != key:
+            if self.poids_controle is not None:
+                poids = self.poids_controle
+            elif Module.filiere.is_cached(self):
+                poids = self.filiere.poids_controle
+            else:
+                poids = Filiere.objects.filter(pk=self.filiere_id).values_list('poids_controle', flat=True).first()
+            cached = self._effective_poids_controle = (key, poids)
+        return cached[1]
     
     def __str__(self):
         return f"{self.code} - {self.name} (S{self.semestre})"
@@ -129,6 +225,14 @@ class Module(models.Model):
 # ============================================
 # INSCRIPTION MODEL (GOVERNANCE CRITICAL)
 # ============================================
+class InvalidTransition(Exception):
+    """Raised when an inscription cannot move to the requested status"""
+    def __init__(self, message, current_status=None, conflict=False):
+        super().__init__(message)
+        self.current_status = current_status
+        self.conflict = conflict  # True when a concurrent write won the race
+
+
 class Inscription(models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'En Attente'),
@@ -136,6 +240,13 @@ class Inscription(models.Model):
         ('REJECTED', 'Rejetée'),
     ]
     
+    # State machine: allowed target statuses for each status
+    TRANSITIONS = {
+        'PENDING': {'VALIDATED', 'REJECTED'},
+        'VALIDATED': set(),
+        'REJECTED': set(),
+    }
+    
     # Who is enrolling?
     student = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -187,6 +298,9 @@ class Inscription(models.Model):
     validation_date = models.DateTimeField(null=True, blank=True)
     rejection_reason = models.TextField(blank=True, null=True, verbose_name="Motif de rejet")
     
+    # Optimistic concurrency: bumped by every status transition
+    version = models.PositiveIntegerField(default=0)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Date de demande")
     updated_at = models.DateTimeField(auto_now=True)
@@ -196,9 +310,100 @@ class Inscription(models.Model):
         verbose_name_plural = "Inscriptions"
         ordering = ['-created_at']
         unique_together = ['student', 'filiere', 'academic_year']  # One inscription per year
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='core_inscription_sync_idx'),  # delta sync (?updated_since=)
+        ]
     
     def __str__(self):
         return f"{self.student.username} → {self.filiere.code} ({self.academic_year}) [{self.status}]"
+    
+    @classmethod
+    def transition_changes(cls, new_status, by, rejection_reason='', now=None):
+        """Columns written by a transition (used by single and bulk UPDATEs)"""
+        now = now or timezone.now()
+        changes = {
+            'status': new_status,
+            'validated_by': by,
+            'validation_date': now,
+            'updated_at': now,
+            'version': models.F('version') + 1,
+        }
+        if new_status == 'REJECTED':
+            changes['rejection_reason'] = rejection_reason
+        return changes
+    
+    def transition(self, new_status, by, rejection_reason='', expected_version=None):
+        """
+        Compare-and-set status change:
+            UPDATE ... SET <changed columns>, version = version + 1
+            WHERE id = ? AND status = <current> [AND version = <expected>]
+        Only the transition columns are written, so concurrent edits of other
+        fields are not clobbered. Raises InvalidTransition if the move is not
+        allowed, the filiere is full for the academic year (VALIDATED), or
+        another request changed the row first.
+        """
+        if new_status not in self.TRANSITIONS.get(self.status, set()):
+            raise InvalidTransition(
+                f"Cette inscription est déjà {self.get_status_display()}."
+                if not self.TRANSITIONS.get(self.status) else f"Transition {self.status} → {new_status} non autorisée.",
+                current_status=self.status
+            )
+        
+        expected_version = self.version if expected_version is None else expected_version
+        now = timezone.now()
+        changes = self.transition_changes(new_status, by, rejection_reason, now)
+        
+        # Status change, rollup and decision email commit (or roll back) together
+        with transaction.atomic():
+            # Capacity of the filiere for this academic year, checked under the filiere lock
+            if new_status == 'VALIDATED':
+                seats = Filiere.available_seats({(self.filiere_id, self.academic_year)})
+                if seats[(self.filiere_id, self.academic_year)] <= 0:
+                    raise InvalidTransition(
+                        f"Capacité de la filière atteinte pour l'année {self.academic_year}.",
+                        current_status=self.status
+                    )
+            updated = Inscription.objects.filter(
+                pk=self.pk, status=self.status, version=expected_version
+            ).update(**changes)
+            
+            if updated:
+                from .rollups import record
+                record(new_status, self.filiere_id, self.academic_year, when=now)
+                
+                # Mirror the UPDATE on the in-memory instance
+                self.status = new_status
+                self.validated_by = by
+                self.validation_date = now
+                self.updated_at = now
+                self.version = expected_version + 1
+                if new_status == 'REJECTED':
+                    self.rejection_reason = rejection_reason
+                
+                from .emails import send_inscription_confirmation
+                send_inscription_confirmation(self)
+                
+                from .changefeed import record_inscriptions
+                record_inscriptions([self.id])
+                
+                from .events import publish
+                publish(
+                    f'inscription.{new_status.lower()}',
+                    {
+                        'inscription_id': self.id, 'filiere_id': self.filiere_id,
+                        'academic_year': self.academic_year, 'count': 1, 'pending_delta': -1,
+                    },
+                    departement_id=self.filiere.departement_id,
+                    student_ids=[self.student_id],
+                )
+        
+        if not updated:
+            self.refresh_from_db(fields=['status', 'version', 'validated_by', 'validation_date', 'rejection_reason', 'updated_at'])
+            raise InvalidTransition(
+                "L'inscription a été modifiée par une autre requête.",
+                current_status=self.status,
+                conflict=True
+            )
 
 
 # ============================================
@@ -238,6 +443,7 @@ class Note(models.Model):
         decimal_places=2, 
         null=True, 
         blank=True,
+        validators=[MinValueValidator(0), MaxValueValidator(20)],
         verbose_name="Note Contrôle",
         help_text="Note sur 20"
     )
@@ -247,6 +453,7 @@ class Note(models.Model):
         decimal_places=2, 
         null=True, 
         blank=True,
+        validators=[MinValueValidator(0), MaxValueValidator(20)],
         verbose_name="Note Examen",
         help_text="Note sur 20"
     )
@@ -280,13 +487,636 @@ class Note(models.Model):
         verbose_name_plural = "Notes"
         ordering = ['-academic_year', 'module', 'student']
         unique_together = ['student', 'module', 'academic_year']
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='core_note_sync_idx'),  # delta sync (?updated_since=)
+        ]
+    
+    DEFAULT_POIDS_CONTROLE = Decimal('0.40')
+    
+    @staticmethod
+    def compute_finale(note_controle, note_examen, poids_controle=DEFAULT_POIDS_CONTROLE):
+        """
+        poids × contrôle + (1 - poids) × examen, None until both grades are known.
+        Integer hundredths, rounded half up: the same arithmetic as the SQL of
+        core/grading.py, so bulk recomputes give exactly the same values.
+        """
+        if note_controle is None or note_examen is None:
+            return None
+        # Decimal arithmetic: values loaded from the DB are Decimal, request data may be int/float/str
+        controle, examen, poids = (
+            int((Decimal(str(value)) * 100).to_integral_value(ROUND_HALF_UP))
+            for value in (note_controle, note_examen, poids_controle)
+        )
+        return Decimal((controle * poids + examen * (100 - poids) + 50) // 100).scaleb(-2)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Grades as loaded, used by the audit log to record old values (see core/audit.py)
+        instance._audit_snapshot = (instance.__dict__.get('note_controle'), instance.__dict__.get('note_examen'))
+        return instance
     
     def save(self, *args, **kwargs):
         """Auto-calculate note_finale"""
         if self.note_controle is not None and self.note_examen is not None:
-            # You can adjust the formula (e.g., 40% controle, 60% examen)
-            self.note_finale = (self.note_controle * 0.4) + (self.note_examen * 0.6)
+            # Weights come from the grading policy of the module (or of its filiere),
+            # read once per module instance when the caller shares a loaded module
+            if Note.module.is_cached(self):
+                poids = self.module.effective_poids_controle()
+            else:
+                poids = Module.poids_controle_of(self.module_id)
+            self.note_finale = self.compute_finale(
+                self.note_controle, self.note_examen, self.DEFAULT_POIDS_CONTROLE if poids is None else poids
+            )
         super().save(*args, **kwargs)
     
     def __str__(self):
         return f"{self.student.username} - {self.module.code} ({self.academic_year})"
+
+
+# ============================================
+# SLOW QUERY LOG (MONITORING)
+# ============================================
+class SlowQuery(models.Model):
+    """
+    One row per normalized SQL fingerprint above the slow-query threshold
+    """
+    fingerprint = models.CharField(max_length=40, unique=True)
+    normalized_sql = models.TextField()
+    sample_sql = models.TextField(help_text="Première requête brute observée")
+    params_shape = models.CharField(max_length=500, blank=True)
+    
+    # Call site (last seen)
+    view = models.CharField(max_length=200, blank=True)
+    action = models.CharField(max_length=100, blank=True)
+    
+    explain_plan = models.TextField(blank=True)
+    
+    # Aggregates
+    calls = models.PositiveIntegerField(default=0)
+    total_time_ms = models.FloatField(default=0)
+    max_time_ms = models.FloatField(default=0)
+    
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = "Requête lente"
+        verbose_name_plural = "Requêtes lentes"
+        ordering = ['-total_time_ms']
+    
+    def __str__(self):
+        return f"{self.view}:{self.action} ({self.calls}x, max {self.max_time_ms:.0f} ms)"
+
+
+# ============================================
+# SEARCH INDEX (see core/search.py)
+# ============================================
+class SearchEntry(models.Model):
+    """
+    Denormalized search document for a User, Module or Filiere.
+    On SQLite the FTS5 table core_search_fts mirrors it through triggers.
+    """
+    kind = models.CharField(max_length=10)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=300)
+    subtitle = models.CharField(max_length=300, blank=True)
+    search_text = models.TextField(help_text="Texte normalisé (minuscules, sans accents)")
+    
+    class Meta:
+        verbose_name = "Entrée de recherche"
+        verbose_name_plural = "Index de recherche"
+        unique_together = ['kind', 'object_id']
+    
+    def __str__(self):
+        return f"[{self.kind}] {self.title}"
+
+
+# ============================================
+# ENROLLMENT ROLLUP (see core/rollups.py)
+# ============================================
+class EnrollmentRollup(models.Model):
+    """
+    Daily count of inscription events per filiere and academic year,
+    maintained incrementally on every create/validate/reject.
+    """
+    date = models.DateField()
+    filiere = models.ForeignKey(
+        Filiere,
+        on_delete=models.CASCADE,
+        related_name='enrollment_rollups'
+    )
+    academic_year = models.CharField(max_length=9)
+    
+    created_count = models.PositiveIntegerField(default=0)
+    validated_count = models.PositiveIntegerField(default=0)
+    rejected_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Statistique d'inscription (jour)"
+        verbose_name_plural = "Statistiques d'inscription (jour)"
+        ordering = ['date']
+        unique_together = ['date', 'filiere', 'academic_year']
+    
+    def __str__(self):
+        return f"{self.date} {self.filiere_id} ({self.academic_year}): +{self.created_count} / ✓{self.validated_count} / ✗{self.rejected_count}"
+
+
+# ============================================
+# DELIBERATION (JURY) SNAPSHOTS
+# ============================================
+class Deliberation(models.Model):
+    """
+    Snapshot of a jury deliberation for one filiere / semestre / academic year
+    (see core/deliberation.py)
+    """
+    filiere = models.ForeignKey(
+        Filiere,
+        on_delete=models.CASCADE,
+        related_name='deliberations',
+        verbose_name="Filière"
+    )
+    semestre = models.IntegerField(choices=[(i, f"S{i}") for i in range(1, 7)])
+    academic_year = models.CharField(max_length=9, verbose_name="Année Universitaire")
+    
+    # Rules applied
+    passing_average = models.DecimalField(max_digits=4, decimal_places=2, default=10)
+    eliminatory_note = models.DecimalField(
+        max_digits=4, decimal_places=2, default=5,
+        help_text="Une note de module inférieure bloque la compensation"
+    )
+    
+    # Summary
+    student_count = models.PositiveIntegerField(default=0)
+    module_count = models.PositiveIntegerField(default=0)
+    admitted_count = models.PositiveIntegerField(default=0)
+    class_average = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    duration_ms = models.FloatField(default=0)
+    
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='deliberations'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = "Délibération"
+        verbose_name_plural = "Délibérations"
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.filiere.code} S{self.semestre} ({self.academic_year}) - {self.created_at:%Y-%m-%d %H:%M}"
+
+
+class DeliberationResult(models.Model):
+    DECISION_CHOICES = [
+        ('ADMIS', 'Admis'),
+        ('COMPENSE', 'Admis par compensation'),
+        ('AJOURNE', 'Ajourné'),
+    ]
+    
+    deliberation = models.ForeignKey(
+        Deliberation,
+        on_delete=models.CASCADE,
+        related_name='results'
+    )
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='deliberation_results'
+    )
+    average = models.DecimalField(max_digits=5, decimal_places=2)
+    rank = models.PositiveIntegerField()
+    decision = models.CharField(max_length=10, choices=DECISION_CHOICES)
+    
+    modules_validated = models.PositiveSmallIntegerField(default=0)
+    modules_compensated = models.PositiveSmallIntegerField(default=0)
+    modules_failed = models.PositiveSmallIntegerField(default=0)
+    modules_missing = models.PositiveSmallIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Résultat de délibération"
+        verbose_name_plural = "Résultats de délibération"
+        ordering = ['deliberation', 'rank']
+        unique_together = ['deliberation', 'student']
+    
+    def __str__(self):
+        return f"{self.student_id} #{self.rank} {self.average} [{self.decision}]"
+
+
+# ============================================
+# LEADERBOARD (per filiere / academic year, see core/rankings.py)
+# ============================================
+class LeaderboardEntry(models.Model):
+    filiere = models.ForeignKey(
+        Filiere,
+        on_delete=models.CASCADE,
+        related_name='leaderboard'
+    )
+    academic_year = models.CharField(max_length=9)
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries'
+    )
+    average = models.DecimalField(max_digits=5, decimal_places=2, help_text="Moyenne pondérée par coefficient")
+    rank = models.PositiveIntegerField(default=0, help_text="Rang dense dans la filière")
+    note_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Classement"
+        verbose_name_plural = "Classements"
+        ordering = ['filiere', 'academic_year', 'rank']
+        unique_together = ['filiere', 'academic_year', 'student']
+        indexes = [
+            models.Index(fields=['filiere', 'academic_year', 'rank'], name='core_leader_rank_idx'),
+            models.Index(fields=['-average'], name='core_leader_average_idx'),
+        ]
+    
+    def __str__(self):
+        return f"#{self.rank} {self.student_id} ({self.filiere_id}, {self.academic_year}) {self.average}"
+
+
+# ============================================
+# GRADE AUDIT LOG (APPEND-ONLY)
+# ============================================
+class NoteAuditQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        raise PermissionError("Le journal des notes est en ajout seul.")
+    
+    def delete(self):
+        raise PermissionError("Le journal des notes est en ajout seul.")
+
+
+class NoteAudit(models.Model):
+    """
+    One row per grade change (see core/audit.py).
+    Grades are stored in hundredths of a point (12.50 -> 1250) in integer
+    columns, wide enough for anything a Note column holds (999.99); note and
+    actor are plain integers so history survives deletions.
+    """
+    ACTION_CREATE = 1
+    ACTION_UPDATE = 2
+    ACTION_DELETE = 3
+    ACTION_CHOICES = [
+        (ACTION_CREATE, 'Création'),
+        (ACTION_UPDATE, 'Modification'),
+        (ACTION_DELETE, 'Suppression'),
+    ]
+    
+    SOURCE_OTHER = 0
+    SOURCE_API = 1
+    SOURCE_BULK = 2
+    SOURCE_IMPORT = 3
+    SOURCE_CHOICES = [
+        (SOURCE_OTHER, 'Autre'),
+        (SOURCE_API, 'API'),
+        (SOURCE_BULK, 'Saisie groupée'),
+        (SOURCE_IMPORT, 'Import fichier'),
+    ]
+    
+    note_id = models.IntegerField()
+    actor_id = models.IntegerField(null=True, blank=True)
+    action = models.PositiveSmallIntegerField(choices=ACTION_CHOICES)
+    source = models.PositiveSmallIntegerField(choices=SOURCE_CHOICES, default=SOURCE_OTHER)
+    
+    old_controle = models.IntegerField(null=True, blank=True)
+    new_controle = models.IntegerField(null=True, blank=True)
+    old_examen = models.IntegerField(null=True, blank=True)
+    new_examen = models.IntegerField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    objects = NoteAuditQuerySet.as_manager()
+    
+    class Meta:
+        verbose_name = "Historique de note"
+        verbose_name_plural = "Historique des notes"
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['note_id', 'id'], name='core_noteaudit_note_idx'),
+            models.Index(fields=['actor_id', 'id'], name='core_noteaudit_actor_idx'),
+        ]
+    
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise PermissionError("Le journal des notes est en ajout seul.")
+        super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        raise PermissionError("Le journal des notes est en ajout seul.")
+    
+    def __str__(self):
+        return f"Note {self.note_id}: {self.get_action_display()} par {self.actor_id} ({self.created_at:%Y-%m-%d %H:%M})"
+
+
+# ============================================
+# EMAIL OUTBOX (see core/emails.py)
+# ============================================
+class OutboundEmail(models.Model):
+    """
+    Durable email queue: rows are inserted in the transaction that triggers
+    the email and delivered later by `manage.py send_emails`
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'En attente'),
+        ('SENDING', 'En cours d\'envoi'),
+        ('SENT', 'Envoyé'),
+        ('FAILED', 'Échec définitif'),
+    ]
+    
+    kind = models.CharField(max_length=50, blank=True, help_text="Ex: inscription_decision")
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    
+    # Worker lease: a crashed worker's rows become claimable again after it expires
+    lock_token = models.CharField(max_length=32, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = "Email en file"
+        verbose_name_plural = "File d'emails"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='core_outbox_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.to_email}: {self.subject} [{self.status}]"
+
+
+# ============================================
+# BACKGROUND JOBS (see core/jobs.py)
+# ============================================
+class JobSchedule(models.Model):
+    """Periodic job: enqueued every `interval_minutes` by the run_jobs scheduler"""
+    name = models.CharField(max_length=100, unique=True)
+    task = models.CharField(max_length=100)
+    params = models.JSONField(default=dict, blank=True)
+    interval_minutes = models.PositiveIntegerField(help_text="Ex: 1440 = tous les jours")
+    next_run_at = models.DateTimeField(default=timezone.now)
+    enabled = models.BooleanField(default=True)
+    
+    class Meta:
+        verbose_name = "Tâche planifiée"
+        verbose_name_plural = "Tâches planifiées"
+        ordering = ['name']
+    
+    def __str__(self):
+        return f"{self.name} ({self.task}, toutes les {self.interval_minutes} min)"
+
+
+class Job(models.Model):
+    STATUS_CHOICES = [
+        ('QUEUED', 'En file'),
+        ('RUNNING', 'En cours'),
+        ('SUCCEEDED', 'Terminé'),
+        ('FAILED', 'Échec'),
+        ('CANCELLED', 'Annulé'),
+    ]
+    ACTIVE_STATUSES = ('QUEUED', 'RUNNING')
+    
+    task = models.CharField(max_length=100)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED')
+    
+    # Progress reported by the task
+    progress = models.PositiveSmallIntegerField(default=0, help_text="Pourcentage (0-100)")
+    progress_message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    
+    cancel_requested = models.BooleanField(default=False)
+    
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs'
+    )
+    schedule = models.ForeignKey(
+        JobSchedule,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs'
+    )
+    
+    # Worker bookkeeping
+    worker = models.CharField(max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = "Tâche de fond"
+        verbose_name_plural = "Tâches de fond"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='core_job_queue_idx'),
+        ]
+    
+    def __str__(self):
+        return f"#{self.id} {self.task} [{self.status}] {self.progress}%"
+
+
+# ============================================
+# DELTA SYNC TOMBSTONES (see core/sync.py)
+# ============================================
+class Tombstone(models.Model):
+    """Deleted row of a synced model, returned to ?updated_since= clients"""
+    model = models.CharField(max_length=30)
+    object_id = models.IntegerField()
+    # Owner of Inscription/Note rows: a student only receives their own tombstones
+    student_id = models.IntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = "Suppression (synchronisation)"
+        verbose_name_plural = "Suppressions (synchronisation)"
+        ordering = ['deleted_at', 'id']
+        indexes = [
+            models.Index(fields=['model', 'deleted_at'], name='core_tombstone_sync_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.model} #{self.object_id} supprimé le {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+# ============================================
+# ACADEMIC-YEAR ARCHIVE (see core/archive.py)
+# ============================================
+# Same columns (and ids) as Inscription / Note: rows are moved with
+# INSERT ... SELECT and moved back by a restore.
+class ArchivedYear(models.Model):
+    academic_year = models.CharField(max_length=9, unique=True, verbose_name="Année Universitaire")
+    archived_at = models.DateTimeField(default=timezone.now)
+    archived_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    inscriptions_count = models.PositiveIntegerField(default=0)
+    notes_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Année archivée"
+        verbose_name_plural = "Années archivées"
+        ordering = ['-academic_year']
+    
+    def __str__(self):
+        return f"{self.academic_year} ({self.inscriptions_count} inscriptions, {self.notes_count} notes)"
+
+
+class ArchivedInscription(models.Model):
+    id = models.BigIntegerField(primary_key=True)  # same id as the hot row (BigAutoField)
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_inscriptions',
+        verbose_name="Étudiant"
+    )
+    filiere = models.ForeignKey(
+        Filiere,
+        on_delete=models.CASCADE,
+        related_name='archived_inscriptions',
+        verbose_name="Filière"
+    )
+    academic_year = models.CharField(max_length=9, verbose_name="Année Universitaire")
+    status = models.CharField(max_length=20, choices=Inscription.STATUS_CHOICES, verbose_name="Statut")
+    validated_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Validé par"
+    )
+    photo_identite = models.ImageField(upload_to='inscriptions/photos/', blank=True)
+    releve_notes = models.FileField(upload_to='inscriptions/releves/', blank=True)
+    certificat_scolarite = models.FileField(upload_to='inscriptions/certificats/', blank=True)
+    validation_date = models.DateTimeField(null=True, blank=True)
+    rejection_reason = models.TextField(blank=True, null=True, verbose_name="Motif de rejet")
+    version = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(verbose_name="Date de demande")
+    updated_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = "Inscription archivée"
+        verbose_name_plural = "Inscriptions archivées"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['academic_year', 'student'], name='core_archinscription_year_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.student_id} → {self.filiere_id} ({self.academic_year}) [{self.status}] (archive)"
+
+
+class ArchivedNote(models.Model):
+    id = models.BigIntegerField(primary_key=True)  # same id as the hot row (BigAutoField)
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_notes',
+        verbose_name="Étudiant"
+    )
+    module = models.ForeignKey(
+        Module,
+        on_delete=models.CASCADE,
+        related_name='archived_notes',
+        verbose_name="Module"
+    )
+    academic_year = models.CharField(max_length=9, verbose_name="Année Universitaire")
+    note_controle = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, verbose_name="Note Contrôle")
+    note_examen = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, verbose_name="Note Examen")
+    note_finale = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, verbose_name="Note Finale")
+    saisie_par = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Saisi par"
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = "Note archivée"
+        verbose_name_plural = "Notes archivées"
+        ordering = ['-academic_year', 'module', 'student']
+        indexes = [
+            models.Index(fields=['academic_year', 'student'], name='core_archnote_year_idx'),
+            models.Index(fields=['student', 'academic_year'], name='core_archnote_student_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.student_id} - {self.module_id} ({self.academic_year}) (archive)"
+
+
+# ============================================
+# CHANGE FEED (see core/changefeed.py)
+# ============================================
+class ChangeEvent(models.Model):
+    """Outbox row written in the same transaction as the change it describes"""
+    id = models.BigAutoField(primary_key=True)
+    # Feed cursor, assigned after commit by changefeed.sequence() (ids are allocated before commit)
+    position = models.BigIntegerField(null=True, blank=True, unique=True)
+    topic = models.CharField(max_length=50)
+    object_id = models.IntegerField()
+    departement_id = models.IntegerField(null=True, blank=True)  # ADMIN scoping
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = "Événement (flux de changements)"
+        verbose_name_plural = "Événements (flux de changements)"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['topic', 'id'], name='core_changeevent_topic_idx'),
+        ]
+    
+    def __str__(self):
+        return f"#{self.id} {self.topic} {self.object_id}"
+
+
+class ChangeFeedConsumer(models.Model):
+    """Committed offset of a downstream consumer (finance, library...)"""
+    name = models.CharField(max_length=100, unique=True)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='change_feed_consumers'
+    )
+    position = models.BigIntegerField(default=0, help_text="Dernier événement traité")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Consommateur du flux"
+        verbose_name_plural = "Consommateurs du flux"
+        ordering = ['name']
+    
+    def __str__(self):
+        return f"{self.name} @ {self.position}"
@@ -0,0 +1,127 @@
+"""
+Prebuilt OpenAPI schema served by /api/schema/
+
+SpectacularAPIView introspects every viewset and serializer on each call.
+Here the schema is generated once per code version (build step:
+`python manage.py build_openapi_schema`, otherwise on the first request),
+written to OPENAPI_SCHEMA['DIR'] as schema-<version>.yaml/.json and then
+served from memory with an ETag.
+
+The code version is settings.OPENAPI_SCHEMA['CODE_VERSION'] (e.g. the git
+commit set at deploy time) or, when empty, a digest of the API source files,
+DRF/drf-spectacular versions and SPECTACULAR_SETTINGS.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+
+DEFAULTS = {
+    'DIR': None,            # default: BASE_DIR / 'openapi'
+    'CODE_VERSION': '',
+    'SOURCE_DIRS': ('core', 'users', 'academiyahub'),
+}
+
+FORMATS = {
+    'yaml': 'application/vnd.oai.openapi; charset=utf-8',
+    'json': 'application/vnd.oai.openapi+json; charset=utf-8',
+}
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def get_config():
+    config = {**DEFAULTS, **getattr(settings, 'OPENAPI_SCHEMA', {})}
+    config['DIR'] = Path(config['DIR'] or Path(settings.BASE_DIR) / 'openapi')
+    return config
+
+
+def code_version(config=None):
+    config = config or get_config()
+    if config['CODE_VERSION']:
+        return str(config['CODE_VERSION'])
+
+    import drf_spectacular
+    import rest_framework
+
+    digest = hashlib.sha256()
+    digest.update(f"{rest_framework.VERSION}|{drf_spectacular.__version__}|{settings.SPECTACULAR_SETTINGS!r}".encode())
+    base_dir = Path(settings.BASE_DIR)
+    for name in config['SOURCE_DIRS']:
+        for path in sorted((base_dir / name).rglob('*.py')):
+            # Migrations and commands never change the API surface
+            if 'migrations' in path.parts or 'management' in path.parts:
+                continue
+            digest.update(str(path.relative_to(base_dir)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _paths(directory, version):
+    return {fmt: directory / f'schema-{version}.{fmt}' for fmt in FORMATS}
+
+
+def _write_atomic(path, content):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.schema-')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def generate():
+    """{'yaml': bytes, 'json': bytes}, introspecting the whole API (slow)"""
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    # Same generator and options as SpectacularAPIView
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(urlconf=spectacular_settings.SERVE_URLCONF)
+    schema = generator.get_schema(request=None, public=spectacular_settings.SERVE_PUBLIC)
+    return {
+        'yaml': OpenApiYamlRenderer().render(schema, renderer_context={}),
+        'json': OpenApiJsonRenderer().render(schema, renderer_context={}),
+    }
+
+
+def build(force=False):
+    """Write the schema of the current code version if missing; returns (version, created)"""
+    config = get_config()
+    version = code_version(config)
+    paths = _paths(config['DIR'], version)
+    if not force and all(path.exists() for path in paths.values()):
+        return version, False
+
+    config['DIR'].mkdir(parents=True, exist_ok=True)
+    for fmt, content in generate().items():
+        _write_atomic(paths[fmt], content)
+    # Schemas of previous code versions are obsolete
+    for path in config['DIR'].glob('schema-*'):
+        if path not in paths.values():
+            path.unlink(missing_ok=True)
+    return version, True
+
+
+def load():
+    """Schema of the current code version, built on first use then kept in memory"""
+    if _cache:
+        return _cache
+    with _lock:
+        if not _cache:
+            version, _ = build()
+            loaded = {}
+            for fmt, path in _paths(get_config()['DIR'], version).items():
+                content = path.read_bytes()
+                loaded[fmt] = {
+                    'content': content,
+                    'etag': '"%s"' % hashlib.sha256(content).hexdigest()[:32],
+                }
+            _cache.update(loaded)
+    return _cache
+
+
+def clear_cache():
+    _cache.clear()
@@ -0,0 +1,55 @@
+"""
+Password hashing across a process pool
+
+make_password() (PBKDF2) is CPU-bound and holds the GIL: thousands of
+hashes in one process use one core. HasherPool spreads them over worker
+processes, one chunk per worker to amortize the pickling round trips.
+
+No model imports here: with the spawn/forkserver start methods, workers
+import this module before Django is set up (_init_worker does it).
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _init_worker():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def hash_passwords(passwords):
+    from django.contrib.auth.hashers import make_password
+
+    return [make_password(password) for password in passwords]
+
+
+class HasherPool:
+    """
+    with HasherPool(workers=8) as pool:
+        hashes = pool.hash(['...', ...])     # same order as the input
+    workers <= 1 hashes in the calling process.
+    """
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def hash(self, passwords):
+        passwords = list(passwords)
+        if self._executor is None or len(passwords) < 2:
+            return hash_passwords(passwords)
+        size = -(-len(passwords) // self.workers)
+        chunks = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+        return [hashed for chunk in self._executor.map(hash_passwords, chunks) for hashed in chunk]
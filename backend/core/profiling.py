@@ -0,0 +1,141 @@
+"""
+On-demand sampling profiler for individual API requests
+
+A background thread samples the stack of the thread serving the request at
+a fixed interval. Stacks include Django, DRF (serializers, renderers) and ORM
+frames; time spent inside database calls is measured separately.
+
+Reports:
+    - collapsed stacks ("a;b;c 12"), loadable in speedscope or flamegraph.pl
+    - indented call tree with inclusive percentages (text)
+"""
+import os
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+
+
+DEFAULTS = {
+    'ENABLED': None,     # None = settings.DEBUG
+    'INTERVAL_MS': 2,
+    'OUTPUT_DIR': None,
+    'MIN_PERCENT': 0.5,  # call tree pruning
+}
+
+_PATH_PREFIXES = sorted(
+    {p for p in (sysconfig.get_paths().get('purelib'), sysconfig.get_paths().get('stdlib')) if p},
+    key=len,
+    reverse=True,
+)
+
+
+def get_config():
+    config = {**DEFAULTS, **getattr(settings, 'PROFILER', {})}
+    if config['ENABLED'] is None:
+        config['ENABLED'] = settings.DEBUG
+    if not config['OUTPUT_DIR']:
+        config['OUTPUT_DIR'] = os.path.join(settings.BASE_DIR, 'profiles')
+    return config
+
+
+def _frame_label(code):
+    filename = code.co_filename
+    for prefix in _PATH_PREFIXES + [str(settings.BASE_DIR)]:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):].lstrip(os.sep)
+            break
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+class SamplingProfiler:
+    """Samples one thread's call stack every `interval` seconds"""
+    def __init__(self, interval=0.002, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()
+        self.samples = 0
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.wall_time = 0.0
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+        self.wall_time = time.perf_counter() - self._start
+
+    def _run(self):
+        own_file = __file__
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                if frame.f_code.co_filename != own_file:
+                    stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """connection.execute_wrapper hook measuring ORM/database time"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.db_queries += 1
+
+    # ---- reports ----
+    def collapsed(self):
+        return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def call_tree(self, min_percent=0.5):
+        tree = {}
+        for stack, count in self.stacks.items():
+            node = tree
+            for label in stack:
+                entry = node.setdefault(label, [0, {}])
+                entry[0] += count
+                node = entry[1]
+
+        total = self.samples or 1
+        lines = [
+            f'Wall time: {self.wall_time * 1000:.1f} ms | samples: {self.samples} '
+            f'| DB: {self.db_queries} queries, {self.db_time * 1000:.1f} ms '
+            f'({self.db_time / self.wall_time * 100 if self.wall_time else 0:.1f}%)',
+            '',
+        ]
+
+        def walk(node, depth):
+            for label, (count, children) in sorted(node.items(), key=lambda item: -item[1][0]):
+                percent = count / total * 100
+                if percent < min_percent:
+                    continue
+                lines.append(f"{percent:6.1f}%  {'  ' * depth}{label}")
+                walk(children, depth + 1)
+
+        walk(tree, 0)
+        return '\n'.join(lines) + '\n'
+
+    def save(self, directory, label=''):
+        """Store both reports on disk, returns the profile id"""
+        profile_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f'{profile_id}.collapsed'), 'w', encoding='utf-8') as f:
+            f.write(self.collapsed())
+        with open(os.path.join(directory, f'{profile_id}.txt'), 'w', encoding='utf-8') as f:
+            if label:
+                f.write(f'{label}\n')
+            f.write(self.call_tree(get_config()['MIN_PERCENT']))
+        return profile_id
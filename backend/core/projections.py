@@ -0,0 +1,189 @@
+"""
+Read-only list projections built straight from .values()
+
+Same JSON shape and formatting as InscriptionSerializer / NoteSerializer
+(dates and decimals go through the serializers' own fields), without
+model instances or field-by-field serialization. Used by the list actions
+of InscriptionViewSet and NoteViewSet; write paths keep the serializers.
+
+Rows are produced lazily (RowStream): ORJSONRenderer encodes them one by
+one, so a 50k-row response never holds 50k dicts at once.
+"""
+from functools import lru_cache
+
+from .models import Module
+from .renderers import RowStream
+
+
+USER_FIELDS = ('id', 'username', 'email', 'first_name', 'last_name', 'role')
+
+
+@lru_cache(maxsize=None)
+def _fields(serializer_class):
+    return serializer_class().fields
+
+
+def _converters(serializer_class, names):
+    """Bound to_representation of the fields whose JSON differs from the DB value"""
+    fields = _fields(serializer_class)
+    return [(name, fields[name].to_representation) for name in names]
+
+
+def _convert(row, converters):
+    for name, to_representation in converters:
+        if row[name] is not None:
+            row[name] = to_representation(row[name])
+    return row
+
+
+def _user_lookups(prefix):
+    return [f'{prefix}__{field}' for field in USER_FIELDS]
+
+
+def _user(row, prefix):
+    if row[f'{prefix}__id'] is None:
+        return None
+    return {field: row[f'{prefix}__{field}'] for field in USER_FIELDS}
+
+
+def _full_name(row, prefix, default):
+    if row[f'{prefix}__id'] is None:
+        return default
+    return f"{row[f'{prefix}__last_name'].upper()} {row[f'{prefix}__first_name']}"
+
+
+# ============================================
+# INSCRIPTIONS
+# ============================================
+INSCRIPTION_LOOKUPS = [
+    'id', 'student_id', 'filiere_id', 'academic_year', 'status', 'validated_by_id',
+    'validation_date', 'rejection_reason', 'version', 'created_at', 'updated_at',
+    'filiere__name', 'filiere__code', 'filiere__departement__name', 'filiere__niveau', 'filiere__capacity',
+    *_user_lookups('student'), *_user_lookups('validated_by'),
+]
+
+
+def inscriptions(queryset, chunk_size=2000):
+    """Rows identical to InscriptionSerializer(queryset, many=True).data"""
+    return RowStream(_inscription_rows(queryset, chunk_size))
+
+
+def _inscription_rows(queryset, chunk_size):
+    from .serializers import InscriptionSerializer
+
+    converters = _converters(InscriptionSerializer, ('validation_date', 'created_at', 'updated_at'))
+    for row in queryset.values(*INSCRIPTION_LOOKUPS).iterator(chunk_size=chunk_size):
+        _convert(row, converters)
+        yield {
+            'id': row['id'],
+            'student': row['student_id'],
+            'student_details': _user(row, 'student'),
+            'student_name': _full_name(row, 'student', 'Inconnu'),
+            'filiere': row['filiere_id'],
+            'filiere_details': {
+                'id': row['filiere_id'],
+                'name': row['filiere__name'],
+                'code': row['filiere__code'],
+                'departement_name': row['filiere__departement__name'],
+                'niveau': row['filiere__niveau'],
+                'capacity': row['filiere__capacity'],
+            },
+            'filiere_name': row['filiere__name'],
+            'departement_name': row['filiere__departement__name'],
+            'academic_year': row['academic_year'],
+            'status': row['status'],
+            'validated_by': row['validated_by_id'],
+            'validated_by_details': _user(row, 'validated_by'),
+            'validator_name': _full_name(row, 'validated_by', '-'),
+            'validation_date': row['validation_date'],
+            'rejection_reason': row['rejection_reason'],
+            'version': row['version'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+        }
+
+
+# ============================================
+# NOTES
+# ============================================
+NOTE_LOOKUPS = [
+    'id', 'student_id', 'module_id', 'academic_year', 'note_controle', 'note_examen', 'note_finale',
+    'saisie_par_id', 'created_at', 'updated_at',
+    *_user_lookups('student'), *_user_lookups('saisie_par'),
+]
+
+MODULE_LOOKUPS = [
+    'id', 'name', 'code', 'filiere_id', 'enseignant_id', 'semestre', 'coefficient', 'poids_controle',
+    'heures_cm', 'heures_td', 'heures_tp', 'description', 'created_at', 'updated_at',
+    'filiere__name', 'filiere__code', 'filiere__departement__name', 'filiere__niveau', 'filiere__capacity',
+    *_user_lookups('enseignant'),
+]
+
+
+def modules(module_ids):
+    """{id: ModuleSerializer-shaped dict}, one query; module_ids may be a subquery"""
+    from .serializers import ModuleSerializer
+
+    converters = _converters(ModuleSerializer, ('coefficient', 'poids_controle', 'created_at', 'updated_at'))
+    result = {}
+    for row in Module.objects.filter(id__in=module_ids).values(*MODULE_LOOKUPS).order_by():
+        _convert(row, converters)
+        result[row['id']] = {
+            'id': row['id'],
+            'name': row['name'],
+            'code': row['code'],
+            'filiere': row['filiere_id'],
+            'filiere_details': {
+                'id': row['filiere_id'],
+                'name': row['filiere__name'],
+                'code': row['filiere__code'],
+                'departement_name': row['filiere__departement__name'],
+                'niveau': row['filiere__niveau'],
+                'capacity': row['filiere__capacity'],
+            },
+            'enseignant': row['enseignant_id'],
+            'enseignant_details': _user(row, 'enseignant'),
+            'semestre': row['semestre'],
+            'coefficient': row['coefficient'],
+            'poids_controle': row['poids_controle'],
+            'heures_cm': row['heures_cm'],
+            'heures_td': row['heures_td'],
+            'heures_tp': row['heures_tp'],
+            'total_heures': row['heures_cm'] + row['heures_td'] + row['heures_tp'],
+            'description': row['description'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+        }
+    return result
+
+
+def notes(queryset, chunk_size=2000):
+    """Rows identical to NoteSerializer(queryset, many=True).data"""
+    return RowStream(_note_rows(queryset, chunk_size))
+
+
+def _note_rows(queryset, chunk_size):
+    from .serializers import NoteSerializer
+
+    converters = _converters(
+        NoteSerializer, ('note_controle', 'note_examen', 'note_finale', 'created_at', 'updated_at')
+    )
+    # Notes of a list share a handful of modules: one query, one dict per module
+    details = modules(queryset.order_by().values('module_id'))
+    for row in queryset.values(*NOTE_LOOKUPS).iterator(chunk_size=chunk_size):
+        _convert(row, converters)
+        yield {
+            'id': row['id'],
+            'student': row['student_id'],
+            'student_details': _user(row, 'student'),
+            'module': row['module_id'],
+            'module_details': details[row['module_id']],
+            'academic_year': row['academic_year'],
+            'note_controle': row['note_controle'],
+            'note_examen': row['note_examen'],
+            'note_finale': row['note_finale'],
+            'saisie_par': row['saisie_par_id'],
+            'saisie_par_details': _user(row, 'saisie_par'),
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+        }
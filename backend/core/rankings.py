@@ -0,0 +1,192 @@
+"""
+Per-filiere dense ranking with SQL window functions
+
+The LeaderboardEntry table holds one row per (filiere, academic_year, student)
+with the coefficient-weighted average and its DENSE_RANK() in the filiere.
+
+    - refresh_partition(): recompute a whole (filiere, year) in SQL
+      (aggregate + DENSE_RANK window) and replace its rows
+    - update_students(): incremental path: recompute the averages of the
+      given students only, then re-rank the partition with a single
+      UPDATE ... FROM (SELECT DENSE_RANK() OVER ...) touching only rows whose
+      rank changed
+    - update_student_on_commit(): used on Note writes: students touched by a
+      transaction are updated when it commits, one aggregate + one re-rank per
+      partition, so a loop of N Note saves does not re-rank N times
+    - refresh_on_commit(): used on Module edits (coefficient, filiere): the
+      whole partition, or every year of the filiere, is rebuilt on commit
+"""
+import threading
+
+from django.db import connection, transaction
+from django.db.models import F, Sum, Count
+
+_local = threading.local()
+
+
+def _weighted_averages(note_model, **filters):
+    return (
+        note_model.objects
+        .filter(note_finale__isnull=False, **filters)
+        .values('student_id', 'module__filiere_id', 'academic_year')
+        .annotate(
+            weighted_sum=Sum(F('note_finale') * F('module__coefficient')),
+            weights=Sum('module__coefficient'),
+            note_count=Count('id'),
+        )
+    )
+
+
+def _average(row):
+    return round(row['weighted_sum'] / row['weights'], 2) if row['weights'] else 0
+
+
+def rerank(filiere_id, academic_year, entry_model=None):
+    """Recompute dense ranks of one partition in SQL, only rows that changed are written"""
+    if entry_model is None:
+        from .models import LeaderboardEntry as entry_model
+    table = connection.ops.quote_name(entry_model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {table} SET rank = ranked.new_rank
+            FROM (
+                SELECT id, DENSE_RANK() OVER (ORDER BY average DESC) AS new_rank
+                FROM {table}
+                WHERE filiere_id = %s AND academic_year = %s
+            ) AS ranked
+            WHERE {table}.id = ranked.id AND {table}.rank <> ranked.new_rank
+            """,
+            [filiere_id, academic_year],
+        )
+
+
+def refresh_partition(filiere_id, academic_year, note_model=None, entry_model=None):
+    """Rebuild one (filiere, year) leaderboard from the notes"""
+    if note_model is None:
+        from .models import Note as note_model
+    if entry_model is None:
+        from .models import LeaderboardEntry as entry_model
+
+    rows = _weighted_averages(note_model, module__filiere_id=filiere_id, academic_year=academic_year)
+    with transaction.atomic():
+        entry_model.objects.filter(filiere_id=filiere_id, academic_year=academic_year).delete()
+        entry_model.objects.bulk_create(
+            [
+                entry_model(
+                    filiere_id=filiere_id,
+                    academic_year=academic_year,
+                    student_id=row['student_id'],
+                    average=_average(row),
+                    note_count=row['note_count'],
+                )
+                for row in rows
+            ],
+            batch_size=1000,
+        )
+        rerank(filiere_id, academic_year, entry_model)
+
+
+def refresh_filiere(filiere_id):
+    """Every academic year of a filiere (e.g. after a coefficient change)"""
+    from .models import Note
+    years = (
+        Note.objects.filter(module__filiere_id=filiere_id)
+        .values_list('academic_year', flat=True).order_by().distinct()
+    )
+    for academic_year in list(years):
+        refresh_partition(filiere_id, academic_year)
+
+
+def rebuild_all(note_model=None, entry_model=None):
+    """Full rebuild; returns the number of partitions"""
+    if note_model is None:
+        from .models import Note as note_model
+    partitions = (
+        note_model.objects.values_list('module__filiere_id', 'academic_year').order_by().distinct()
+    )
+    partitions = list(partitions)
+    for filiere_id, academic_year in partitions:
+        refresh_partition(filiere_id, academic_year, note_model, entry_model)
+    return len(partitions)
+
+
+def update_students(student_ids, filiere_id, academic_year):
+    """Incremental update of some students of a partition, then one re-rank"""
+    from .models import LeaderboardEntry, Note
+
+    student_ids = set(student_ids)
+    rows = {
+        row['student_id']: row
+        for row in _weighted_averages(
+            Note, student_id__in=student_ids, module__filiere_id=filiere_id, academic_year=academic_year
+        )
+    }
+    partition = {'filiere_id': filiere_id, 'academic_year': academic_year}
+    with transaction.atomic():
+        entries = {
+            entry.student_id: entry
+            for entry in LeaderboardEntry.objects.filter(**partition, student_id__in=student_ids)
+        }
+        # Students without a final grade any more leave the leaderboard
+        gone = [entries[student_id].pk for student_id in entries if student_id not in rows]
+        if gone:
+            LeaderboardEntry.objects.filter(pk__in=gone).delete()
+        changed, created = [], []
+        for student_id, row in rows.items():
+            average, note_count = _average(row), row['note_count']
+            entry = entries.get(student_id)
+            if entry is None:
+                created.append(LeaderboardEntry(**partition, student_id=student_id, average=average, note_count=note_count))
+            elif (entry.average, entry.note_count) != (average, note_count):
+                entry.average, entry.note_count = average, note_count
+                changed.append(entry)
+        LeaderboardEntry.objects.bulk_create(created)
+        LeaderboardEntry.objects.bulk_update(changed, ['average', 'note_count'])
+        if gone or changed or created:
+            rerank(filiere_id, academic_year)
+
+
+def update_student(student_id, filiere_id, academic_year):
+    """Incremental update after a Note write"""
+    update_students([student_id], filiere_id, academic_year)
+
+
+def _flush():
+    pending, _local.pending = _local.pending, None
+    for (filiere_id, academic_year), student_ids in sorted(pending.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+        if academic_year is None:
+            refresh_filiere(filiere_id)
+        elif (filiere_id, None) in pending:
+            continue  # covered by the refresh of every year of the filiere
+        elif student_ids is None:
+            refresh_partition(filiere_id, academic_year)
+        else:
+            update_students(student_ids, filiere_id, academic_year)
+
+
+def _schedule(filiere_id, academic_year, student_id=None):
+    pending = getattr(_local, 'pending', None)
+    # The callback of a rolled back transaction is dropped: start a new dict
+    registered = pending is not None and any(entry[1] is _flush for entry in connection.run_on_commit)
+    if not registered:
+        pending = _local.pending = {}
+    key = (filiere_id, academic_year)
+    # {(filiere, year): student ids to update, or None to rebuild the partition}
+    if student_id is None:
+        pending[key] = None
+    elif pending.get(key, ()) is not None:
+        pending.setdefault(key, set()).add(student_id)
+    if not registered:
+        # Outside a transaction this runs right away
+        transaction.on_commit(_flush)
+
+
+def update_student_on_commit(student_id, filiere_id, academic_year):
+    """Update one student's leaderboard entry when the transaction commits (batched per partition)"""
+    _schedule(filiere_id, academic_year, student_id)
+
+
+def refresh_on_commit(filiere_id, academic_year=None):
+    """Refresh (filiere, year), or every year of the filiere, once when the transaction commits"""
+    _schedule(filiere_id, academic_year)
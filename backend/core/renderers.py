@@ -0,0 +1,83 @@
+"""
+Fast renderers (settings.REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'])
+
+ORJSONRenderer      application/json, same output as DRF's JSONRenderer
+MessagePackRenderer application/msgpack (Accept: application/msgpack or
+                    ?format=msgpack), only enabled when msgpack is installed
+
+Both accept a RowStream (lazy list of rows, see core/projections.py).
+
+Types orjson/msgpack do not know natively (dates, Decimal, lazy strings...)
+go through DRF's JSONEncoder.default, so values are formatted exactly as
+before ("...Z" datetimes, Decimal as float).
+"""
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+
+_encoder = JSONEncoder()
+
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class RowStream:
+    """JSON array produced lazily: encoded row by row instead of building the whole list"""
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+def _dumps(data):
+    return orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        # Indented output (browsable API, "; indent=4") is rare: keep DRF's encoder
+        if self.get_indent(accepted_media_type, renderer_context):
+            if isinstance(data, RowStream):
+                data = list(data)
+            return super().render(data, accepted_media_type, renderer_context)
+        if isinstance(data, RowStream):
+            return self._render_rows(data)
+        try:
+            return _dumps(data)
+        except orjson.JSONEncodeError:
+            # e.g. integers above 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+
+    def _render_rows(self, rows):
+        out = bytearray(b'[')
+        for row in rows:
+            out += _dumps(row)
+            out += b','
+        if len(out) > 1:
+            out[-1:] = b']'
+        else:
+            out += b']'
+        return bytes(out)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, RowStream):
+            data = list(data)
+        return msgpack.packb(data, default=_encoder.default, use_bin_type=True, datetime=False)
@@ -0,0 +1,99 @@
+"""
+Incremental time-series rollup of inscription events
+
+Each event (created, validated, rejected) bumps one counter of the
+EnrollmentRollup row for (day, filiere, academic_year). Trend queries then
+read at most (days x filieres) small rows instead of every inscription.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek, TruncYear
+from django.utils import timezone
+
+
+EVENT_FIELDS = {
+    'CREATED': 'created_count',
+    'VALIDATED': 'validated_count',
+    'REJECTED': 'rejected_count',
+}
+
+GRANULARITIES = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'year': TruncYear,
+}
+
+
+def record(event, filiere_id, academic_year, count=1, when=None):
+    """Add `count` events to today's (or `when`'s) bucket with an UPDATE, INSERT if missing"""
+    from .models import EnrollmentRollup
+
+    if not count:
+        return
+    field = EVENT_FIELDS[event]
+    day = timezone.localdate(when) if when else timezone.localdate()
+    key = {'date': day, 'filiere_id': filiere_id, 'academic_year': academic_year}
+
+    if EnrollmentRollup.objects.filter(**key).update(**{field: F(field) + count}):
+        return
+    try:
+        with transaction.atomic():
+            EnrollmentRollup.objects.create(**key, **{field: count})
+    except IntegrityError:
+        # Row created concurrently by another request
+        EnrollmentRollup.objects.filter(**key).update(**{field: F(field) + count})
+
+
+def rebuild(inscription_model, rollup_model, archived_model=None):
+    """Recompute every bucket from the inscriptions table, archived years included (backfill / repair)"""
+    buckets = {}
+
+    def add(day, filiere_id, academic_year, field):
+        row = buckets.setdefault((day, filiere_id, academic_year), {
+            'created_count': 0, 'validated_count': 0, 'rejected_count': 0,
+        })
+        row[field] += 1
+
+    for model in filter(None, (inscription_model, archived_model)):
+        rows = model.objects.values_list('filiere_id', 'academic_year', 'status', 'created_at', 'validation_date')
+        for filiere_id, academic_year, status, created_at, validation_date in rows.iterator(chunk_size=2000):
+            add(timezone.localdate(created_at), filiere_id, academic_year, 'created_count')
+            if status in ('VALIDATED', 'REJECTED') and validation_date:
+                add(timezone.localdate(validation_date), filiere_id, academic_year, EVENT_FIELDS[status])
+
+    with transaction.atomic():
+        rollup_model.objects.all().delete()
+        rollup_model.objects.bulk_create(
+            [
+                rollup_model(date=day, filiere_id=filiere_id, academic_year=academic_year, **counts)
+                for (day, filiere_id, academic_year), counts in buckets.items()
+            ],
+            batch_size=1000,
+        )
+    return len(buckets)
+
+
+def trends(queryset, granularity='month'):
+    """Aggregate rollup rows into periods: [{'period', 'created', 'validated', 'rejected'}]"""
+    trunc = GRANULARITIES[granularity]
+    rows = (
+        queryset
+        .annotate(period=trunc('date'))
+        .values('period')
+        .annotate(
+            created=Sum('created_count'),
+            validated=Sum('validated_count'),
+            rejected=Sum('rejected_count'),
+        )
+        .order_by('period')
+    )
+    return [
+        {
+            'period': row['period'].isoformat() if hasattr(row['period'], 'isoformat') else row['period'],
+            'created': row['created'],
+            'validated': row['validated'],
+            'rejected': row['rejected'],
+        }
+        for row in rows
+    ]
@@ -0,0 +1,236 @@
+"""
+Search subsystem for students/users, modules and filieres
+
+Documents are stored in the SearchEntry table and kept in sync by signals
+(see core/signals.py). On SQLite an FTS5 external-content table
+(core_search_fts) indexes them through triggers, giving ranked (bm25) prefix
+search. Other backends fall back to LIKE lookups on the normalized text: a
+prefix of the text or of any word ('% token'), i.e. a sequential scan of
+core_searchentry (one short row per user, module and filiere).
+
+Rebuild everything with:
+    python manage.py rebuild_search_index
+"""
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+
+FTS_TABLE = 'core_search_fts'
+
+KIND_USER = 'user'
+KIND_MODULE = 'module'
+KIND_FILIERE = 'filiere'
+KINDS = (KIND_USER, KIND_MODULE, KIND_FILIERE)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+# ============================================
+# FTS5 DDL (SQLite only)
+# ============================================
+CREATE_FTS_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, search_text,
+        content='core_searchentry', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS core_searchentry_ai AFTER INSERT ON core_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, search_text) VALUES (new.id, new.title, new.search_text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS core_searchentry_ad AFTER DELETE ON core_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, search_text) VALUES ('delete', old.id, old.title, old.search_text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS core_searchentry_au AFTER UPDATE ON core_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, search_text) VALUES ('delete', old.id, old.title, old.search_text);
+        INSERT INTO {FTS_TABLE}(rowid, title, search_text) VALUES (new.id, new.title, new.search_text);
+    END
+    """,
+]
+
+# Re-reads every row of core_searchentry into the FTS index
+REBUILD_FTS_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+DROP_FTS_SQL = [
+    'DROP TRIGGER IF EXISTS core_searchentry_ai',
+    'DROP TRIGGER IF EXISTS core_searchentry_ad',
+    'DROP TRIGGER IF EXISTS core_searchentry_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+
+def uses_fts(conn=None):
+    return (conn or connection).vendor == 'sqlite'
+
+
+# ============================================
+# DOCUMENTS
+# ============================================
+def normalize(text):
+    """Lowercase and strip accents ('Génie' -> 'genie')"""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def _join(*parts):
+    return ' '.join(str(p) for p in parts if p)
+
+
+# Fields read by user_document(): saves touching none of them (last_login...) keep the entry
+USER_FIELDS = frozenset(('username', 'first_name', 'last_name', 'email', 'cne', 'matricule', 'role'))
+
+
+def user_document(user):
+    return {
+        'title': _join((user.last_name or '').upper(), user.first_name) or user.username,
+        'subtitle': _join(user.role, user.cne or user.matricule or user.email),
+        'search_text': normalize(_join(
+            user.username, user.first_name, user.last_name, user.email, user.cne, user.matricule
+        )),
+    }
+
+
+def module_document(module):
+    filiere = module.filiere
+    return {
+        'title': f"{module.code} - {module.name}",
+        'subtitle': f"{filiere.code} - {filiere.name} (S{module.semestre})",
+        'search_text': normalize(_join(
+            module.code, module.name, filiere.code, filiere.name, module.description
+        )),
+    }
+
+
+def filiere_document(filiere):
+    departement = filiere.departement
+    return {
+        'title': f"{filiere.code} - {filiere.name}",
+        'subtitle': f"{departement.code} - {departement.name} ({filiere.niveau})",
+        'search_text': normalize(_join(
+            filiere.code, filiere.name, filiere.niveau, departement.code, departement.name, filiere.description
+        )),
+    }
+
+
+DOCUMENT_BUILDERS = {
+    KIND_USER: user_document,
+    KIND_MODULE: module_document,
+    KIND_FILIERE: filiere_document,
+}
+
+
+def index_object(kind, obj, entry_model=None):
+    """Insert or refresh the search document of one object"""
+    if entry_model is None:
+        from .models import SearchEntry as entry_model
+    entry_model.objects.update_or_create(
+        kind=kind, object_id=obj.pk, defaults=DOCUMENT_BUILDERS[kind](obj)
+    )
+
+
+def unindex_object(kind, pk):
+    from .models import SearchEntry
+    SearchEntry.objects.filter(kind=kind, object_id=pk).delete()
+
+
+def rebuild(user_model, module_model, filiere_model, entry_model, batch_size=1000):
+    """Rebuild every document with bulk inserts, returns the number indexed"""
+    entry_model.objects.all().delete()
+    sources = [
+        (KIND_USER, user_model.objects.all()),
+        (KIND_MODULE, module_model.objects.select_related('filiere')),
+        (KIND_FILIERE, filiere_model.objects.select_related('departement')),
+    ]
+    total = 0
+    for kind, queryset in sources:
+        builder = DOCUMENT_BUILDERS[kind]
+        batch = []
+        for obj in queryset.iterator(chunk_size=batch_size):
+            batch.append(entry_model(kind=kind, object_id=obj.pk, **builder(obj)))
+            if len(batch) >= batch_size:
+                entry_model.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        entry_model.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+# ============================================
+# QUERY
+# ============================================
+def tokenize(query):
+    return _TOKEN_RE.findall(normalize(query))
+
+
+def search(query, kinds=KINDS, limit=20, offset=0):
+    """
+    Ranked search. Every token must match (as a prefix).
+    Returns (total, [{'kind', 'id', 'title', 'subtitle', 'score'}, ...])
+    """
+    tokens = tokenize(query)
+    if not tokens or not kinds:
+        return 0, []
+    if uses_fts():
+        return _search_fts(tokens, kinds, limit, offset)
+    return _search_like(tokens, kinds, limit, offset)
+
+
+def _search_fts(tokens, kinds, limit, offset):
+    match = ' AND '.join(f'"{token}"*' for token in tokens)
+    kind_placeholders = ', '.join(['%s'] * len(kinds))
+    where = f"{FTS_TABLE} MATCH %s AND e.kind IN ({kind_placeholders})"
+    params = [match, *kinds]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT COUNT(*) FROM {FTS_TABLE} JOIN core_searchentry e ON e.id = {FTS_TABLE}.rowid WHERE {where}",
+            params,
+        )
+        total = cursor.fetchone()[0]
+        cursor.execute(
+            f"""
+            SELECT e.kind, e.object_id, e.title, e.subtitle, bm25({FTS_TABLE}, 10.0, 1.0) AS score
+            FROM {FTS_TABLE} JOIN core_searchentry e ON e.id = {FTS_TABLE}.rowid
+            WHERE {where}
+            ORDER BY score
+            LIMIT %s OFFSET %s
+            """,
+            params + [limit, offset],
+        )
+        rows = cursor.fetchall()
+    return total, [
+        {'kind': kind, 'id': object_id, 'title': title, 'subtitle': subtitle, 'score': round(-score, 4)}
+        for kind, object_id, title, subtitle, score in rows
+    ]
+
+
+def _search_like(tokens, kinds, limit, offset):
+    from .models import SearchEntry
+
+    condition = Q()
+    for token in tokens:
+        condition &= Q(search_text__startswith=token) | Q(search_text__contains=f' {token}')
+    queryset = (
+        SearchEntry.objects.filter(condition, kind__in=kinds)
+        .annotate(score=Case(
+            When(search_text__startswith=tokens[0], then=Value(2)),
+            default=Value(1),
+            output_field=IntegerField(),
+        ))
+        .order_by('-score', 'title')
+    )
+    total = queryset.count()
+    rows = queryset.values('kind', 'object_id', 'title', 'subtitle', 'score')[offset:offset + limit]
+    return total, [
+        {'kind': r['kind'], 'id': r['object_id'], 'title': r['title'], 'subtitle': r['subtitle'], 'score': r['score']}
+        for r in rows
+    ]
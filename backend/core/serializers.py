@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Departement, Filiere, Module, Inscription, Note
+from . import archive, audit, jobs
+from .models import Departement, Filiere, Module, Inscription, Note, Deliberation, DeliberationResult, LeaderboardEntry, NoteAudit, Job, ArchivedYear, ChangeEvent, ChangeFeedConsumer
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -62,7 +63,7 @@ class FiliereSerializer(serializers.ModelSerializer):
         model = Filiere
         fields = [
             'id', 'name', 'code', 'departement', 'departement_details',
-            'niveau', 'capacity', 'description',
+            'niveau', 'capacity', 'description', 'poids_controle',
             'modules_count', 'inscriptions_count',
             'created_at', 'updated_at'
         ]
@@ -103,7 +104,7 @@ class ModuleSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'code', 'filiere', 'filiere_details',
             'enseignant', 'enseignant_details',
-            'semestre', 'coefficient',
+            'semestre', 'coefficient', 'poids_controle',
             'heures_cm', 'heures_td', 'heures_tp', 'total_heures',
             'description', 'created_at', 'updated_at'
         ]
@@ -162,10 +163,11 @@ class InscriptionSerializer(serializers.ModelSerializer):
             'filiere', 'filiere_details', 'filiere_name', 'departement_name', # <--- Added names
             'academic_year', 'status',
             'validated_by', 'validated_by_details', 'validator_name', # <--- Added validator_name
-            'validation_date', 'rejection_reason',
+            'validation_date', 'rejection_reason', 'version',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['created_at', 'updated_at', 'validated_by', 'validation_date']
+        # Status only changes through Inscription.transition() (POST .../validate/)
+        read_only_fields = ['status', 'created_at', 'updated_at', 'validated_by', 'validation_date', 'version']
 
     # 3. Helper Methods to Format Names safely
     def get_student_name(self, obj):
@@ -184,6 +186,11 @@ class InscriptionCreateSerializer(serializers.ModelSerializer):
         model = Inscription
         fields = ['filiere', 'academic_year']
     
+    def validate_academic_year(self, value):
+        if archive.is_archived(value):
+            raise serializers.ValidationError(f"L'année {value} est archivée (lecture seule).")
+        return value
+    
     def validate_filiere(self, value):
         """Validate that the filiere exists and is accepting inscriptions"""
         if not value:
@@ -263,6 +270,7 @@ class InscriptionValidateSerializer(serializers.Serializer):
     """Serializer for ADMIN to validate/reject inscriptions"""
     status = serializers.ChoiceField(choices=['VALIDATED', 'REJECTED'])
     rejection_reason = serializers.CharField(required=False, allow_blank=True)
+    version = serializers.IntegerField(required=False, min_value=0, help_text="Version lue par le client (verrou optimiste)")
     
     def validate(self, data):
         if data['status'] == 'REJECTED' and not data.get('rejection_reason'):
@@ -270,6 +278,32 @@ class InscriptionValidateSerializer(serializers.Serializer):
                 'rejection_reason': 'Un motif de rejet est requis.'
             })
         return data
+
+
+class InscriptionBulkValidateSerializer(InscriptionValidateSerializer):
+    """Serializer for ADMIN bulk validation: a list of ids OR a filter on pending inscriptions"""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=5000
+    )
+    filiere = serializers.IntegerField(required=False)
+    academic_year = serializers.CharField(required=False, max_length=9)
+    version = None  # Bulk transitions are guarded by status only
+    
+    def validate(self, data):
+        data = super().validate(data)
+        has_filter = 'filiere' in data or 'academic_year' in data
+        if 'ids' in data and has_filter:
+            raise serializers.ValidationError(
+                "Utilisez soit 'ids', soit un filtre (filiere / academic_year), pas les deux."
+            )
+        if 'ids' not in data and not has_filter:
+            raise serializers.ValidationError(
+                "Fournissez 'ids' ou un filtre (filiere / academic_year)."
+            )
+        return data
     
 
 
@@ -301,6 +335,11 @@ class NoteCreateUpdateSerializer(serializers.ModelSerializer):
         model = Note
         fields = ['student', 'module', 'academic_year', 'note_controle', 'note_examen']
     
+    def validate_academic_year(self, value):
+        if archive.is_archived(value):
+            raise serializers.ValidationError(f"L'année {value} est archivée (lecture seule).")
+        return value
+    
     def validate_note_controle(self, value):
         if value is not None and (value < 0 or value > 20):
             raise serializers.ValidationError("La note de contrôle doit être entre 0 et 20")
@@ -339,4 +378,170 @@ class StudentGradeSerializer(serializers.ModelSerializer):
             'id', 'student_name', 'student_cne', 
             'module_name', 'module_code',
             'note_controle', 'note_examen', 'note_finale'
-        ]
\ No newline at end of file
+        ]
+
+
+# ============================================
+# DELIBERATION SERIALIZERS
+# ============================================
+class DeliberationSerializer(serializers.ModelSerializer):
+    filiere_name = serializers.ReadOnlyField(source='filiere.name')
+    
+    class Meta:
+        model = Deliberation
+        fields = [
+            'id', 'filiere', 'filiere_name', 'semestre', 'academic_year',
+            'passing_average', 'eliminatory_note',
+            'student_count', 'module_count', 'admitted_count', 'class_average',
+            'duration_ms', 'created_by', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class DeliberationRunSerializer(serializers.Serializer):
+    """Parameters of a deliberation run"""
+    filiere = serializers.PrimaryKeyRelatedField(queryset=Filiere.objects.all())
+    semestre = serializers.ChoiceField(choices=[i for i in range(1, 7)])
+    academic_year = serializers.CharField(max_length=9)
+    passing_average = serializers.DecimalField(max_digits=4, decimal_places=2, default=10, min_value=0, max_value=20)
+    eliminatory_note = serializers.DecimalField(max_digits=4, decimal_places=2, default=5, min_value=0, max_value=20)
+    
+    def validate(self, data):
+        if data['eliminatory_note'] > data['passing_average']:
+            raise serializers.ValidationError(
+                "La note éliminatoire ne peut pas dépasser la moyenne de validation."
+            )
+        return data
+
+
+class DeliberationResultSerializer(serializers.ModelSerializer):
+    student_name = serializers.SerializerMethodField()
+    student_cne = serializers.ReadOnlyField(source='student.cne')
+    
+    class Meta:
+        model = DeliberationResult
+        fields = [
+            'student', 'student_name', 'student_cne',
+            'average', 'rank', 'decision',
+            'modules_validated', 'modules_compensated', 'modules_failed', 'modules_missing'
+        ]
+    
+    def get_student_name(self, obj):
+        return f"{obj.student.last_name.upper()} {obj.student.first_name}"
+
+
+# ============================================
+# LEADERBOARD SERIALIZER
+# ============================================
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    student_name = serializers.SerializerMethodField()
+    student_cne = serializers.ReadOnlyField(source='student.cne')
+    filiere_name = serializers.ReadOnlyField(source='filiere.name')
+    
+    class Meta:
+        model = LeaderboardEntry
+        fields = [
+            'rank', 'student', 'student_name', 'student_cne',
+            'filiere', 'filiere_name', 'academic_year',
+            'average', 'note_count', 'updated_at'
+        ]
+    
+    def get_student_name(self, obj):
+        return f"{obj.student.last_name.upper()} {obj.student.first_name}"
+
+
+# ============================================
+# GRADE AUDIT LOG SERIALIZER
+# ============================================
+class NoteAuditSerializer(serializers.ModelSerializer):
+    """Grades are stored in hundredths of a point, exposed on /20"""
+    GRADE_FIELDS = ('old_controle', 'new_controle', 'old_examen', 'new_examen')
+    
+    action_display = serializers.CharField(source='get_action_display', read_only=True)
+    source_display = serializers.CharField(source='get_source_display', read_only=True)
+    
+    class Meta:
+        model = NoteAudit
+        fields = [
+            'id', 'note_id', 'actor_id', 'action', 'action_display', 'source', 'source_display',
+            'old_controle', 'new_controle', 'old_examen', 'new_examen', 'created_at'
+        ]
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for field in self.GRADE_FIELDS:
+            data[field] = audit.decode(data[field])
+        return data
+
+
+# ============================================
+# BACKGROUND JOB SERIALIZERS
+# ============================================
+class JobSerializer(serializers.ModelSerializer):
+    created_by_username = serializers.ReadOnlyField(source='created_by.username')
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'task', 'params', 'status', 'status_display', 'progress', 'progress_message',
+            'result', 'error', 'cancel_requested', 'created_by', 'created_by_username', 'schedule',
+            'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+
+class JobCreateSerializer(serializers.Serializer):
+    """POST /api/jobs/ body: {"task": "export_inscriptions", "params": {"status": "PENDING"}}"""
+    task = serializers.CharField(max_length=100)
+    params = serializers.DictField(required=False, default=dict)
+    
+    def validate(self, data):
+        if not jobs.startable(data['task'], self.context['request'].user):
+            raise serializers.ValidationError({'task': f"Tâche inconnue: {data['task']}"})
+        try:
+            jobs.validate(data['task'], data['params'])
+        except ValueError as e:
+            raise serializers.ValidationError({'params': str(e)})
+        return data
+
+
+# ============================================
+# ARCHIVE SERIALIZERS
+# ============================================
+class ArchivedYearSerializer(serializers.ModelSerializer):
+    archived_by_username = serializers.ReadOnlyField(source='archived_by.username')
+    
+    class Meta:
+        model = ArchivedYear
+        fields = [
+            'id', 'academic_year', 'archived_at', 'archived_by', 'archived_by_username',
+            'inscriptions_count', 'notes_count'
+        ]
+        read_only_fields = fields
+
+
+# ============================================
+# CHANGE FEED SERIALIZERS
+# ============================================
+class ChangeEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChangeEvent
+        fields = ['id', 'position', 'topic', 'object_id', 'payload', 'created_at']
+        read_only_fields = fields
+
+
+class ChangeFeedConsumerSerializer(serializers.ModelSerializer):
+    owner_username = serializers.ReadOnlyField(source='owner.username')
+    
+    class Meta:
+        model = ChangeFeedConsumer
+        fields = ['id', 'name', 'owner', 'owner_username', 'position', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+
+class ChangeFeedAckSerializer(serializers.Serializer):
+    """POST /api/changes/ack/ body: {"consumer": "finance", "position": 1234}"""
+    consumer = serializers.SlugField(max_length=100)
+    position = serializers.IntegerField(min_value=0)
+    reset = serializers.BooleanField(required=False, default=False)
@@ -0,0 +1,213 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import audit, bootstrap, changefeed, events, jobs, rankings, rollups, search, sync, transcripts
+from .models import Departement, Filiere, Inscription, Module, Note, NoteAudit
+
+User = get_user_model()
+
+
+def _module_changed(instance, *fields):
+    """Did the save change one of these fields since the module was loaded? (unknown: yes)"""
+    loaded = getattr(instance, '_loaded_fields', None)
+    if loaded is None:
+        return True
+    return any(loaded[field] != getattr(instance, field) for field in fields)
+
+
+# ============================================
+# SEARCH INDEX SYNC
+# ============================================
+@receiver(post_save, sender=User)
+def index_user(sender, instance, raw=False, update_fields=None, **kwargs):
+    # e.g. the last_login update of every login
+    if raw or (update_fields is not None and not search.USER_FIELDS & set(update_fields)):
+        return
+    search.index_object(search.KIND_USER, instance)
+
+
+@receiver(post_delete, sender=User)
+def unindex_user(sender, instance, **kwargs):
+    search.unindex_object(search.KIND_USER, instance.pk)
+
+
+@receiver(post_save, sender=Module)
+def index_module(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_object(search.KIND_MODULE, instance)
+
+
+@receiver(post_delete, sender=Module)
+def unindex_module(sender, instance, **kwargs):
+    search.unindex_object(search.KIND_MODULE, instance.pk)
+
+
+@receiver(post_save, sender=Filiere)
+def index_filiere(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_object(search.KIND_FILIERE, instance)
+    # Module documents embed the filiere code/name
+    for module in instance.modules.select_related('filiere'):
+        search.index_object(search.KIND_MODULE, module)
+
+
+@receiver(post_delete, sender=Filiere)
+def unindex_filiere(sender, instance, **kwargs):
+    search.unindex_object(search.KIND_FILIERE, instance.pk)
+
+
+# ============================================
+# ENROLLMENT ROLLUP
+# ============================================
+@receiver(post_save, sender=Inscription)
+def count_inscription_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        rollups.record('CREATED', instance.filiere_id, instance.academic_year, when=instance.created_at)
+
+
+# ============================================
+# PUSHED EVENTS (see core/events.py)
+# ============================================
+@receiver(post_save, sender=Inscription)
+def push_inscription_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        events.publish(
+            'inscription.created',
+            {
+                'inscription_id': instance.id, 'filiere_id': instance.filiere_id,
+                'academic_year': instance.academic_year, 'count': 1, 'pending_delta': 1,
+            },
+            departement_id=instance.filiere.departement_id,
+            student_ids=[instance.student_id],
+        )
+
+
+@receiver(post_save, sender=Note)
+def push_grades_published(sender, instance, raw=False, **kwargs):
+    if not raw:
+        events.publish_grades(instance.module_id, instance.academic_year, [instance.student_id], count=1)
+
+
+# ============================================
+# GRADE AUDIT LOG
+# ============================================
+@receiver(post_save, sender=Note)
+def audit_note_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        audit.record_note(instance, NoteAudit.ACTION_CREATE if created else NoteAudit.ACTION_UPDATE)
+
+
+@receiver(post_delete, sender=Note)
+def audit_note_deleted(sender, instance, **kwargs):
+    audit.record_note(instance, NoteAudit.ACTION_DELETE)
+
+
+# ============================================
+# CHANGE FEED (see core/changefeed.py)
+# ============================================
+@receiver(post_save, sender=Note)
+def feed_grade_saved(sender, instance, raw=False, **kwargs):
+    if not raw and instance.note_finale is not None:
+        changefeed.record_grades([instance.id])
+
+
+@receiver(post_delete, sender=Note)
+def feed_grade_deleted(sender, instance, **kwargs):
+    changefeed.record_grade_deleted(instance)
+
+
+# ============================================
+# TRANSCRIPT CACHE INVALIDATION
+# ============================================
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def invalidate_student_transcript(sender, instance, **kwargs):
+    transcripts.invalidate_students([instance.student_id])
+
+
+@receiver(post_save, sender=Module)
+def invalidate_all_transcripts(sender, instance, created, raw=False, **kwargs):
+    # Averages depend on the coefficient and semestre; a deletion goes through its notes
+    if not created and not raw and _module_changed(instance, 'coefficient', 'semestre'):
+        transcripts.invalidate_all()
+
+
+# ============================================
+# DELTA SYNC TOMBSTONES
+# ============================================
+@receiver(post_delete, sender=Departement)
+@receiver(post_delete, sender=Filiere)
+@receiver(post_delete, sender=Module)
+@receiver(post_delete, sender=Inscription)
+@receiver(post_delete, sender=Note)
+def record_tombstone(sender, instance, **kwargs):
+    sync.record_deletion(instance)
+
+
+# ============================================
+# BOOTSTRAP REFERENCE DATA (departements, filieres)
+# ============================================
+@receiver(post_save, sender=Departement)
+@receiver(post_delete, sender=Departement)
+@receiver(post_save, sender=Filiere)
+@receiver(post_delete, sender=Filiere)
+def invalidate_bootstrap_reference(sender, instance, **kwargs):
+    bootstrap.invalidate_reference()
+
+
+@receiver(post_save, sender=User)
+def invalidate_bootstrap_managers(sender, instance, raw=False, **kwargs):
+    # Departement rows embed their manager (an ADMIN)
+    if not raw and instance.role == 'ADMIN':
+        bootstrap.invalidate_reference()
+
+
+# ============================================
+# LEADERBOARD (students updated on commit, partitions on module edits)
+# ============================================
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def update_leaderboard(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if Note.module.is_cached(instance):
+        filiere_id = instance.module.filiere_id
+    else:
+        filiere_id = Module.objects.filter(pk=instance.module_id).values_list('filiere_id', flat=True).first()
+    if filiere_id is not None:
+        rankings.update_student_on_commit(instance.student_id, filiere_id, instance.academic_year)
+
+
+@receiver(post_save, sender=Module)
+def refresh_leaderboard(sender, instance, created, raw=False, **kwargs):
+    # A new module has no notes yet; averages only depend on the coefficient and the filiere
+    if created or raw or not _module_changed(instance, 'coefficient', 'filiere_id'):
+        return
+    loaded_filiere_id = getattr(instance, '_loaded_fields', {}).get('filiere_id')
+    if loaded_filiere_id not in (None, instance.filiere_id):
+        rankings.refresh_on_commit(loaded_filiere_id)
+    rankings.refresh_on_commit(instance.filiere_id)
+
+
+# ============================================
+# GRADING POLICY (see core/grading.py)
+# ============================================
+def _policy_changed(instance, created, raw):
+    return not created and not raw and instance.poids_controle != getattr(instance, '_loaded_poids_controle', instance.poids_controle)
+
+
+@receiver(post_save, sender=Module)
+def recompute_module_grades(sender, instance, created, raw=False, **kwargs):
+    if _policy_changed(instance, created, raw):
+        instance._loaded_poids_controle = instance.poids_controle
+        transaction.on_commit(lambda: jobs.enqueue('recompute_grades', {'module': instance.pk}))
+
+
+@receiver(post_save, sender=Filiere)
+def recompute_filiere_grades(sender, instance, created, raw=False, **kwargs):
+    if _policy_changed(instance, created, raw):
+        instance._loaded_poids_controle = instance.poids_controle
+        transaction.on_commit(lambda: jobs.enqueue('recompute_grades', {'filiere': instance.pk}))
@@ -0,0 +1,138 @@
+"""
+Opt-in slow-query log with EXPLAIN capture
+
+Enable in settings:
+    SLOW_QUERY_LOG = {'ENABLED': True, 'THRESHOLD_MS': 100}
+
+Queries slower than the threshold are collected during the request by
+SlowQueryMiddleware and persisted once the response is built, grouped by
+normalized SQL fingerprint. Browse them with:
+    python manage.py slow_queries
+"""
+import hashlib
+import re
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+
+DEFAULTS = {
+    'ENABLED': False,
+    'THRESHOLD_MS': 100,
+    'CAPTURE_EXPLAIN': True,
+}
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|\?')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*\?\s*,?)+\)', re.IGNORECASE)
+_SPACES_RE = re.compile(r'\s+')
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'SLOW_QUERY_LOG', {})}
+
+
+def normalize_sql(sql):
+    """Replace literals and placeholders so equivalent queries share a fingerprint"""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _SPACES_RE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode('utf-8')).hexdigest()
+
+
+def params_shape(params):
+    """Describe parameter types without storing values, e.g. 'int, str, list[3]'"""
+    if params is None:
+        return ''
+    if isinstance(params, dict):
+        params = params.values()
+    shape = []
+    for value in params:
+        if isinstance(value, (list, tuple)):
+            shape.append(f'{type(value).__name__}[{len(value)}]')
+        else:
+            shape.append(type(value).__name__)
+    return ', '.join(shape)
+
+
+def explain(sql, params):
+    """Return the query plan as text (EXPLAIN never executes the statement)"""
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH', 'UPDATE', 'DELETE')):
+        return ''
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+    except Exception as exc:  # Plan capture must never break the request
+        return f'EXPLAIN failed: {exc}'
+    return '\n'.join(' | '.join(str(col) for col in row) for row in rows)
+
+
+class QueryCollector:
+    """execute_wrapper that keeps queries above the threshold"""
+    def __init__(self, threshold_ms):
+        self.threshold_ms = threshold_ms
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if duration_ms >= self.threshold_ms and not many:
+                self.slow.append((sql, params, duration_ms))
+
+
+def record(slow, view='', action=''):
+    """Persist collected slow queries, deduplicated by fingerprint"""
+    from .models import SlowQuery
+
+    capture_explain = get_config()['CAPTURE_EXPLAIN']
+    now = timezone.now()
+    for sql, params, duration_ms in slow:
+        normalized = normalize_sql(sql)
+        key = fingerprint(normalized)
+        if _bump(SlowQuery, key, duration_ms, view, action, now):
+            continue
+        plan = explain(sql, params) if capture_explain else ''
+        try:
+            with transaction.atomic():
+                SlowQuery.objects.create(
+                    fingerprint=key,
+                    normalized_sql=normalized,
+                    sample_sql=sql,
+                    params_shape=params_shape(params),
+                    view=view,
+                    action=action,
+                    explain_plan=plan,
+                    calls=1,
+                    total_time_ms=duration_ms,
+                    max_time_ms=duration_ms,
+                    last_seen=now,
+                )
+        except IntegrityError:
+            # Another worker inserted the same fingerprint first
+            _bump(SlowQuery, key, duration_ms, view, action, now)
+
+
+def _bump(model, key, duration_ms, view, action, now):
+    return model.objects.filter(fingerprint=key).update(
+        calls=F('calls') + 1,
+        total_time_ms=F('total_time_ms') + duration_ms,
+        max_time_ms=Greatest('max_time_ms', duration_ms),
+        last_seen=now,
+        view=view,
+        action=action,
+    )
@@ -0,0 +1,249 @@
+"""
+Bulk student provisioning (CSV / XLSX)
+
+File layout (header optional, columns in this order when absent):
+    cne ; last_name ; first_name ; email [; password]
+
+The file is read row by row and processed in batches:
+    1. rows validated (required fields, email format, duplicates in the file)
+    2. CNEs, emails and usernames already taken found with indexed IN lookups
+    3. passwords hashed across a process pool (core/passwords.py)
+    4. users, search documents and welcome emails written with one bulk
+       INSERT each, in one transaction per batch
+Username = CNE. Rows without a password get a random temporary one, sent
+with the welcome email through the outbox (core/emails.py), which clears
+the body once delivered; without welcome emails every row needs a password.
+Emails are unique regardless of case. The report includes the throughput
+in users/sec.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from . import emails, metrics, search
+from .models import SearchEntry
+from .passwords import HasherPool
+
+User = get_user_model()
+
+COLUMNS = ('cne', 'last_name', 'first_name', 'email')
+OPTIONAL_COLUMNS = ('password',)
+MAX_REPORTED_ERRORS = 1000
+
+DEFAULTS = {
+    'BATCH_SIZE': 500,
+    'HASH_WORKERS': None,        # None = one process per CPU; 1 = hash in-process
+    'PASSWORD_LENGTH': 10,
+}
+
+# No ambiguous characters (0/O, 1/l/I) in temporary passwords
+_PASSWORD_CHARS = 'abcdefghjkmnpqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'STUDENT_IMPORT', {})}
+
+
+def welcome_message(first_name, last_name, username, password=None):
+    """(subject, body) of the account creation email"""
+    greeting = f"Bonjour {first_name} {last_name},".replace('  ', ' ')
+    credentials = f"Identifiant : {username}"
+    if password:
+        credentials += (
+            f"\nMot de passe temporaire : {password}\n"
+            "Merci de le modifier dès votre première connexion."
+        )
+    return (
+        "Votre compte étudiant ACADEMIYA",
+        f"{greeting}\n\nVotre compte étudiant a été créé.\n{credentials}\n\nL'équipe ACADEMIYA",
+    )
+
+
+# ============================================
+# IMPORTER
+# ============================================
+class StudentImporter:
+    def __init__(self, batch_size=None, hash_workers=None, dry_run=False, send_emails=True, progress=None):
+        config = get_config()
+        self.batch_size = batch_size or config['BATCH_SIZE']
+        self.hash_workers = hash_workers if hash_workers is not None else config['HASH_WORKERS']
+        self.password_length = config['PASSWORD_LENGTH']
+        self.dry_run = dry_run
+        self.send_emails = send_emails
+        self.progress = progress
+
+        self.lines = 0
+        self.created = 0
+        self.emails_queued = 0
+        self.error_count = 0
+        self.errors = []
+        self.hash_seconds = 0.0
+        self._seen_cnes = set()
+        self._seen_emails = set()
+        self._positions = None
+
+    def run(self, rows):
+        """rows: iterable of (line_number, cells). Returns the report dict."""
+        start = time.perf_counter()
+        with HasherPool(1 if self.dry_run else self.hash_workers) as pool:
+            batch = []
+            for line_number, cells in rows:
+                if self._positions is None:
+                    self._positions = self._detect_header(cells)
+                    if self._positions is not None:
+                        continue
+                    self._positions = {name: i for i, name in enumerate(COLUMNS + OPTIONAL_COLUMNS)}
+                if not any(str(c).strip() for c in cells):
+                    continue
+                self.lines += 1
+                batch.append((line_number, {name: self._cell(cells, name) for name in self._positions}))
+                if len(batch) >= self.batch_size:
+                    self._process(batch, pool)
+                    batch = []
+                    if self.progress:
+                        self.progress(self.lines)
+            if batch:
+                self._process(batch, pool)
+        elapsed = time.perf_counter() - start
+
+        if self.created and not self.dry_run:
+            metrics.STUDENTS_PROVISIONED.inc(self.created)
+
+        return {
+            'dry_run': self.dry_run,
+            'lines': self.lines,
+            'created': self.created,
+            'emails_queued': self.emails_queued,
+            'error_count': self.error_count,
+            'errors': sorted(self.errors, key=lambda e: e['line']),
+            'elapsed_seconds': round(elapsed, 2),
+            'hash_seconds': round(self.hash_seconds, 2),
+            'users_per_second': round(self.created / elapsed, 1) if elapsed and self.created else 0,
+        }
+
+    def _detect_header(self, cells):
+        names = [str(c).strip().lower() for c in cells]
+        if 'cne' not in names:
+            return None
+        missing = [name for name in COLUMNS if name not in names]
+        if missing:
+            raise ValueError(f"Colonnes manquantes dans l'en-tête: {', '.join(missing)}")
+        return {name: names.index(name) for name in COLUMNS + OPTIONAL_COLUMNS if name in names}
+
+    def _cell(self, cells, name):
+        index = self._positions[name]
+        return str(cells[index]).strip() if index < len(cells) else ''
+
+    def _error(self, line_number, cne, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'cne': cne, 'error': message})
+
+    def _validate(self, batch):
+        """Rows of the batch that can be created: [(line_number, values)]"""
+        valid = []
+        for line_number, values in batch:
+            cne = values['cne']
+            missing = [name for name in COLUMNS if not values[name]]
+            if missing:
+                self._error(line_number, cne, f"Champs manquants: {', '.join(missing)}")
+                continue
+            values['email'] = User.objects.normalize_email(values['email'])
+            try:
+                validate_email(values['email'])
+            except ValidationError:
+                self._error(line_number, cne, f"Email invalide '{values['email']}'")
+                continue
+            if not self.send_emails and not values.get('password'):
+                # The generated password would reach nobody
+                self._error(line_number, cne, 'Mot de passe requis quand les emails de bienvenue sont désactivés')
+                continue
+            if len(cne) > User._meta.get_field('cne').max_length:
+                self._error(line_number, cne, 'CNE trop long')
+                continue
+            if cne in self._seen_cnes:
+                self._error(line_number, cne, 'CNE en double dans le fichier')
+                continue
+            if values['email'].lower() in self._seen_emails:
+                self._error(line_number, cne, 'Email en double dans le fichier')
+                continue
+            self._seen_cnes.add(cne)
+            self._seen_emails.add(values['email'].lower())
+            valid.append((line_number, values))
+        return valid
+
+    def _process(self, batch, pool):
+        rows = self._validate(batch)
+
+        # Accounts already in the database: indexed IN lookups on cne, username and email
+        cnes = [values['cne'] for _, values in rows]
+        taken_cnes = set(User.objects.filter(cne__in=cnes).values_list('cne', flat=True).order_by())
+        taken_usernames = set(User.objects.filter(username__in=cnes).values_list('username', flat=True).order_by())
+        # Case-insensitive, on the LOWER(email) index
+        taken_emails = set(
+            User.objects.annotate(email_lower=Lower('email'))
+            .filter(email_lower__in={values['email'].lower() for _, values in rows})
+            .values_list('email_lower', flat=True).order_by()
+        )
+        new_rows = []
+        for line_number, values in rows:
+            if values['cne'] in taken_cnes:
+                self._error(line_number, values['cne'], 'CNE déjà enregistré')
+            elif values['cne'] in taken_usernames:
+                self._error(line_number, values['cne'], "Nom d'utilisateur déjà pris")
+            elif values['email'].lower() in taken_emails:
+                self._error(line_number, values['cne'], 'Email déjà utilisé')
+            else:
+                new_rows.append(values)
+
+        if self.dry_run:
+            self.created += len(new_rows)   # would be created
+            return
+        if not new_rows:
+            return
+
+        # Temporary passwords are only kept until the welcome emails are queued
+        generated = [
+            None if values.get('password') else get_random_string(self.password_length, _PASSWORD_CHARS)
+            for values in new_rows
+        ]
+        start = time.perf_counter()
+        hashes = pool.hash([values.get('password') or password for values, password in zip(new_rows, generated)])
+        self.hash_seconds += time.perf_counter() - start
+
+        now = timezone.now()
+        users = [
+            User(
+                username=values['cne'], cne=values['cne'], email=values['email'],
+                first_name=values['first_name'], last_name=values['last_name'],
+                role='ETUDIANT', password=hashed, date_joined=now,
+            )
+            for values, hashed in zip(new_rows, hashes)
+        ]
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            if users[0].pk is None:
+                # Backends that cannot return ids from a bulk INSERT
+                ids = dict(User.objects.filter(username__in=cnes).values_list('username', 'id'))
+                for user in users:
+                    user.pk = ids[user.username]
+            # Signals do not run for bulk_create: search documents written here
+            SearchEntry.objects.bulk_create([
+                SearchEntry(kind=search.KIND_USER, object_id=user.pk, **search.user_document(user))
+                for user in users
+            ])
+            if self.send_emails:
+                queued = emails.enqueue_many(
+                    (user.email, *welcome_message(user.first_name, user.last_name, user.username, password),
+                     emails.KIND_ACCOUNT_CREATED)
+                    for user, password in zip(users, generated)
+                )
+                self.emails_queued += len(queued)
+        self.created += len(users)
@@ -0,0 +1,121 @@
+"""
+Delta sync: ?updated_since= on the list endpoints of the core viewsets
+
+    GET /api/inscriptions/                                  -> full list, header X-Sync-Watermark
+    GET /api/inscriptions/?updated_since=<watermark>        -> changes only:
+        {"watermark": "...", "results": [rows changed since], "deleted": [ids]}
+
+Changed rows are read from the (updated_at, id) index of each model; deleted
+rows come from Tombstone, written by a post_delete signal (cascades
+included). Keep the returned watermark and send it back on the next call.
+
+Rows updated within SYNC['OVERLAP_SECONDS'] before the watermark are sent
+again, so a transaction committed late is never missed: clients upsert by
+id. Tombstones older than SYNC['TOMBSTONE_DAYS'] are pruned
+(prune_tombstones job); an older watermark gets 410 and must resync fully.
+
+Rows that leave a filtered list (?status=PENDING, or an ADMIN's
+departments) without being deleted are not reported: sync unfiltered lists.
+"""
+from datetime import UTC, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Tombstone
+
+
+DEFAULTS = {
+    'OVERLAP_SECONDS': 5,
+    'TOMBSTONE_DAYS': 90,
+}
+
+WATERMARK_HEADER = 'X-Sync-Watermark'
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'SYNC', {})}
+
+
+def format_watermark(value):
+    # "Z" rather than "+00:00": a "+" left unencoded in a query string becomes a space
+    return value.astimezone(UTC).isoformat().replace('+00:00', 'Z')
+
+
+def parse_watermark(value):
+    """Aware datetime, or None if the value is not an ISO 8601 datetime"""
+    try:
+        parsed = parse_datetime(value.strip().replace(' ', '+'))
+    except ValueError:
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, UTC)
+    return parsed
+
+
+def horizon(config=None):
+    """Oldest watermark that can still be served (tombstones are kept until then)"""
+    config = config or get_config()
+    return timezone.now() - timedelta(days=config['TOMBSTONE_DAYS'])
+
+
+def record_deletion(instance):
+    Tombstone.objects.create(
+        model=instance._meta.model_name,
+        object_id=instance.pk,
+        student_id=getattr(instance, 'student_id', None),
+    )
+
+
+def prune_tombstones(config=None):
+    return Tombstone.objects.filter(deleted_at__lt=horizon(config)).delete()[0]
+
+
+class DeltaSyncMixin:
+    """
+    list() with ?updated_since=; subclasses may override list_data() (e.g. projections).
+    Only the list action is affected, retrieve/write actions are unchanged.
+    """
+    def list_data(self, queryset):
+        return self.get_serializer(queryset, many=True).data
+
+    def tombstones(self, since):
+        queryset = Tombstone.objects.filter(model=self.get_queryset().model._meta.model_name, deleted_at__gt=since)
+        # Student-owned rows (inscriptions, notes): a student only sees their own deletions
+        if self.request.user.is_authenticated and self.request.user.role == 'ETUDIANT':
+            queryset = queryset.filter(student_id=self.request.user.id)
+        return list(queryset.values_list('object_id', flat=True).distinct().order_by('object_id'))
+
+    def list(self, request, *args, **kwargs):
+        # Taken before reading: anything written during this request is in the next delta
+        watermark = timezone.now()
+        queryset = self.filter_queryset(self.get_queryset())
+        headers = {WATERMARK_HEADER: format_watermark(watermark)}
+
+        value = request.query_params.get('updated_since')
+        if value is None:
+            return Response(self.list_data(queryset), headers=headers)
+
+        since = parse_watermark(value)
+        if since is None:
+            return Response(
+                {'error': 'updated_since doit être une date ISO 8601 (ex: 2025-01-31T12:00:00Z).'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        config = get_config()
+        if since < horizon(config):
+            return Response(
+                {'error': 'Watermark trop ancien: resynchronisation complète nécessaire (sans updated_since).'},
+                status=status.HTTP_410_GONE
+            )
+
+        since -= timedelta(seconds=config['OVERLAP_SECONDS'])
+        changed = queryset.filter(updated_at__gt=since).order_by('updated_at', 'id')
+        return Response({
+            'watermark': format_watermark(watermark),
+            'results': self.list_data(changed),
+            'deleted': self.tombstones(since),
+        }, headers=headers)
@@ -0,0 +1,130 @@
+"""
+Background job tasks (registered in core.jobs.TASKS, loaded by CoreConfig.ready)
+
+Each task receives the JobContext and the job params as keyword arguments,
+and returns a JSON-serializable result stored on the Job. Tasks that touch
+every department are limited to DIRECTION (roles=...), an ADMIN only manages
+their own departments.
+"""
+import io
+import os
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from . import archive, audit, changefeed, exports, grading, sync
+from .grade_import import iter_rows
+from .jobs import task
+from .models import Inscription
+from .student_import import StudentImporter
+
+
+def _call(command, **options):
+    """Run a management command, its output becomes the job result"""
+    out = io.StringIO()
+    call_command(command, stdout=out, stderr=out, **options)
+    return {'output': out.getvalue().strip()}
+
+
+@task('export_inscriptions', label='Export CSV des inscriptions', roles=['DIRECTION'])
+def export_inscriptions(job, status=None, filiere=None):
+    inscriptions = exports.inscriptions_queryset(status, filiere)
+    total = inscriptions.count()
+    filename = f'inscriptions_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv'
+    path = job.output_path(filename)
+    try:
+        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+            count = exports.write_inscriptions_csv(
+                csvfile, inscriptions,
+                on_progress=lambda done: job.progress(done, total, f'{done}/{total} inscriptions'),
+            )
+    except BaseException:
+        # Cancelled or failed: no half-written file left behind
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return {'count': count, 'file': os.path.basename(path)}
+
+
+@task('clean_old_inscriptions', label='Suppression des inscriptions en attente anciennes', roles=['DIRECTION'])
+def clean_old_inscriptions(job, days=30, dry_run=False):
+    old_inscriptions = Inscription.objects.filter(
+        status='PENDING',
+        created_at__lt=timezone.now() - timedelta(days=int(days)),
+    )
+    if dry_run:
+        return {'count': old_inscriptions.count(), 'dry_run': True}
+    job.check_cancelled()
+    deleted = old_inscriptions.delete()[0]
+    return {'deleted': deleted}
+
+
+@task('populate_grades', label='Génération de notes de démonstration', api=False)
+def populate_grades(job):
+    with audit.capture(job.job.created_by_id):
+        return _call('populate_grades', progress=lambda done, total: job.progress(done, total))
+
+
+@task('rebuild_rankings', label='Reconstruction du classement')
+def rebuild_rankings(job, filiere=None):
+    return _call('rebuild_rankings', filiere=filiere)
+
+
+@task('rebuild_search_index', label='Reconstruction de l\'index de recherche')
+def rebuild_search_index(job):
+    return _call('rebuild_search_index')
+
+
+@task('rebuild_enrollment_rollups', label='Reconstruction des statistiques d\'inscription')
+def rebuild_enrollment_rollups(job):
+    return _call('rebuild_enrollment_rollups')
+
+
+@task('prune_tombstones', label='Purge des suppressions synchronisées anciennes')
+def prune_tombstones(job):
+    return {'deleted': sync.prune_tombstones()}
+
+
+@task('archive_year', label='Archivage d\'une année universitaire', api=False)
+def archive_year(job, academic_year, force=False):
+    archived = archive.archive_year(academic_year, user=job.job.created_by, force=force)
+    return {'inscriptions': archived.inscriptions_count, 'notes': archived.notes_count}
+
+
+@task('restore_year', label='Restauration d\'une année archivée', api=False)
+def restore_year(job, academic_year):
+    return archive.restore_year(academic_year)
+
+
+@task('prune_change_events', label='Purge du flux de changements')
+def prune_change_events(job):
+    return {'deleted': changefeed.prune()}
+
+
+@task('recompute_grades', label='Recalcul des notes finales')
+def recompute_grades(job, module=None, filiere=None):
+    def progress(done, total):
+        job.progress(done, total)
+        job.check_cancelled()
+    return grading.recompute(
+        module_ids=[int(module)] if module is not None else None,
+        filiere_id=int(filiere) if filiere is not None else None,
+        progress=progress,
+    )
+
+
+@task('import_students', label='Import des comptes étudiants', api=False)
+def import_students(job, path, filename, send_emails=True):
+    try:
+        with open(path, 'rb') as f:
+            total = sum(1 for _ in iter_rows(f, filename))
+        importer = StudentImporter(
+            send_emails=send_emails,
+            progress=lambda lines: job.progress(lines, total, f'{lines}/{total} lignes'),
+        )
+        with open(path, 'rb') as f:
+            return importer.run(iter_rows(f, filename))
+    finally:
+        # The uploaded file holds the students' data: never kept after the job
+        os.remove(path)
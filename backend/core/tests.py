@@ -1,3 +1,1259 @@
-from django.test import TestCase
+import asyncio
+import email.policy
+import json
+import os
+import socketserver
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from users.models import User
+
+from . import archive, audit, bootstrap, changefeed, deliberation, distributions, emails, events, grading, jobs, metrics, openapi, profiling, projections, rankings, renderers, rollups, search, slow_queries, sync, transcripts, warmup
+from .grade_import import MAX_REPORTED_ERRORS, GradeImporter
+from .models import ArchivedInscription, ArchivedNote, ArchivedYear, ChangeEvent, Departement, EnrollmentRollup, Filiere, Inscription, InvalidTransition, LeaderboardEntry, Module, Note, NoteAudit, OutboundEmail, SlowQuery, Tombstone
+from .serializers import InscriptionSerializer, NoteSerializer
+from .student_import import StudentImporter
+
+YEAR = '2024-2025'
+
+
+class CoreTestCase(TestCase):
+    """One department (managed by `admin`) with a filiere and three modules taught by `prof`"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Accounts without password: create_user() would hash (PBKDF2) for every user
+        cls.admin = User.objects.create(username='admin', email='admin@a.ma', role='ADMIN')
+        cls.direction = User.objects.create(username='dir', email='dir@a.ma', role='DIRECTION')
+        cls.prof = User.objects.create(username='prof', email='prof@a.ma', role='ENSEIGNANT')
+        cls.students = [
+            User.objects.create(
+                username=f's{i}', email=f's{i}@a.ma', role='ETUDIANT', cne=f'CNE{i:04d}',
+                first_name=f'Ali{i}', last_name=f'Ben{i}',
+            )
+            for i in range(6)
+        ]
+        cls.dept = Departement.objects.create(name='Informatique', code='INFO', manager=cls.admin)
+        cls.filiere = Filiere.objects.create(name='Génie Info', code='GI', departement=cls.dept, capacity=100)
+        cls.modules = [
+            Module.objects.create(
+                name=f'Mod{i}', code=f'M{i}', filiere=cls.filiere, enseignant=cls.prof, semestre=1, coefficient=i + 1
+            )
+            for i in range(3)
+        ]
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+
+# ============================================
+# INSCRIPTIONS: CAPACITY
+# ============================================
+class InscriptionCapacityTests(CoreTestCase):
+    def setUp(self):
+        self.filiere.capacity = 2
+        self.filiere.save()
+
+    def inscribe(self, students, year=YEAR, status='PENDING'):
+        return [
+            Inscription.objects.create(student=student, filiere=self.filiere, academic_year=year, status=status)
+            for student in students
+        ]
+
+    def bulk_validate(self, ids):
+        return self.client_for(self.admin).post(
+            '/api/inscriptions/bulk_validate/', {'ids': ids, 'status': 'VALIDATED'}, format='json'
+        )
+
+    def test_bulk_validate_stops_at_capacity(self):
+        inscriptions = self.inscribe(self.students[:3])
+        response = self.bulk_validate([i.id for i in inscriptions])
+        self.assertEqual(response.status_code, 200)
+        outcomes = {row['id']: row['outcome'] for row in response.json()['results']}
+        self.assertEqual(outcomes[inscriptions[0].id], 'VALIDATED')
+        self.assertEqual(outcomes[inscriptions[1].id], 'VALIDATED')
+        self.assertEqual(outcomes[inscriptions[2].id], 'CAPACITY_REACHED')
+        self.assertEqual(Inscription.objects.filter(status='VALIDATED').count(), 2)
+
+    def test_bulk_rollup_commits_with_the_batch(self):
+        inscriptions = self.inscribe(self.students[:2])
+        with mock.patch.object(rollups, 'record', side_effect=RuntimeError('rollup down')):
+            with self.assertRaises(RuntimeError):
+                self.bulk_validate([i.id for i in inscriptions])
+        self.assertEqual(Inscription.objects.filter(status='VALIDATED').count(), 0)
+
+        self.bulk_validate([i.id for i in inscriptions])
+        rollup = EnrollmentRollup.objects.get(filiere=self.filiere, academic_year=YEAR)
+        self.assertEqual((rollup.created_count, rollup.validated_count), (2, 2))
+
+    def test_capacity_is_per_academic_year(self):
+        self.inscribe(self.students[:2], year='2023-2024', status='VALIDATED')
+        inscriptions = self.inscribe(self.students[2:4])
+        response = self.bulk_validate([i.id for i in inscriptions])
+        self.assertEqual(response.json()['summary'], {'VALIDATED': 2})
+
+    def test_single_validate_enforces_capacity(self):
+        self.inscribe(self.students[:2], status='VALIDATED')
+        self.inscribe(self.students[:2], year='2023-2024', status='VALIDATED')
+        inscription, = self.inscribe(self.students[2:3])
+        response = self.client_for(self.admin).post(
+            f'/api/inscriptions/{inscription.id}/validate/', {'status': 'VALIDATED'}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        inscription.refresh_from_db()
+        self.assertEqual(inscription.status, 'PENDING')
+
+        # Rejecting is always possible
+        response = self.client_for(self.admin).post(
+            f'/api/inscriptions/{inscription.id}/validate/', {'status': 'REJECTED', 'rejection_reason': 'Places épuisées'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+# ============================================
+# INSCRIPTIONS: STATUS TRANSITIONS
+# ============================================
+class InscriptionTransitionTests(CoreTestCase):
+    def setUp(self):
+        self.inscription = Inscription.objects.create(student=self.students[0], filiere=self.filiere, academic_year=YEAR)
+
+    def validate(self, body, user=None):
+        return self.client_for(user or self.admin).post(
+            f'/api/inscriptions/{self.inscription.id}/validate/', body, format='json'
+        )
+
+    def test_status_cannot_be_patched(self):
+        response = self.client_for(self.admin).patch(
+            f'/api/inscriptions/{self.inscription.id}/', {'status': 'VALIDATED'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.inscription.refresh_from_db()
+        self.assertEqual((self.inscription.status, self.inscription.version), ('PENDING', 0))
+
+    def test_processed_inscription_is_refused_by_transition(self):
+        self.assertEqual(self.validate({'status': 'VALIDATED'}).status_code, 200)
+        response = self.validate({'status': 'REJECTED', 'rejection_reason': 'Dossier incomplet'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['current_status'], 'VALIDATED')
+        self.assertEqual(response.json()['error'], 'Cette inscription est déjà Validée.')
+
+    def test_stale_version_is_a_conflict(self):
+        response = self.validate({'status': 'VALIDATED', 'version': 0})
+        self.assertEqual(response.json()['version'], 1)
+        # A client still holding version 0 after the row moved on
+        Inscription.objects.filter(pk=self.inscription.pk).update(status='PENDING')
+        response = self.validate({'status': 'REJECTED', 'rejection_reason': 'Doublon', 'version': 0})
+        self.assertEqual(response.status_code, 409)
+        self.inscription.refresh_from_db()
+        self.assertEqual(self.inscription.status, 'PENDING')
+
+    def test_concurrent_transitions_only_one_wins(self):
+        first = Inscription.objects.get(pk=self.inscription.pk)
+        second = Inscription.objects.get(pk=self.inscription.pk)
+        first.transition('VALIDATED', self.admin)
+        with self.assertRaises(InvalidTransition) as raised:
+            second.transition('REJECTED', self.admin, rejection_reason='Doublon')
+        self.assertTrue(raised.exception.conflict)
+        self.assertEqual((second.status, second.version), ('VALIDATED', 1))
+        rollup = EnrollmentRollup.objects.get(filiere=self.filiere, academic_year=YEAR)
+        self.assertEqual((rollup.validated_count, rollup.rejected_count), (1, 0))
+
+
+# ============================================
+# JOBS: WHO MAY START WHAT
+# ============================================
+class JobPermissionTests(CoreTestCase):
+    def start(self, user, task, params=None):
+        return self.client_for(user).post('/api/jobs/', {'task': task, 'params': params or {}}, format='json')
+
+    def test_populate_grades_is_not_startable_from_the_api(self):
+        for user in (self.admin, self.direction):
+            self.assertEqual(self.start(user, 'populate_grades').status_code, 400)
+
+    def test_cross_department_tasks_are_direction_only(self):
+        for task in ('clean_old_inscriptions', 'export_inscriptions'):
+            self.assertEqual(self.start(self.admin, task).status_code, 400)
+            self.assertEqual(self.start(self.direction, task).status_code, 202)
+
+    def test_task_list_follows_role(self):
+        listed = {row['task'] for row in self.client_for(self.admin).get('/api/jobs/tasks/').json()}
+        self.assertNotIn('clean_old_inscriptions', listed)
+        self.assertNotIn('populate_grades', listed)
+        self.assertIn('rebuild_rankings', listed)
+        listed = {row['task'] for row in self.client_for(self.direction).get('/api/jobs/tasks/').json()}
+        self.assertIn('clean_old_inscriptions', listed)
+
+
+# ============================================
+# CHANGE FEED: CURSORS
+# ============================================
+class ChangeFeedCursorTests(CoreTestCase):
+    def event(self, object_id):
+        return ChangeEvent.objects.create(topic='grade.published', object_id=object_id, departement_id=self.dept.id, payload={})
+
+    def test_late_commit_with_lower_id_is_not_skipped(self):
+        first, second = self.event(1), self.event(2)
+        # `first` belongs to a transaction still in flight when `second` is read
+        ChangeEvent.objects.filter(pk=first.pk).delete()
+        events, cursor, _ = changefeed.read(0, 10)
+        self.assertEqual([e.object_id for e in events], [2])
+
+        ChangeEvent.objects.create(id=first.id, topic='grade.published', object_id=1, departement_id=self.dept.id, payload={})
+        events, cursor, _ = changefeed.read(cursor, 10)
+        self.assertEqual([e.object_id for e in events], [1])
+        self.assertGreater(events[0].position, ChangeEvent.objects.get(object_id=2).position)
+
+    def test_consumer_resumes_from_acked_position(self):
+        for i in range(5):
+            self.event(i)
+        client = self.client_for(self.direction)
+        page = client.get('/api/changes/', {'consumer': 'finance', 'limit': 2}).json()
+        self.assertEqual([e['object_id'] for e in page['events']], [0, 1])
+        self.assertTrue(page['has_more'])
+        response = client.post('/api/changes/ack/', {'consumer': 'finance', 'position': page['next_cursor']}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        page = client.get('/api/changes/', {'consumer': 'finance', 'limit': 10}).json()
+        self.assertEqual([e['object_id'] for e in page['events']], [2, 3, 4])
+        self.assertFalse(page['has_more'])
+
+    def test_admin_only_reads_own_departments(self):
+        self.event(1)
+        ChangeEvent.objects.create(topic='grade.published', object_id=2, departement_id=self.dept.id + 1, payload={})
+        page = self.client_for(self.admin).get('/api/changes/').json()
+        self.assertEqual([e['object_id'] for e in page['events']], [1])
+
+
+# ============================================
+# RANKINGS: DEFERRED REFRESH / SCOPING
+# ============================================
+class RankingRefreshTests(CoreTestCase):
+    def grade(self, student, module, controle, examen):
+        return Note.objects.create(
+            student=student, module=module, academic_year=YEAR, note_controle=controle, note_examen=examen
+        )
+
+    def test_note_writes_update_students_once_per_partition_on_commit(self):
+        with mock.patch.object(rankings, 'update_students', wraps=rankings.update_students) as update, \
+                mock.patch.object(rankings, 'refresh_partition') as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    for i, student in enumerate(self.students):
+                        for module in self.modules:
+                            self.grade(student, module, 10 + i, 10 + i)
+                    self.assertEqual(update.call_count, 0)
+        refresh.assert_not_called()
+        update.assert_called_once_with({student.id for student in self.students}, self.filiere.id, YEAR)
+        ranks = dict(LeaderboardEntry.objects.values_list('student_id', 'rank'))
+        self.assertEqual(ranks[self.students[-1].id], 1)
+        self.assertEqual(ranks[self.students[0].id], len(self.students))
+
+    def test_incremental_update_matches_a_full_refresh(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            notes = [self.grade(student, self.modules[0], 12, 12) for student in self.students[:3]]
+        with self.captureOnCommitCallbacks(execute=True):
+            notes[0].note_examen = 18
+            notes[0].save()
+            notes[1].delete()
+        incremental = set(LeaderboardEntry.objects.values_list('student_id', 'average', 'rank'))
+        rankings.refresh_partition(self.filiere.id, YEAR)
+        self.assertEqual(set(LeaderboardEntry.objects.values_list('student_id', 'average', 'rank')), incremental)
+        self.assertEqual(len(incremental), 2)
+
+    def test_rolled_back_writes_do_not_block_later_refreshes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.grade(self.students[0], self.modules[0], 12, 12)
+                    raise ValueError
+            except ValueError:
+                pass
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grade(self.students[1], self.modules[0], 14, 14)
+        self.assertEqual(LeaderboardEntry.objects.filter(student=self.students[1]).count(), 1)
+
+    def test_module_edit_refreshes_only_on_coefficient_change(self):
+        module = Module.objects.get(pk=self.modules[0].pk)
+        with mock.patch.object(rankings, 'refresh_filiere') as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                module.name = 'Algorithmique'
+                module.save()
+            refresh.assert_not_called()
+            with self.captureOnCommitCallbacks(execute=True):
+                module.coefficient = 4
+                module.save()
+            refresh.assert_called_once_with(self.filiere.id)
+
+    def test_admin_only_sees_own_departments(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grade(self.students[0], self.modules[0], 12, 12)
+        other = User.objects.create(username='admin2', email='admin2@a.ma', role='ADMIN')
+        params = {'filiere': self.filiere.id, 'academic_year': YEAR}
+        self.assertEqual(self.client_for(self.admin).get('/api/rankings/', params).json()['count'], 1)
+        self.assertEqual(self.client_for(other).get('/api/rankings/', params).json()['count'], 0)
+        response = self.client_for(other).get('/api/rankings/student/', {'student_id': self.students[0].id})
+        self.assertEqual(response.json(), [])
+
+
+# ============================================
+# GRADE DISTRIBUTIONS / GRADE RANGE
+# ============================================
+class DistributionTests(CoreTestCase):
+    def test_percentiles_interpolate_like_numpy(self):
+        # Grades 1..10 counted per hundredth
+        slots = [0] * 2001
+        for grade in range(1, 11):
+            slots[grade * 100] += 1
+        self.assertEqual(
+            distributions.percentiles(slots, 10, [0, 10, 25, 50, 90, 100]),
+            {0: 1.0, 10: 1.9, 25: 3.25, 50: 5.5, 90: 9.1, 100: 10.0},
+        )
+        self.assertEqual(distributions.percentiles([0] * 2001, 0, [50]), {50: None})
+
+    def test_out_of_range_grades_are_counted_apart(self):
+        for student, grade in zip(self.students, ['-1', '8', '12', '25']):
+            Note.objects.bulk_create([Note(student=student, module=self.modules[0], academic_year=YEAR, note_examen=grade)])
+        stats = distributions.compute(distributions.notes_in_scope('module', self.modules[0].id))['fields']['note_examen']
+        self.assertEqual(stats['count'], 4)
+        self.assertEqual(stats['out_of_range'], 2)
+        self.assertEqual(sum(bucket['count'] for bucket in stats['histogram']), 2)
+        # -1 and 25 clamped to 0 and 20: 12 + 0.7 * (20 - 12)
+        self.assertEqual(stats['percentiles']['p90'], 17.6)
+
+    @override_settings(DISTRIBUTIONS={'BUCKET_WIDTH': 3})
+    def test_bucket_width_must_divide_20(self):
+        with self.assertRaises(ImproperlyConfigured):
+            distributions.get_config()
+
+    @override_settings(DISTRIBUTIONS={'BUCKET_WIDTH': 2.5})
+    def test_fractional_bucket_width(self):
+        stats = distributions.compute(distributions.notes_in_scope('module', self.modules[0].id))
+        self.assertEqual(len(stats['fields']['note_finale']['histogram']), 8)
+
+    def test_bulk_update_grades_rejects_out_of_range(self):
+        response = self.client_for(self.prof).post('/api/notes/bulk_update_grades/', {
+            'module_id': self.modules[0].id, 'academic_year': YEAR,
+            'grades': [
+                {'student_id': self.students[0].id, 'note_controle': 12, 'note_examen': 14},
+                {'student_id': self.students[1].id, 'note_controle': 25, 'note_examen': 14},
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][0]['student_id'], self.students[1].id)
+        self.assertFalse(Note.objects.exists())
+
+
+# ============================================
+# DELIBERATION
+# ============================================
+class DeliberationComputeTests(SimpleTestCase):
+    def test_decisions_counts_and_tied_ranks(self):
+        grades = np.array([
+            [12, 14, 16],       # ADMIS
+            [8, 12, 13],        # COMPENSE: one module compensated
+            [4, 16, 16],        # AJOURNE: eliminatory grade
+            [np.nan, 18, 18],   # AJOURNE: missing grade, not counted as failed
+            [12, 14, 16],       # tied with the first student
+        ], dtype=np.float64)
+        result = deliberation.compute(grades, np.array([1.0, 1.0, 1.0]), passing=10.0, eliminatory=5.0)
+
+        self.assertEqual(result['decisions'].tolist(), ['ADMIS', 'COMPENSE', 'AJOURNE', 'AJOURNE', 'ADMIS'])
+        self.assertEqual(result['averages'].tolist(), [14.0, 11.0, 12.0, 12.0, 14.0])
+        self.assertEqual(result['ranks'].tolist(), [1, 5, 3, 3, 1])
+        self.assertEqual(result['validated'].tolist(), [3, 2, 2, 2, 3])
+        self.assertEqual(result['compensated'].tolist(), [0, 1, 0, 0, 0])
+        self.assertEqual(result['failed'].tolist(), [0, 0, 1, 0, 0])
+        self.assertEqual(result['missing'].tolist(), [0, 0, 0, 1, 0])
+        # Every module has exactly one status
+        total = result['validated'] + result['compensated'] + result['failed'] + result['missing']
+        self.assertEqual(total.tolist(), [3] * 5)
+
+
+# ============================================
+# GRADING POLICY
+# ============================================
+class GradingTests(CoreTestCase):
+    def test_sql_recompute_matches_compute_finale(self):
+        grades = [(Decimal(c) / 4, Decimal(e) / 4) for c in range(0, 81, 7) for e in range(0, 81, 9)]
+        for i, (controle, examen) in enumerate(grades):
+            student = self.students[i % len(self.students)]
+            Note.objects.create(
+                student=student, module=self.modules[i % 3], academic_year=f'{2000 + i}-{2001 + i}',
+                note_controle=controle, note_examen=examen,
+            )
+        for poids in ('0.00', '0.33', '0.45', '0.67', '1.00'):
+            # Policy changed behind the signals' back: only recompute() brings the grades up to date
+            Module.objects.filter(pk=self.modules[0].pk).update(poids_controle=Decimal(poids))
+            Filiere.objects.filter(pk=self.filiere.pk).update(poids_controle=Decimal(poids))
+            grading.recompute()
+            weights = dict(Module.objects.values_list('id', 'poids_controle'))
+            for note in Note.objects.all():
+                poids_controle = weights[note.module_id] if weights[note.module_id] is not None else Decimal(poids)
+                self.assertEqual(note.note_finale, Note.compute_finale(note.note_controle, note.note_examen, poids_controle))
+            self.assertEqual(grading.recompute()['changed'], 0)
+
+    def test_policy_change_enqueues_a_recompute(self):
+        module = Module.objects.get(pk=self.modules[0].pk)
+        filiere = Filiere.objects.get(pk=self.filiere.pk)
+        with mock.patch.object(jobs, 'enqueue') as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                module.name = 'Algorithmique'
+                module.save()
+                filiere.description = 'Tronc commun'
+                filiere.save()
+            enqueue.assert_not_called()
+            with self.captureOnCommitCallbacks(execute=True):
+                module.poids_controle = Decimal('0.50')
+                module.save()
+                filiere.poids_controle = Decimal('0.30')
+                filiere.save()
+        self.assertEqual(enqueue.call_args_list, [
+            mock.call('recompute_grades', {'module': module.pk}),
+            mock.call('recompute_grades', {'filiere': filiere.pk}),
+        ])
+
+    def test_module_weight_read_once_for_a_shared_instance(self):
+        module = Module.objects.get(pk=self.modules[0].pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(module.effective_poids_controle(), self.filiere.poids_controle)
+            module.effective_poids_controle()
+        module.poids_controle = Decimal('0.25')
+        with self.assertNumQueries(0):
+            self.assertEqual(module.effective_poids_controle(), Decimal('0.25'))
+
+# ============================================
+# GRADE IMPORT
+# ============================================
+class GradeImportTests(CoreTestCase):
+    def upload(self, content, name='notes.csv'):
+        return self.client_for(self.prof).post('/api/notes/import_grades/', {
+            'file': SimpleUploadedFile(name, content), 'module_id': self.modules[0].id, 'academic_year': YEAR,
+        }, format='multipart')
+
+    def test_unreadable_line_rolls_back_the_whole_file(self):
+        lines = [f'{student.cne};12;14' for student in self.students]
+        # Past the first batch (1000 lines) so that earlier batches have been written
+        lines += [f'INCONNU{i};10;10' for i in range(1500)]
+        response = self.upload(('\n'.join(lines) + '\n').encode() + b'\xff\xfe;10;10\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Note.objects.exists())
+
+    def test_blank_cell_keeps_the_stored_grade(self):
+        student = self.students[0]
+        Note.objects.create(student=student, module=self.modules[0], academic_year=YEAR, note_controle=8, note_examen=9)
+        response = self.upload(f'cne;note_controle;note_examen\n{student.cne};;15\n'.encode())
+        self.assertEqual(response.json()['imported'], 1)
+        note = Note.objects.get(student=student)
+        self.assertEqual((note.note_controle, note.note_examen), (8, 15))
+        self.assertIsNotNone(note.note_finale)
+
+    def test_archived_year_refused_by_every_entry_point(self):
+        ArchivedYear.objects.create(academic_year=YEAR)
+        with self.assertRaises(archive.ArchiveError):
+            GradeImporter(self.modules[0], YEAR)
+        self.assertEqual(self.upload(f'{self.students[0].cne};12;14\n'.encode()).status_code, 400)
+        with tempfile.NamedTemporaryFile(suffix='.csv') as f:
+            f.write(f'{self.students[0].cne};12;14\n'.encode())
+            f.flush()
+            with self.assertRaisesMessage(CommandError, 'archivée'):
+                call_command('import_grades', module=self.modules[0].id, academic_year=YEAR, file=f.name)
+        self.assertFalse(Note.objects.exists())
+
+    def test_corrupt_xlsx_is_a_command_error(self):
+        with tempfile.NamedTemporaryFile(suffix='.xlsx') as f:
+            f.write(b'PK\x03\x04 not a workbook')
+            f.flush()
+            with self.assertRaisesMessage(CommandError, 'Fichier illisible'):
+                call_command('import_grades', module=self.modules[0].id, academic_year=YEAR, file=f.name)
+
+    def test_50k_lines_streamed_in_bounded_batches(self):
+        size, unknown = 50000, MAX_REPORTED_ERRORS + 500
+        User.objects.bulk_create([
+            User(username=f'bulk{i}', email=f'bulk{i}@a.ma', role='ETUDIANT', cne=f'B{i:06d}') for i in range(size)
+        ], batch_size=2000)
+        read = {'lines': 0, 'ahead': 0}
+
+        def rows():
+            yield 1, ['cne', 'note_controle', 'note_examen']
+            for i in range(size + unknown):
+                read['lines'] += 1
+                cne = f'B{i:06d}' if i < size else f'INCONNU{i}'
+                yield i + 2, [cne, '12', '14,5']
+
+        importer = GradeImporter(self.modules[0], YEAR, user=self.prof)
+        process = importer._process
+
+        def checked_process(batch):
+            # Lines pulled from the file but not yet written: never more than one batch
+            read['ahead'] = max(read['ahead'], read['lines'] - importer.imported - importer.error_count)
+            process(batch)
+
+        with mock.patch.object(importer, '_process', checked_process):
+            report = importer.run(rows())
+        self.assertEqual((report['imported'], report['error_count']), (size, unknown))
+        self.assertEqual(len(report['errors']), MAX_REPORTED_ERRORS)
+        self.assertLessEqual(read['ahead'], importer.batch_size)
+        self.assertEqual(Note.objects.filter(module=self.modules[0]).count(), size)
+
+
+# ============================================
+# STUDENT PROVISIONING
+# ============================================
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class StudentImportTests(CoreTestCase):
+    HEADER = ['cne', 'last_name', 'first_name', 'email']
+
+    def run_import(self, rows, **options):
+        lines = enumerate([self.HEADER + (['password'] if len(rows[0]) > 4 else [])] + rows, start=1)
+        return StudentImporter(hash_workers=1, **options).run(lines)
+
+    def test_email_duplicates_ignore_case(self):
+        report = self.run_import([['N1', 'Alami', 'Sara', 'S0@A.MA'], ['N2', 'Idrissi', 'Omar', 'omar@a.ma']])
+        self.assertEqual(report['created'], 1)
+        self.assertEqual(report['errors'][0]['cne'], 'N1')
+
+    def test_no_emails_requires_a_password(self):
+        report = self.run_import([['N1', 'Alami', 'Sara', 'sara@a.ma']], send_emails=False)
+        self.assertEqual((report['created'], report['error_count']), (0, 1))
+        report = self.run_import([['N1', 'Alami', 'Sara', 'sara@a.ma', 'Secret-2024']], send_emails=False)
+        self.assertEqual(report['created'], 1)
+        self.assertTrue(User.objects.get(cne='N1').check_password('Secret-2024'))
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_temporary_password_cleared_after_delivery(self):
+        self.run_import([['N1', 'Alami', 'Sara', 'sara@a.ma']])
+        emails.enqueue('s1@a.ma', 'Inscription validée', 'Votre inscription a été validée.', kind=emails.KIND_INSCRIPTION_DECISION)
+        welcome = OutboundEmail.objects.get(kind=emails.KIND_ACCOUNT_CREATED)
+        self.assertIn('Mot de passe temporaire', welcome.body)
+
+        self.assertEqual(emails.process_queue()['sent'], 2)
+        welcome.refresh_from_db()
+        self.assertEqual(welcome.body, emails.REDACTED_BODY)
+        decision = OutboundEmail.objects.get(kind=emails.KIND_INSCRIPTION_DECISION)
+        self.assertEqual(decision.body, 'Votre inscription a été validée.')
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Minimal local SMTP server (aiosmtpd-like): keeps messages, refuses REFUSED recipients"""
+    REFUSED = 'refuse@a.ma'
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _SMTPHandler)
+        self.messages = []
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.reply('220 localhost')
+        recipients = []
+        for raw in self.rfile:
+            command = raw.decode().strip()
+            verb = command[:4].upper()
+            if verb in ('EHLO', 'HELO'):
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                if SMTPStandIn.REFUSED in command:
+                    self.reply('550 No such user')
+                else:
+                    recipients.append(command.split(':', 1)[1].strip(' <>'))
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = b''.join(iter(lambda: self.rfile.readline(), b'.\r\n'))
+                self.server.messages.append((recipients, email.message_from_bytes(data, policy=email.policy.default)))
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend', EMAIL_USE_TLS=False)
+class EmailDeliveryTests(TestCase):
+    def test_outbox_delivered_over_smtp(self):
+        emails.enqueue('s1@a.ma', 'Inscription validée', 'Votre inscription a été validée.')
+        emails.enqueue(SMTPStandIn.REFUSED, 'Inscription rejetée', 'Dossier incomplet.')
+        with SMTPStandIn() as server, override_settings(EMAIL_HOST='127.0.0.1', EMAIL_PORT=server.server_address[1]):
+            self.assertEqual(emails.process_queue(), {'sent': 1, 'retry': 1, 'failed': 0})
+
+        [(recipients, message)] = server.messages
+        self.assertEqual(recipients, ['s1@a.ma'])
+        self.assertEqual(message['Subject'], 'Inscription validée')
+        refused = OutboundEmail.objects.get(to_email=SMTPStandIn.REFUSED)
+        self.assertEqual((refused.status, refused.attempts), ('PENDING', 1))
+        self.assertIn('SMTPRecipientsRefused', refused.last_error)
+
+    @override_settings(EMAIL_QUEUE={'MAX_ATTEMPTS': 1})
+    def test_failed_credentials_are_redacted_and_reported(self):
+        emails.enqueue(SMTPStandIn.REFUSED, 'Votre compte', 'Mot de passe temporaire: X9k', kind=emails.KIND_ACCOUNT_CREATED)
+        emails.enqueue(SMTPStandIn.REFUSED, 'Inscription rejetée', 'Dossier incomplet.')
+        with SMTPStandIn() as server, override_settings(EMAIL_HOST='127.0.0.1', EMAIL_PORT=server.server_address[1]):
+            self.assertEqual(emails.process_queue()['failed'], 2)
+        welcome = OutboundEmail.objects.get(kind=emails.KIND_ACCOUNT_CREATED)
+        self.assertEqual((welcome.status, welcome.body), ('FAILED', emails.REDACTED_BODY))
+        self.assertEqual(OutboundEmail.objects.get(kind='').body, 'Dossier incomplet.')
+        self.assertEqual(emails.undelivered_credentials(), [SMTPStandIn.REFUSED])
+
+    def test_unreachable_server_retries_the_batch(self):
+        with SMTPStandIn() as server:
+            port = server.server_address[1]
+        emails.enqueue('s1@a.ma', 'Inscription validée', 'Votre inscription a été validée.')
+        with override_settings(EMAIL_HOST='127.0.0.1', EMAIL_PORT=port):
+            self.assertEqual(emails.process_queue(), {'sent': 0, 'retry': 1, 'failed': 0})
+        self.assertEqual(OutboundEmail.objects.get().status, 'PENDING')
+
+# ============================================
+# PUSHED EVENTS
+# ============================================
+class EventTests(CoreTestCase):
+    def setUp(self):
+        self.broker = events.InProcessBroker()
+        patcher = mock.patch.object(events, '_broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def subscribe(self, user):
+        return self.broker.subscribe(events.audience(user))
+
+    def drain(self, subscription):
+        received = []
+        while (event := subscription.get(timeout=0)) is not None:
+            received.append(event)
+        return received
+
+    def test_audience_by_role_and_department(self):
+        other_admin = User.objects.create(username='admin2', email='admin2@a.ma', role='ADMIN')
+        other_prof = User.objects.create(username='prof2', email='prof2@a.ma', role='ENSEIGNANT')
+        users = [self.direction, self.admin, other_admin, self.prof, other_prof, self.students[0], self.students[1]]
+        subscriptions = {user.username: self.subscribe(user) for user in users}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            events.publish('inscription.created', {'count': 1}, departement_id=self.dept.id, student_ids=[self.students[0].id])
+            events.publish(
+                'grades.published', {'count': 1}, departement_id=self.dept.id,
+                enseignant_id=self.prof.id, student_ids=[self.students[1].id],
+            )
+        received = {name: [e['type'] for e in self.drain(sub)] for name, sub in subscriptions.items()}
+        self.assertEqual(received, {
+            'dir': ['inscription.created', 'grades.published'],
+            'admin': ['inscription.created', 'grades.published'],
+            'admin2': [],
+            'prof': ['grades.published'],
+            'prof2': [],
+            's0': ['inscription.created'],
+            's1': ['grades.published'],
+        })
+
+    def test_grade_saves_of_a_transaction_are_coalesced(self):
+        subscription = self.subscribe(self.prof)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                for student in self.students[:3]:
+                    Note.objects.create(student=student, module=self.modules[0], academic_year=YEAR, note_controle=12)
+                self.assertEqual(self.drain(subscription), [])
+        [event] = self.drain(subscription)
+        self.assertEqual((event['type'], event['data']['count']), ('grades.published', 3))
+        self.assertEqual(event['scope']['student_ids'], {student.id for student in self.students[:3]})
+
+    def test_nothing_published_on_rollback(self):
+        subscription = self.subscribe(self.direction)
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Note.objects.create(student=self.students[0], module=self.modules[0], academic_year=YEAR)
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(self.drain(subscription), [])
+        for student in self.students[1:3]:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    Note.objects.create(student=student, module=self.modules[0], academic_year=YEAR)
+        # One event per committed transaction, none lost to an already flushed batch
+        self.assertEqual([e['data']['count'] for e in self.drain(subscription)], [1, 1])
+
+    @override_settings(EVENTS={'QUEUE_SIZE': 1})
+    def test_async_subscription_fed_from_another_thread(self):
+        async def consume():
+            subscription = self.broker.subscribe(lambda event: True, asynchronous=True)
+            publisher = threading.Thread(target=lambda: [
+                self.broker.publish({'type': 'grades.published', 'data': {'count': n}, 'scope': {}}) for n in (1, 2)
+            ])
+            publisher.start()
+            publisher.join()
+            first = await subscription.get(timeout=1)
+            # Queue of one: the second event was dropped, the client is told to resync
+            frames = events._frames(subscription, await subscription.get(timeout=0.05))
+            return first, frames
+
+        first, frames = asyncio.run(consume())
+        self.assertEqual(first['data'], {'count': 1})
+        self.assertEqual(frames, [events.format_sse('resync', {})])
+
+# ============================================
+# SEARCH
+# ============================================
+class SearchTests(CoreTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Name in the title vs. only in the email
+        cls.salma = User.objects.create(
+            username='idrissi', email='salma@a.ma', role='ENSEIGNANT', first_name='Salma', last_name='Idrissi',
+        )
+        cls.omar = User.objects.create(username='omar', email='idrissi.omar@a.ma', role='ENSEIGNANT', first_name='Omar')
+
+    def ids(self, results):
+        return [(row['kind'], row['id']) for row in results]
+
+    def test_prefix_and_ranking(self):
+        # FTS5 (bm25, title weighted) on SQLite, LIKE fallback on the other backends
+        for backend in (search._search_fts, search._search_like):
+            with self.subTest(backend=backend.__name__):
+                total, results = backend(search.tokenize('Idri'), search.KINDS, 20, 0)
+                self.assertEqual(total, 2)
+                self.assertEqual(self.ids(results), [('user', self.salma.id), ('user', self.omar.id)])
+                # Every token must match
+                total, results = backend(search.tokenize('sal idri'), search.KINDS, 20, 0)
+                self.assertEqual(self.ids(results), [('user', self.salma.id)])
+                total, results = backend(search.tokenize('idri'), [search.KIND_MODULE], 20, 0)
+                self.assertEqual(total, 0)
+
+    def test_students_cannot_search_users(self):
+        params = {'q': 'idri'}
+        self.assertEqual(self.client_for(self.admin).get('/api/search/', params).json()['count'], 2)
+        self.assertEqual(self.client_for(self.students[0]).get('/api/search/', params).json()['count'], 0)
+        response = self.client_for(self.students[0]).get('/api/search/', {'q': 'idri', 'type': 'user'})
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_login_does_not_reindex(self):
+        with mock.patch.object(search, 'index_object') as index:
+            self.salma.last_login = timezone.now()
+            self.salma.save(update_fields=['last_login'])
+            index.assert_not_called()
+            self.salma.last_name = 'Alaoui'
+            self.salma.save(update_fields=['last_name'])
+            index.assert_called_once_with(search.KIND_USER, self.salma)
+
+# ============================================
+# TRANSCRIPT CACHE
+# ============================================
+class TranscriptCacheTests(CoreTestCase):
+    def setUp(self):
+        self.student = self.students[0]
+        self.note = Note.objects.create(
+            student=self.student, module=self.modules[0], academic_year=YEAR, note_controle=10, note_examen=10
+        )
+
+    def average(self):
+        return transcripts.get_transcript(self.student.id)[0]['average']
+
+    def test_write_from_another_process_is_seen(self):
+        self.assertEqual(self.average(), 10.0)
+        # No signal here: as if another worker (with its own LocMem cache) wrote it
+        Note.objects.filter(pk=self.note.pk).update(note_finale=14, updated_at=timezone.now())
+        self.assertEqual(self.average(), 14.0)
+
+    def test_cache_hit_skips_compute(self):
+        self.average()
+        with mock.patch.object(transcripts, 'compute_transcript') as compute:
+            self.assertEqual(self.average(), 10.0)
+        compute.assert_not_called()
+
+    def test_module_edit_only_invalidates_on_coefficient_or_semestre(self):
+        module = Module.objects.get(pk=self.modules[0].pk)
+        with mock.patch.object(transcripts, 'invalidate_all') as invalidate:
+            module.name = 'Analyse'
+            module.save()
+            invalidate.assert_not_called()
+            module.semestre = 2
+            module.save()
+            invalidate.assert_called_once()
+
+
+# ============================================
+# GRADE AUDIT LOG
+# ============================================
+class NoteAuditTests(CoreTestCase):
+    def test_any_stored_grade_fits_the_audit_columns(self):
+        # Legacy row written before the 0-20 validators (Note columns hold up to 999.99)
+        note = Note.objects.create(student=self.students[0], module=self.modules[0], academic_year=YEAR, note_controle='999.99')
+        note.note_controle = 12
+        note.save()
+        update = NoteAudit.objects.get(action=NoteAudit.ACTION_UPDATE)
+        self.assertEqual((update.old_controle, update.new_controle), (99999, 1200))
+        self.assertEqual(audit.decode(update.old_controle), 999.99)
+        for field in ('old_controle', 'new_controle', 'old_examen', 'new_examen'):
+            self.assertEqual(NoteAudit._meta.get_field(field).get_internal_type(), 'IntegerField')
+
+    def test_bulk_update_grades_costs_one_write_per_row(self):
+        def bulk_update(students, controle):
+            body = {'module_id': self.modules[0].id, 'academic_year': YEAR, 'grades': [
+                {'student_id': student.id, 'note_controle': controle, 'note_examen': 12} for student in students
+            ]}
+            with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+                response = self.client_for(self.prof).post('/api/notes/bulk_update_grades/', body, format='json')
+            self.assertEqual(response.json()['updated_count'], len(students))
+            return len(queries)
+
+        few, many = self.students[:2], self.students[2:]
+        for controle in (10, 14):  # creations, then updates
+            # Module, weight, students, stored notes, audit and feed: per request, not per row
+            few_queries = bulk_update(few, controle)
+            self.assertLessEqual(bulk_update(many, controle) - few_queries, len(many) - len(few))
+        self.assertEqual(NoteAudit.objects.filter(source=NoteAudit.SOURCE_BULK).count(), 2 * len(self.students))
+
+
+# ============================================
+# ACADEMIC YEAR ARCHIVE
+# ============================================
+class ArchiveTests(CoreTestCase):
+    OLD_YEAR = '2020-2021'
+
+    def setUp(self):
+        self.inscription = Inscription.objects.create(
+            student=self.students[0], filiere=self.filiere, academic_year=self.OLD_YEAR,
+            status='VALIDATED', validation_date=timezone.now(),
+        )
+        self.note = Note.objects.create(
+            student=self.students[0], module=self.modules[0], academic_year=self.OLD_YEAR, note_controle=11, note_examen=13
+        )
+
+    def test_archive_restore_round_trip(self):
+        before = Note.objects.filter(pk=self.note.pk).values('note_controle', 'note_examen', 'note_finale').get()
+        archived = archive.archive_year(self.OLD_YEAR, force=True)
+        self.assertEqual((archived.inscriptions_count, archived.notes_count), (1, 1))
+        self.assertFalse(Note.objects.filter(academic_year=self.OLD_YEAR).exists())
+        self.assertEqual(ArchivedNote.objects.get().id, self.note.pk)
+        self.assertEqual(transcripts.get_transcript(self.students[0].id)[0]['academic_year'], self.OLD_YEAR)
+
+        self.assertEqual(archive.restore_year(self.OLD_YEAR), {'inscription': 1, 'note': 1})
+        self.assertFalse(ArchivedInscription.objects.exists())
+        after = Note.objects.filter(pk=self.note.pk).values('note_controle', 'note_examen', 'note_finale').get()
+        self.assertEqual(after, before)
+        self.assertEqual(Inscription.objects.get(pk=self.inscription.pk).status, 'VALIDATED')
+
+    def test_archive_ids_are_bigint_like_the_hot_tables(self):
+        for model in (ArchivedInscription, ArchivedNote):
+            self.assertEqual(model._meta.pk.get_internal_type(), 'BigIntegerField')
+
+    def test_rollup_rebuild_keeps_archived_years(self):
+        archive.archive_year(self.OLD_YEAR, force=True)
+        rollups.rebuild(Inscription, EnrollmentRollup, ArchivedInscription)
+        row = EnrollmentRollup.objects.get(academic_year=self.OLD_YEAR)
+        self.assertEqual((row.created_count, row.validated_count), (1, 1))
+
+
+# ============================================
+# WORKER WARM-UP
+# ============================================
+class WarmupTests(TestCase):
+    def test_helper_thread_closes_its_connections(self):
+        from django.db import connections
+
+        threads = {}
+
+        def record(step):
+            return lambda *args: threads.setdefault(step, threading.current_thread())
+
+        async def startup():
+            # As when uvicorn imports asgi.py: called with a running event loop
+            return warmup.run_on_startup()
+
+        with mock.patch.object(warmup, 'get_config', return_value={**warmup.DEFAULTS, 'ENABLED': True}), \
+                mock.patch.object(warmup, 'warm_database', record('database')), \
+                mock.patch.object(connections, 'close_all', record('close')):
+            timings = asyncio.run(startup())
+        self.assertIn('database', timings)
+        self.assertIsNot(threads['database'], threading.current_thread())
+        # Closed by the thread that opened them (connections are per thread)
+        self.assertIs(threads['close'], threads['database'])
+
+
+# ============================================
+# REQUEST PROFILER
+# ============================================
+class ProfilerTests(CoreTestCase):
+    def setUp(self):
+        output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(output_dir.cleanup)
+        self.settings_override = override_settings(PROFILER={'ENABLED': True, 'OUTPUT_DIR': output_dir.name})
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.client.force_login(self.admin)
+
+    def test_only_opt_in_values_profile(self):
+        for value in ('0', 'false', 'no', 'off', 'nope'):
+            response = self.client.get('/api/filieres/', {'_profile': value})
+            self.assertNotIn('X-Profile-Id', response, value)
+        for value in ('1', 'true', 'TRUE'):
+            response = self.client.get('/api/filieres/', {'_profile': value})
+            self.assertIn('X-Profile-Id', response, value)
+        response = self.client.get('/api/filieres/', HTTP_X_PROFILE='false')
+        self.assertNotIn('X-Profile-Id', response)
+
+    def test_disabled_by_default_outside_debug(self):
+        with override_settings(DEBUG=False, PROFILER={}):
+            self.assertFalse(profiling.get_config()['ENABLED'])
+        with override_settings(DEBUG=True, PROFILER={}):
+            self.assertTrue(profiling.get_config()['ENABLED'])
+
+
+# ============================================
+# METRICS
+# ============================================
+class MetricsTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = directory.name
+        self.registry = metrics.Registry()
+        self.counter = self.registry.counter('test_total', 'Test counter.')
+
+    def _dump(self, name, value):
+        with open(os.path.join(self.dir, name), 'w', encoding='utf-8') as f:
+            json.dump({'test_total': [[[], value]]}, f)
+
+    def _total(self):
+        return self.registry.collect()['test_total'].get((), 0)
+
+    def test_dead_worker_files_are_archived(self):
+        dead_pid = 2 ** 22 + 1  # above pid_max: never a live process
+        self._dump(f'{dead_pid}.json', 5)
+        self.counter.inc(2)
+        with override_settings(METRICS_MULTIPROC_DIR=self.dir):
+            self.assertEqual(self._total(), 7)
+            self.assertFalse(os.path.exists(os.path.join(self.dir, f'{dead_pid}.json')))
+            self.assertTrue(os.path.exists(os.path.join(self.dir, metrics.ARCHIVE_FILE)))
+            self.assertEqual(self._total(), 7)
+
+    def test_reused_pid_does_not_reset_counters(self):
+        self._dump(f'{os.getpid()}.json', 10)
+        self.counter.inc(1)
+        with override_settings(METRICS_MULTIPROC_DIR=self.dir):
+            self.assertEqual(self._total(), 11)
+            self.counter.inc(1)
+            self.assertEqual(self._total(), 12)
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.0/8'], METRICS_TOKEN='s3cret')
+    def test_endpoint_requires_allowed_ip_or_token(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='192.168.1.5').status_code, 403)
+        self.assertEqual(self.client.get(
+            '/metrics', REMOTE_ADDR='192.168.1.5', HTTP_AUTHORIZATION='Bearer wrong'
+        ).status_code, 403)
+        self.assertEqual(self.client.get(
+            '/metrics', REMOTE_ADDR='192.168.1.5', HTTP_AUTHORIZATION='Bearer s3cret'
+        ).status_code, 200)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.1.2.3').status_code, 200)
+
+
+# ============================================
+# SLOW QUERY LOG
+# ============================================
+class SlowQueryLogTests(CoreTestCase):
+    def test_normalized_fingerprint(self):
+        first = slow_queries.normalize_sql("SELECT * FROM t WHERE id = 5 AND code = 'GI' AND x IN (?, ?, ?)")
+        second = slow_queries.normalize_sql("SELECT  * FROM t WHERE id = 71 AND code = 'MI' AND x IN (?)")
+        self.assertEqual(first, second)
+        self.assertEqual(first, 'SELECT * FROM t WHERE id = ? AND code = ? AND x IN (...)')
+        self.assertEqual(slow_queries.params_shape([1, 'a', [1, 2]]), 'int, str, list[2]')
+
+    @override_settings(SLOW_QUERY_LOG={'ENABLED': True, 'THRESHOLD_MS': 0})
+    def test_requests_record_queries_with_their_plan(self):
+        client = self.client_for(self.admin)
+        for _ in range(2):
+            self.assertEqual(client.get('/api/filieres/').status_code, 200)
+        entry = SlowQuery.objects.filter(normalized_sql__contains='FROM "core_filiere"').first()
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry.calls, 2)
+        self.assertEqual((entry.view, entry.action), ('filiere-list', 'list'))
+        self.assertRegex(entry.explain_plan, 'SCAN|SEARCH')
+        self.assertNotIn('EXPLAIN failed', entry.explain_plan)
+
+    def test_disabled_by_default(self):
+        with override_settings(SLOW_QUERY_LOG={}):
+            self.client_for(self.admin).get('/api/filieres/')
+        self.assertFalse(SlowQuery.objects.exists())
+
+
+# ============================================
+# ENROLLMENT ROLLUP
+# ============================================
+class EnrollmentRollupTests(CoreTestCase):
+    def record(self, event, day, count=1):
+        rollups.record(event, self.filiere.id, YEAR, count=count, when=timezone.make_aware(datetime.fromisoformat(day)))
+
+    def test_events_increment_one_row_per_day(self):
+        self.record('CREATED', '2024-09-02T09:00')
+        self.record('CREATED', '2024-09-02T17:30', count=3)
+        self.record('VALIDATED', '2024-09-02T18:00')
+        self.record('REJECTED', '2024-09-03T08:00')
+        rows = EnrollmentRollup.objects.order_by('date').values_list(
+            'date', 'created_count', 'validated_count', 'rejected_count'
+        )
+        self.assertEqual(list(rows), [(date(2024, 9, 2), 4, 1, 0), (date(2024, 9, 3), 0, 0, 1)])
+
+    def test_trends_granularity(self):
+        for day in ('2024-09-02', '2024-09-05', '2024-09-20', '2024-10-07', '2025-01-06'):
+            self.record('CREATED', f'{day}T10:00')
+        series = {
+            granularity: [(row['period'][:10], row['created']) for row in rollups.trends(EnrollmentRollup.objects.all(), granularity)]
+            for granularity in rollups.GRANULARITIES
+        }
+        self.assertEqual(series['month'], [('2024-09-01', 3), ('2024-10-01', 1), ('2025-01-01', 1)])
+        self.assertEqual(series['week'], [('2024-09-02', 2), ('2024-09-16', 1), ('2024-10-07', 1), ('2025-01-06', 1)])
+        self.assertEqual(series['year'], [('2024-01-01', 4), ('2025-01-01', 1)])
+        self.assertEqual(len(series['day']), 5)
+
+        client = self.client_for(self.direction)
+        response = client.get('/api/admin/enrollment_trends/', {'granularity': 'month', 'start': '2024-10-01'})
+        self.assertEqual([row['created'] for row in response.json()['series']], [1, 1])
+        self.assertEqual(client.get('/api/admin/enrollment_trends/', {'granularity': 'hour'}).status_code, 400)
+        self.assertEqual(self.client_for(self.students[0]).get('/api/admin/enrollment_trends/').status_code, 403)
+
+
+# ============================================
+# OPENAPI SCHEMA
+# ============================================
+class SchemaTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_override = override_settings(OPENAPI_SCHEMA={'DIR': directory.name, 'CODE_VERSION': 'test'})
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        openapi.clear_cache()
+        self.addCleanup(openapi.clear_cache)
+
+    def test_etag_and_304(self):
+        response = self.client.get('/api/schema/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], openapi.FORMATS['yaml'])
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/api/schema/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        as_json = self.client.get('/api/schema/', {'format': 'json'})
+        self.assertEqual(as_json['Content-Type'], openapi.FORMATS['json'])
+        self.assertNotEqual(as_json['ETag'], etag)
+        self.assertIn('/api/notes/bulk_update_grades/', json.loads(as_json.content)['paths'])
+        self.assertEqual(self.client.get('/api/schema/', HTTP_ACCEPT='application/json')['ETag'], as_json['ETag'])
+        self.assertEqual(self.client.post('/api/schema/').status_code, 405)
+
+    def test_built_once_per_code_version(self):
+        openapi.build()
+        openapi.clear_cache()
+        with mock.patch.object(openapi, 'generate') as generate:
+            self.assertEqual(self.client.get('/api/schema/').status_code, 200)
+        generate.assert_not_called()
+
+
+# ============================================
+# LIST PROJECTIONS / RENDERERS
+# ============================================
+class ProjectionParityTests(CoreTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Module.objects.filter(pk=cls.modules[1].pk).update(poids_controle=Decimal('0.25'), enseignant=None)
+        for i, student in enumerate(cls.students[:3]):
+            inscription = Inscription.objects.create(student=student, filiere=cls.filiere, academic_year=YEAR)
+            if i:
+                inscription.transition('VALIDATED' if i == 1 else 'REJECTED', cls.admin, rejection_reason='Doublon')
+            for module in cls.modules[:2]:
+                Note.objects.create(
+                    student=student, module=module, academic_year=YEAR, saisie_par=cls.prof if i else None,
+                    note_controle=Decimal('12.5') + i, note_examen=None if i == 2 else Decimal('14.25'),
+                )
+
+    def json(self, data):
+        return json.loads(renderers.ORJSONRenderer().render(data))
+
+    def test_projections_match_the_serializers(self):
+        inscriptions = Inscription.objects.order_by('id')
+        self.assertEqual(
+            self.json(projections.inscriptions(inscriptions)),
+            json.loads(JSONRenderer().render(InscriptionSerializer(inscriptions, many=True).data)),
+        )
+        notes = Note.objects.order_by('id')
+        self.assertEqual(
+            self.json(projections.notes(notes)),
+            json.loads(JSONRenderer().render(NoteSerializer(notes, many=True).data)),
+        )
+
+    def test_empty_stream_is_an_empty_array(self):
+        self.assertEqual(renderers.ORJSONRenderer().render(projections.notes(Note.objects.none())), b'[]')
+
+    @skipUnless(renderers.msgpack, 'msgpack not installed')
+    def test_msgpack_carries_the_json_values(self):
+        notes = Note.objects.order_by('id')
+        packed = renderers.MessagePackRenderer().render(projections.notes(notes))
+        self.assertEqual(renderers.msgpack.unpackb(packed), self.json(projections.notes(notes)))
+        response = self.client_for(self.prof).get('/api/notes/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+
+
+# ============================================
+# PAGE BOOTSTRAP
+# ============================================
+class BootstrapTests(CoreTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        other = Departement.objects.create(name='Mécanique', code='MECA')
+        cls.other_filiere = Filiere.objects.create(name='Génie Méca', code='GM', departement=other, capacity=10)
+        cls.pending = Inscription.objects.create(student=cls.students[0], filiere=cls.filiere, academic_year=YEAR)
+        Inscription.objects.create(student=cls.students[1], filiere=cls.other_filiere, academic_year=YEAR)
+
+    def setUp(self):
+        # Reference data and dashboards live in the (process-wide) cache
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def bootstrap(self, user, **params):
+        return self.client_for(user).get('/api/bootstrap/', params)
+
+    def sections(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['role'], response.data['user']['role'])
+        return set(response.data) - {'user', 'role'}
+
+    def test_sections_per_role(self):
+        for user in (self.students[0], self.prof, self.admin, self.direction):
+            with self.subTest(role=user.role):
+                self.assertEqual(self.sections(self.bootstrap(user)), set(bootstrap.SECTIONS[user.role]))
+
+    def test_student_sees_own_rows(self):
+        data = self.bootstrap(self.students[0]).data
+        self.assertEqual([row['id'] for row in data['inscriptions']], [self.pending.id])
+        self.assertEqual(data['notes'], [])
+
+    def test_admin_scoped_to_managed_departments(self):
+        data = self.bootstrap(self.admin).data
+        self.assertEqual([row['id'] for row in data['pending_inscriptions']], [self.pending.id])
+        self.assertEqual([row['id'] for row in data['departements']], [self.dept.id])
+        self.assertEqual([row['id'] for row in data['filieres']], [self.filiere.id])
+        self.assertEqual([row['code'] for row in data['modules']], ['M0', 'M1', 'M2'])
+        # DIRECTION is not restricted
+        data = self.bootstrap(self.direction).data
+        self.assertEqual({row['id'] for row in data['filieres']}, {self.filiere.id, self.other_filiere.id})
+
+    def test_include_filters_and_rejects_unknown(self):
+        response = self.bootstrap(self.direction, include='filieres, departements')
+        self.assertEqual(self.sections(response), {'filieres', 'departements'})
+        # A section of another role is as unknown as a typo
+        response = self.bootstrap(self.direction, include='filieres,notes')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('notes', response.data['error'])
+
+    def test_reference_invalidated_on_filiere_save(self):
+        self.bootstrap(self.direction, include='filieres')
+        self.other_filiere.name = 'Génie Mécanique'
+        self.other_filiere.save()
+        rows = self.bootstrap(self.direction, include='filieres').data['filieres']
+        self.assertIn('Génie Mécanique', [row['name'] for row in rows])
+
+
+# ============================================
+# DELTA SYNC (?updated_since=)
+# ============================================
+class DeltaSyncTests(CoreTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.inscriptions = [
+            Inscription.objects.create(student=student, filiere=cls.filiere, academic_year=YEAR)
+            for student in cls.students[:3]
+        ]
+
+    def setUp(self):
+        # Everything written long before the watermark, beyond the overlap window
+        self.since = timezone.now() - timedelta(minutes=10)
+        Inscription.objects.update(updated_at=self.since - timedelta(hours=1))
+
+    def delta(self, user, since):
+        value = since if isinstance(since, str) else sync.format_watermark(since)
+        return self.client_for(user).get('/api/inscriptions/', {'updated_since': value})
+
+    def changes(self, user, since):
+        # Rows are streamed (projections.RowStream): read the rendered body
+        response = self.delta(user, since)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_full_list_sends_watermark(self):
+        response = self.client_for(self.admin).get('/api/inscriptions/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(sync.parse_watermark(response[sync.WATERMARK_HEADER]))
+
+    def test_changes_and_tombstones_since_watermark(self):
+        changed, deleted_id = self.inscriptions[0], self.inscriptions[1].id
+        with self.captureOnCommitCallbacks(execute=True):
+            changed.transition('VALIDATED', self.admin)
+            self.inscriptions[1].delete()
+
+        data = self.changes(self.admin, self.since)
+        self.assertEqual([row['id'] for row in data['results']], [changed.id])
+        self.assertEqual(data['results'][0]['status'], 'VALIDATED')
+        self.assertEqual(data['deleted'], [deleted_id])
+
+        # Nothing changed after the returned watermark (beyond the overlap window)
+        later = sync.parse_watermark(data['watermark']) + timedelta(minutes=1)
+        data = self.changes(self.admin, later)
+        self.assertEqual((data['results'], data['deleted']), ([], []))
+
+    def test_student_only_gets_own_tombstones(self):
+        deleted_id = self.inscriptions[1].id
+        with self.captureOnCommitCallbacks(execute=True):
+            self.inscriptions[1].delete()
+        self.assertEqual(self.changes(self.students[0], self.since)['deleted'], [])
+        self.assertEqual(self.changes(self.students[1], self.since)['deleted'], [deleted_id])
+
+    def test_invalid_watermark_is_400(self):
+        for value in ('hier', '2025-13-01T00:00:00Z'):
+            with self.subTest(value=value):
+                self.assertEqual(self.delta(self.admin, value).status_code, 400)
+
+    def test_watermark_past_tombstone_horizon_is_410(self):
+        days = sync.get_config()['TOMBSTONE_DAYS']
+        response = self.delta(self.admin, timezone.now() - timedelta(days=days + 1))
+        self.assertEqual(response.status_code, 410)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.inscriptions[2].delete()
+        Tombstone.objects.update(deleted_at=timezone.now() - timedelta(days=days + 1))
+        self.assertEqual(sync.prune_tombstones(), 1)
+        self.assertFalse(Tombstone.objects.exists())
@@ -0,0 +1,147 @@
+"""
+Transcript engine: coefficient-weighted semester and yearly averages
+
+    moyenne = Σ(note_finale × coefficient) / Σ(coefficient)
+
+over the modules that have a final grade. Two queries (hot and archived notes)
+load every grade of a student; the result is cached with a fingerprint of
+the student's notes (COUNT, MAX(updated_at) of the notes and of their
+modules), checked on every read. Any grade write, deletion, recompute,
+archival or module edit changes it, whichever process made the change, so a
+per-process cache (LocMem) never serves a stale transcript. The entries
+are also dropped when this process knows they changed:
+    - a Note of the student is written or deleted  -> invalidate_students()
+    - a Module coefficient or semestre changes -> invalidate_all()
+    - a year of the student is archived or restored (core/archive.py)
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import chain
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import ArchivedNote, Note
+
+
+PASSING_AVERAGE = Decimal('10')
+_GENERATION_KEY = 'transcript:generation'
+
+
+def _round(value):
+    return float(value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)) if value is not None else None
+
+
+def _cache_key(student_id):
+    generation = cache.get_or_set(_GENERATION_KEY, 1, None)
+    return f'transcript:{generation}:{student_id}'
+
+
+def invalidate_students(student_ids):
+    cache.delete_many([_cache_key(student_id) for student_id in student_ids])
+
+
+def invalidate_all():
+    """Module changes affect every transcript: bump the key generation (O(1))"""
+    try:
+        cache.incr(_GENERATION_KEY)
+    except ValueError:
+        cache.set(_GENERATION_KEY, 2, None)
+
+
+def weighted_average(pairs):
+    """pairs: iterable of (note, coefficient). Ignores missing notes."""
+    total = Decimal('0')
+    weights = Decimal('0')
+    for note, coefficient in pairs:
+        if note is None:
+            continue
+        total += Decimal(note) * Decimal(coefficient)
+        weights += Decimal(coefficient)
+    return (total / weights) if weights else None
+
+
+def compute_transcript(student_id):
+    """Build the full transcript (every academic year) archived years included"""
+    columns = (
+        'academic_year', 'module__semestre', 'module_id', 'module__code', 'module__name',
+        'module__coefficient', 'note_controle', 'note_examen', 'note_finale',
+    )
+    order = ('academic_year', 'module__semestre', 'module__code')
+    # Archived years (core/archive.py) are part of the transcript: one more query
+    rows = sorted(
+        chain(
+            ArchivedNote.objects.filter(student_id=student_id).values_list(*columns).order_by(*order),
+            Note.objects.filter(student_id=student_id).values_list(*columns).order_by(*order),
+        ),
+        key=lambda row: (row[0], row[1], row[3]),
+    )
+
+    years = {}
+    for year, semestre, module_id, code, name, coefficient, controle, examen, finale in rows:
+        semesters = years.setdefault(year, {})
+        semesters.setdefault(semestre, []).append({
+            'module_id': module_id,
+            'code': code,
+            'name': name,
+            'coefficient': coefficient,
+            'note_controle': controle,
+            'note_examen': examen,
+            'note_finale': finale,
+        })
+
+    result = []
+    for year, semesters in years.items():
+        semester_list = []
+        year_pairs = []
+        for semestre, modules in semesters.items():
+            pairs = [(m['note_finale'], m['coefficient']) for m in modules]
+            year_pairs.extend(pairs)
+            average = weighted_average(pairs)
+            semester_list.append({
+                'semestre': semestre,
+                'average': _round(average),
+                'total_coefficient': float(sum(Decimal(m['coefficient']) for m in modules)),
+                'validated': average is not None and average >= PASSING_AVERAGE,
+                'modules': [
+                    {
+                        **m,
+                        'coefficient': float(m['coefficient']),
+                        'note_controle': _round(m['note_controle']),
+                        'note_examen': _round(m['note_examen']),
+                        'note_finale': _round(m['note_finale']),
+                    }
+                    for m in modules
+                ],
+            })
+        year_average = weighted_average(year_pairs)
+        result.append({
+            'academic_year': year,
+            'average': _round(year_average),
+            'validated': year_average is not None and year_average >= PASSING_AVERAGE,
+            'semesters': semester_list,
+        })
+    return result
+
+
+def fingerprint(student_id):
+    """Cheap validator: two aggregates on the student's hot and archived notes"""
+    state = []
+    for model in (Note, ArchivedNote):
+        row = model.objects.filter(student_id=student_id).aggregate(
+            rows=Count('id'), updated=Max('updated_at'), modules=Max('module__updated_at'),
+        )
+        state.extend((row['rows'], row['updated'] and row['updated'].isoformat(), row['modules'] and row['modules'].isoformat()))
+    return tuple(state)
+
+
+def get_transcript(student_id):
+    """Cached transcript of one student"""
+    key = _cache_key(student_id)
+    state = fingerprint(student_id)
+    cached = cache.get(key)
+    if cached is not None and cached[0] == state:
+        return cached[1]
+    transcript = compute_transcript(student_id)
+    cache.set(key, (state, transcript), getattr(settings, 'TRANSCRIPT_CACHE_TIMEOUT', 24 * 3600))
+    return transcript
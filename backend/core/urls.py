@@ -7,7 +7,17 @@ from .views import (
     InscriptionViewSet,
     dashboard_statistics,
     NoteViewSet,
+    DeliberationViewSet,
+    RankingViewSet,
+    JobViewSet,
+    ArchiveViewSet,
+    ChangeFeedViewSet,
     academic_performance,
+    search_view,
+    enrollment_trends,
+    event_stream,
+    bootstrap_view,
+    import_students,
 )
 
 router = DefaultRouter()
@@ -16,9 +26,19 @@ router.register(r'filieres', FiliereViewSet, basename='filiere')
 router.register(r'modules', ModuleViewSet, basename='module')
 router.register(r'inscriptions', InscriptionViewSet, basename='inscription')
 router.register(r'notes', NoteViewSet, basename='note')  # ← Add this
+router.register(r'deliberations', DeliberationViewSet, basename='deliberation')
+router.register(r'rankings', RankingViewSet, basename='ranking')
+router.register(r'jobs', JobViewSet, basename='job')
+router.register(r'archives', ArchiveViewSet, basename='archive')
+router.register(r'changes', ChangeFeedViewSet, basename='change')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('admin/dashboard/', dashboard_statistics, name='stats'),
 path('admin/performance/', academic_performance, name='academic_performance'),
+    path('admin/enrollment_trends/', enrollment_trends, name='enrollment_trends'),
+    path('admin/import_students/', import_students, name='import_students'),
+    path('bootstrap/', bootstrap_view, name='bootstrap'),
+    path('search/', search_view, name='search'),
+    path('events/', event_stream, name='events'),
 ]
\ No newline at end of file
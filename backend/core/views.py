@@ -1,9 +1,15 @@
+import zipfile
+
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny, SAFE_METHODS
+from rest_framework.permissions import IsAuthenticated, AllowAny, BasePermission, SAFE_METHODS
 from django.utils import timezone
+from datetime import date
 from django.db.models import Q
-from rest_framework.decorators import api_view, permission_classes, action, authentication_classes
+from django.db import transaction
+from rest_framework.decorators import api_view, permission_classes, action, authentication_classes, parser_classes
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import MultiPartParser, FormParser
 from django.db.models import Count
 from users.models import User
 from rest_framework_simplejwt.authentication import JWTAuthentication  # <--- Critical for 401 fix
@@ -11,10 +17,18 @@ from django.db.models import Count
 from django.db.models.functions import TruncMonth
 from django.contrib.auth import get_user_model
 from django.db.models import Sum # <--- N'oublie pas cet import en haut !
-from django.db.models import Avg, F
+from django.db.models import Avg, F, OuterRef, Subquery
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
 
+from . import archive, audit, bootstrap, changefeed, distributions, emails, events, jobs, metrics, openapi, projections, rollups, search, sync, transcripts
+from .grade_import import GradeImporter, iter_rows, parse_grade
+from .student_import import StudentImporter
 
-from .models import Departement, Filiere, Module, Inscription, Note
+from .models import Departement, Filiere, Module, Inscription, Note, InvalidTransition, EnrollmentRollup, Deliberation, LeaderboardEntry, NoteAudit, Job, ArchivedYear, ArchivedInscription, ArchivedNote, ChangeFeedConsumer
 from .serializers import (
     DepartementSerializer, 
     FiliereSerializer, 
@@ -23,16 +37,28 @@ from .serializers import (
     InscriptionSerializer,
     InscriptionCreateSerializer,
     InscriptionValidateSerializer,
+    InscriptionBulkValidateSerializer,
      NoteSerializer,
     NoteCreateUpdateSerializer,
     StudentGradeSerializer,
+    DeliberationSerializer,
+    DeliberationRunSerializer,
+    DeliberationResultSerializer,
+    LeaderboardEntrySerializer,
+    NoteAuditSerializer,
+    JobSerializer,
+    JobCreateSerializer,
+    ArchivedYearSerializer,
+    ChangeEventSerializer,
+    ChangeFeedConsumerSerializer,
+    ChangeFeedAckSerializer,
 )
 
 User = get_user_model()
 # ============================================
 # CUSTOM PERMISSIONS (FIXED!)
 # ============================================
-class IsAdminOrReadOnly:
+class IsAdminOrReadOnly(BasePermission):
     """
     FIXED: Allow public read access, ADMIN can edit
     Anyone can GET, only ADMIN can POST/PUT/DELETE
@@ -46,16 +72,22 @@ class IsAdminOrReadOnly:
         return request.user and request.user.is_authenticated and request.user.role in ['ADMIN', 'DIRECTION']
 
 
-class IsAdminOnly:
+class IsAdminOnly(BasePermission):
     """Only authenticated ADMIN can access"""
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated and request.user.role == 'ADMIN'
 
 
+class IsAdminOrDirection(BasePermission):
+    """Only authenticated ADMIN or DIRECTION can access"""
+    def has_permission(self, request, view):
+        return request.user and request.user.is_authenticated and request.user.role in ['ADMIN', 'DIRECTION']
+
+
 # ============================================
 # DEPARTEMENT VIEWSET
 # ============================================
-class DepartementViewSet(viewsets.ModelViewSet):
+class DepartementViewSet(sync.DeltaSyncMixin, viewsets.ModelViewSet):
     queryset = Departement.objects.all()
     serializer_class = DepartementSerializer
     permission_classes = [IsAdminOrReadOnly]  # Public read, ADMIN write
@@ -74,7 +106,7 @@ class DepartementViewSet(viewsets.ModelViewSet):
 # ============================================
 # FILIERE VIEWSET
 # ============================================
-class FiliereViewSet(viewsets.ModelViewSet):
+class FiliereViewSet(sync.DeltaSyncMixin, viewsets.ModelViewSet):
     queryset = Filiere.objects.select_related('departement').all()
     permission_classes = [IsAdminOrReadOnly]  # Public read, ADMIN write
     
@@ -106,7 +138,7 @@ class FiliereViewSet(viewsets.ModelViewSet):
 # ============================================
 # MODULE VIEWSET
 # ============================================
-class ModuleViewSet(viewsets.ModelViewSet):
+class ModuleViewSet(sync.DeltaSyncMixin, viewsets.ModelViewSet):
     queryset = Module.objects.select_related('filiere', 'enseignant').all()
     serializer_class = ModuleSerializer
     permission_classes = [IsAdminOrReadOnly]  # Public read, ADMIN write
@@ -151,7 +183,7 @@ class ModuleViewSet(viewsets.ModelViewSet):
 # ============================================
 # INSCRIPTION VIEWSET (REQUIRES AUTH)
 # ============================================
-class InscriptionViewSet(viewsets.ModelViewSet):
+class InscriptionViewSet(sync.DeltaSyncMixin, viewsets.ModelViewSet):
     queryset = Inscription.objects.select_related(
         'student', 'filiere', 'validated_by'
     ).all()
@@ -162,6 +194,8 @@ class InscriptionViewSet(viewsets.ModelViewSet):
             return InscriptionCreateSerializer
         if self.action == 'validate':
             return InscriptionValidateSerializer
+        if self.action == 'bulk_validate':
+            return InscriptionBulkValidateSerializer
         return InscriptionSerializer
     
     def get_queryset(self):
@@ -188,6 +222,10 @@ class InscriptionViewSet(viewsets.ModelViewSet):
         
         return queryset
     
+    def list_data(self, queryset):
+        # Read-only projection from .values(), same output as InscriptionSerializer
+        return projections.inscriptions(queryset)
+    
     def perform_create(self, serializer):
         # Only ETUDIANT can create inscriptions
         if self.request.user.role != 'ETUDIANT':
@@ -196,6 +234,7 @@ class InscriptionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         serializer.save()
+        metrics.INSCRIPTIONS_CREATED.inc()
     
     @action(detail=True, methods=['post'], permission_classes=[IsAdminOnly])
     def validate(self, request, pk=None):
@@ -205,31 +244,151 @@ class InscriptionViewSet(viewsets.ModelViewSet):
         Body: {"status": "VALIDATED"} or {"status": "REJECTED", "rejection_reason": "..."}
         """
         inscription = self.get_object()
+        serializer = InscriptionValidateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         
-        # Check if already processed
-        if inscription.status != 'PENDING':
+        # Compare-and-set UPDATE (status + optional client-side version)
+        try:
+            inscription.transition(
+                serializer.validated_data['status'],
+                by=request.user,
+                rejection_reason=serializer.validated_data.get('rejection_reason', ''),
+                expected_version=serializer.validated_data.get('version'),
+            )
+        except InvalidTransition as exc:
             return Response(
-                {'error': f'Cette inscription est déjà {inscription.get_status_display()}.'},
-                status=status.HTTP_400_BAD_REQUEST
+                {'error': str(exc), 'current_status': exc.current_status, 'version': inscription.version},
+                status=status.HTTP_409_CONFLICT if exc.conflict else status.HTTP_400_BAD_REQUEST
             )
+        metrics.INSCRIPTIONS_PROCESSED.inc(status=inscription.status)
         
-        serializer = InscriptionValidateSerializer(data=request.data)
+        return Response(
+            InscriptionSerializer(inscription).data,
+            status=status.HTTP_200_OK
+        )
+    
+    BULK_BATCH_SIZE = 500
+    
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminOnly])
+    def bulk_validate(self, request):
+        """
+        ADMIN endpoint to validate/reject many pending inscriptions at once
+        POST /api/inscriptions/bulk_validate/
+        Body: {"ids": [1, 2, 3], "status": "VALIDATED"}
+           or {"filiere": 4, "academic_year": "2024-2025", "status": "REJECTED", "rejection_reason": "..."}
+        
+        One conditional UPDATE ... WHERE status='PENDING' per batch.
+        Outcome per id: VALIDATED, REJECTED, NOT_FOUND, ALREADY_<STATUS>, CAPACITY_REACHED
+        """
+        serializer = InscriptionBulkValidateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        new_status = data['status']
         
-        # Update inscription
-        inscription.status = serializer.validated_data['status']
-        inscription.validated_by = request.user
-        inscription.validation_date = timezone.now()
+        # Department scope: only inscriptions of the departments this admin manages
+        managed_depts = request.user.managed_departments.all()
+        candidates = Inscription.objects.filter(filiere__departement__in=managed_depts)
+        if 'ids' in data:
+            candidates = candidates.filter(id__in=data['ids'])
+        else:
+            candidates = candidates.filter(status='PENDING')
+            if 'filiere' in data:
+                candidates = candidates.filter(filiere_id=data['filiere'])
+            if 'academic_year' in data:
+                candidates = candidates.filter(academic_year=data['academic_year'])
         
-        if serializer.validated_data['status'] == 'REJECTED':
-            inscription.rejection_reason = serializer.validated_data.get('rejection_reason', '')
+        rows = list(candidates.order_by('created_at').values_list('id', 'status', 'filiere_id', 'academic_year', 'student_id'))
         
-        inscription.save()
+        outcomes = {}
+        if 'ids' in data:
+            found = {row[0] for row in rows}
+            for inscription_id in data['ids']:
+                if inscription_id not in found:
+                    outcomes[inscription_id] = 'NOT_FOUND'
         
-        return Response(
-            InscriptionSerializer(inscription).data,
-            status=status.HTTP_200_OK
+        pending = []
+        bucket_of = {}
+        student_of = {}
+        for inscription_id, current_status, filiere_id, academic_year, student_id in rows:
+            if current_status != 'PENDING':
+                outcomes[inscription_id] = f'ALREADY_{current_status}'
+            else:
+                pending.append(inscription_id)
+                bucket_of[inscription_id] = (filiere_id, academic_year)
+                student_of[inscription_id] = student_id
+        
+        now = timezone.now()
+        changes = Inscription.transition_changes(
+            new_status, request.user, data.get('rejection_reason', ''), now
         )
+        
+        departement_of = dict(
+            Filiere.objects.filter(id__in={f for f, _ in bucket_of.values()}).values_list('id', 'departement_id')
+        ) if pending else {}
+        
+        processed = 0
+        for start in range(0, len(pending), self.BULK_BATCH_SIZE):
+            batch = pending[start:start + self.BULK_BATCH_SIZE]
+            with transaction.atomic():
+                # Capacity per filiere and academic year (oldest requests first), allocated
+                # under a lock on the filiere rows held until this batch commits
+                if new_status == 'VALIDATED':
+                    seats = Filiere.available_seats({bucket_of[i] for i in batch})
+                    allowed = []
+                    for inscription_id in batch:
+                        if seats[bucket_of[inscription_id]] > 0:
+                            seats[bucket_of[inscription_id]] -= 1
+                            allowed.append(inscription_id)
+                        else:
+                            outcomes[inscription_id] = 'CAPACITY_REACHED'
+                    batch = allowed
+                updated = Inscription.objects.filter(id__in=batch, status='PENDING').update(**changes)
+                if updated == len(batch):
+                    won = batch
+                else:
+                    # Another admin processed some of them concurrently: keep only our rows
+                    won = set(Inscription.objects.filter(
+                        id__in=batch, validated_by=request.user, validation_date=now
+                    ).values_list('id', flat=True))
+                
+                students_by_bucket = {}
+                for inscription_id in batch:
+                    if inscription_id in won:
+                        outcomes[inscription_id] = new_status
+                        students_by_bucket.setdefault(bucket_of[inscription_id], []).append(student_of[inscription_id])
+                    else:
+                        outcomes[inscription_id] = 'ALREADY_PROCESSED'
+                
+                # Decision emails, change-feed events, rollup counts and pushed events
+                # commit (or roll back) together with the UPDATE of the batch
+                emails.send_inscription_confirmations(won, new_status, data.get('rejection_reason', ''))
+                changefeed.record_inscriptions(won)
+                for (filiere_id, academic_year), student_ids in students_by_bucket.items():
+                    rollups.record(new_status, filiere_id, academic_year, count=len(student_ids), when=now)
+                    # One pushed event per filiere/year instead of one per inscription
+                    events.publish(
+                        f'inscription.{new_status.lower()}',
+                        {
+                            'inscription_id': None, 'filiere_id': filiere_id, 'academic_year': academic_year,
+                            'count': len(student_ids), 'pending_delta': -len(student_ids),
+                        },
+                        departement_id=departement_of[filiere_id],
+                        student_ids=student_ids,
+                    )
+            processed += updated
+        
+        metrics.INSCRIPTIONS_PROCESSED.inc(processed, status=new_status)
+        
+        summary = {}
+        for outcome in outcomes.values():
+            summary[outcome] = summary.get(outcome, 0) + 1
+        
+        return Response({
+            'status': new_status,
+            'processed': processed,
+            'summary': summary,
+            'results': [{'id': i, 'outcome': o} for i, o in outcomes.items()],
+        }, status=status.HTTP_200_OK)
     
     @action(detail=False, methods=['get'])
     def my_inscriptions(self, request):
@@ -267,60 +426,15 @@ class InscriptionViewSet(viewsets.ModelViewSet):
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated]) # Ou AllowAny pour tester
 def dashboard_statistics(request):
-    
-    # 1. CHIFFRES DE BASE
-    total_students = User.objects.filter(role='ETUDIANT').count()
-    total_profs = User.objects.filter(role='ENSEIGNANT').count()
-    pending_count = Inscription.objects.filter(status='PENDING').count()
-    
-    # 2. CALCUL DU TAUX DE REMPLISSAGE (Occupancy)
-    # Somme de la capacité de toutes les filières
-    total_capacity = Filiere.objects.aggregate(Sum('capacity'))['capacity__sum'] or 1
-    # Nombre d'inscriptions validées (étudiants réellement assis en classe)
-    active_students = Inscription.objects.filter(status='VALIDATED').count()
-    
-    occupancy_rate = round((active_students / total_capacity) * 100, 1) if total_capacity > 0 else 0
-    
-    # 3. CALCUL DU TAUX D'ADMISSION (Selectivity)
-    total_applications = Inscription.objects.count() or 1
-    admission_rate = round((active_students / total_applications) * 100, 1)
-
-    # 4. CONSTRUCTION DE LA RÉPONSE
-    kpi_data = [
-        # Carte 1 : Volume Étudiants
-        {"label": "Total Étudiants", "value": total_students, "icon": "Users", "color": "blue"},
-        
-        # Carte 2 : Bottleneck (Urgence)
-        {"label": "Dossiers en Attente", "value": pending_count, "icon": "Clock", "color": "amber"},
-        
-        # Carte 3 : Performance (Nouveau !)
-        {"label": "Taux de Remplissage", "value": f"{occupancy_rate}%", "icon": "Maximize", "color": "emerald"},
-        
-        # Carte 4 : Sélectivité (Nouveau !)
-        {"label": "Taux d'Admission", "value": f"{admission_rate}%", "icon": "Filter", "color": "purple"},
-    ]
-
-    # ... (Garde le reste du code pour enrollment_trends et department_dist) ...
-    
-    # Reste du code inchangé pour les graphiques
-    trends_query = Inscription.objects.filter(status='VALIDATED').annotate(month=TruncMonth('validation_date')).values('month').annotate(count=Count('id')).order_by('month')
-    enrollment_trends = [{"name": item['month'].strftime('%b'), "count": item['count']} for item in trends_query if item['month']]
-    
-    dept_query = Inscription.objects.filter(status='VALIDATED').values('filiere__departement__name').annotate(value=Count('id'))
-    department_dist = [{"name": item['filiere__departement__name'], "value": item['value']} for item in dept_query]
-
-    return Response({
-        "kpi": kpi_data,
-        "enrollment_trends": enrollment_trends,
-        "department_dist": department_dist
-    })
+    # Same payload as the "dashboard" section of /api/bootstrap/
+    return Response(bootstrap.dashboard())
 
 
 
 # ============================================
 # CUSTOM PERMISSION FOR TEACHERS
 # ============================================
-class IsTeacherOnly:
+class IsTeacherOnly(BasePermission):
     """Only authenticated ENSEIGNANT can access"""
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated and request.user.role == 'ENSEIGNANT'
@@ -329,7 +443,13 @@ class IsTeacherOnly:
 # ============================================
 # NOTE VIEWSET (For Teachers)
 # ============================================
-class NoteViewSet(viewsets.ModelViewSet):
+class AuditPagination(PageNumberPagination):
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class NoteViewSet(sync.DeltaSyncMixin, viewsets.ModelViewSet):
     queryset = Note.objects.select_related('student', 'module', 'saisie_par').all()
     permission_classes = [IsAuthenticated]
     
@@ -354,42 +474,157 @@ class NoteViewSet(viewsets.ModelViewSet):
         # ADMIN/DIRECTION see all
         return queryset
     
+    def list_data(self, queryset):
+        # Read-only projection from .values(), same output as NoteSerializer
+        return projections.notes(queryset)
+    
     def perform_create(self, serializer):
         # Auto-assign saisie_par to current teacher
-        if self.request.user.role == 'ENSEIGNANT':
-            serializer.save(saisie_par=self.request.user)
-        else:
-            serializer.save()
+        # Grade, audit entry and change-feed event commit together
+        with transaction.atomic(), audit.capture(self.request.user, NoteAudit.SOURCE_API):
+            if self.request.user.role == 'ENSEIGNANT':
+                serializer.save(saisie_par=self.request.user)
+            else:
+                serializer.save()
+        metrics.NOTES_WRITTEN.inc(source='api')
     
     def perform_update(self, serializer):
         # Update saisie_par on modification
-        if self.request.user.role == 'ENSEIGNANT':
-            serializer.save(saisie_par=self.request.user)
+        with transaction.atomic(), audit.capture(self.request.user, NoteAudit.SOURCE_API):
+            if self.request.user.role == 'ENSEIGNANT':
+                serializer.save(saisie_par=self.request.user)
+            else:
+                serializer.save()
+        metrics.NOTES_WRITTEN.inc(source='api')
+    
+    def perform_destroy(self, instance):
+        with transaction.atomic(), audit.capture(self.request.user, NoteAudit.SOURCE_API):
+            instance.delete()
+    
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        """
+        Full change history of one grade (audit log)
+        GET /api/notes/{id}/history/
+        """
+        note = self.get_object()
+        entries = NoteAudit.objects.filter(note_id=note.id)
+        return Response({
+            'note_id': note.id,
+            'history': NoteAuditSerializer(entries, many=True).data,
+        })
+    
+    @action(detail=False, methods=['get'])
+    def audit_log(self, request):
+        """
+        Grade changes, newest first (paginated)
+        GET /api/notes/audit_log/               -> ENSEIGNANT: own changes
+        GET /api/notes/audit_log/?actor=7       -> ADMIN/DIRECTION: changes by a teacher
+        Optional: &note=42
+        """
+        if request.user.role == 'ENSEIGNANT':
+            queryset = NoteAudit.objects.filter(actor_id=request.user.id)
+        elif request.user.role in ['ADMIN', 'DIRECTION']:
+            queryset = NoteAudit.objects.all()
+            actor = request.query_params.get('actor')
+            if actor:
+                queryset = queryset.filter(actor_id=actor)
         else:
-            serializer.save()
+            return Response({'error': 'Accès non autorisé.'}, status=status.HTTP_403_FORBIDDEN)
+        
+        note = request.query_params.get('note')
+        if note:
+            queryset = queryset.filter(note_id=note)
+        
+        # Only this action is paginated: the note list keeps its plain response
+        paginator = AuditPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(NoteAuditSerializer(page, many=True).data)
     
+    @action(detail=False, methods=['get'])
+    def transcript(self, request):
+        """
+        Coefficient-weighted transcript (relevé de notes)
+        GET /api/notes/transcript/                      -> ETUDIANT: own transcript
+        GET /api/notes/transcript/?student_id=12        -> ADMIN/DIRECTION
+        Optional: &academic_year=2024-2025
+        """
+        if request.user.role == 'ETUDIANT':
+            student = request.user
+        elif request.user.role in ['ADMIN', 'DIRECTION']:
+            student_id = request.query_params.get('student_id')
+            if not student_id:
+                return Response({'error': 'student_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                student = User.objects.get(id=student_id, role='ETUDIANT')
+            except (User.DoesNotExist, ValueError):
+                return Response({'error': 'Étudiant introuvable.'}, status=status.HTTP_404_NOT_FOUND)
+        else:
+            return Response({'error': 'Accès non autorisé.'}, status=status.HTTP_403_FORBIDDEN)
+        
+        years = transcripts.get_transcript(student.id)
+        academic_year = request.query_params.get('academic_year')
+        if academic_year:
+            years = [y for y in years if y['academic_year'] == academic_year]
+        
+        return Response({
+            'student': {
+                'id': student.id,
+                'name': f"{student.last_name.upper()} {student.first_name}",
+                'cne': student.cne,
+            },
+            'years': years,
+        })
+
+    @action(detail=False, methods=['get'])
+    def distribution(self, request):
+        """
+        Histograms, percentiles, median and standard deviation of the grades
+        GET /api/notes/distribution/?module=12          -> ENSEIGNANT: own modules only
+        GET /api/notes/distribution/?filiere=3          -> ADMIN (own departments) / DIRECTION
+        GET /api/notes/distribution/?departement=1
+        Optional: &academic_year=2024-2025
+        """
+        user = request.user
+        if user.role not in ['ENSEIGNANT', 'ADMIN', 'DIRECTION']:
+            return Response({'error': 'Accès non autorisé.'}, status=status.HTTP_403_FORBIDDEN)
+
+        given = [scope for scope in distributions.SCOPES if request.query_params.get(scope)]
+        if len(given) != 1:
+            return Response(
+                {'error': f"Indiquez exactement un des paramètres: {', '.join(distributions.SCOPES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        scope = given[0]
+        try:
+            scope_id = int(request.query_params[scope])
+        except ValueError:
+            return Response({'error': f'{scope} doit être un identifiant.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if user.role == 'ENSEIGNANT':
+            allowed = scope == 'module' and Module.objects.filter(id=scope_id, enseignant=user).exists()
+        elif user.role == 'ADMIN':
+            departement = {
+                'module': Module.objects.filter(id=scope_id).values('filiere__departement_id'),
+                'filiere': Filiere.objects.filter(id=scope_id).values('departement_id'),
+                'departement': Departement.objects.filter(id=scope_id).values('id'),
+            }[scope]
+            allowed = user.managed_departments.filter(id__in=departement).exists()
+        else:
+            allowed = True
+        if not allowed:
+            return Response({'error': 'Accès non autorisé à ce périmètre.'}, status=status.HTTP_403_FORBIDDEN)
+
+        academic_year = request.query_params.get('academic_year') or None
+        return Response(distributions.get_distribution(scope, scope_id, academic_year))
+
     @action(detail=False, methods=['get'], permission_classes=[IsTeacherOnly])
     def my_modules(self, request):
         """
         TEACHER endpoint to get their assigned modules with student count
         GET /api/notes/my_modules/
         """
-        modules = Module.objects.filter(enseignant=request.user).annotate(
-            student_count=Count('filiere__inscriptions', filter=Q(filiere__inscriptions__status='VALIDATED'))
-        )
-        
-        data = []
-        for module in modules:
-            data.append({
-                'id': module.id,
-                'name': module.name,
-                'code': module.code,
-                'filiere': module.filiere.name,
-                'semestre': module.semestre,
-                'student_count': module.student_count,
-            })
-        
-        return Response(data)
+        return Response(bootstrap.teacher_modules(request.user))
     
     @action(detail=False, methods=['get'], permission_classes=[IsTeacherOnly])
     def students_by_module(self, request):
@@ -488,84 +723,686 @@ class NoteViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        updated_count = 0
+        if archive.is_archived(academic_year):
+            return Response(
+                {'error': f"L'année {academic_year} est archivée (lecture seule)."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Same 0-20 check as the grade import, nothing is written if a grade is invalid
+        errors = []
         for grade_data in grades:
-            student_id = grade_data.get('student_id')
-            note_controle = grade_data.get('note_controle')
-            note_examen = grade_data.get('note_examen')
-            
-            try:
-                student = User.objects.get(id=student_id, role='ETUDIANT')
+            for field in ('note_controle', 'note_examen'):
+                if grade_data.get(field) is not None:
+                    grade_data[field], error = parse_grade(str(grade_data[field]))
+                    if error:
+                        errors.append({'student_id': grade_data.get('student_id'), 'field': field, 'error': error})
+        if errors:
+            return Response({'error': 'Notes invalides', 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        updated_count = 0
+        # Students and stored notes read once; every note shares the loaded module,
+        # so its grading weight and filiere are resolved once for the request
+        student_ids = {
+            str(pk): pk for pk in User.objects.filter(
+                id__in=[g.get('student_id') for g in grades if str(g.get('student_id', '')).isdigit()], role='ETUDIANT'
+            ).values_list('id', flat=True)
+        }
+        notes = {
+            note.student_id: note for note in Note.objects.filter(
+                module=module, academic_year=academic_year, student_id__in=student_ids.values()
+            )
+        }
+        # One transaction, audit entries buffered and written in one INSERT
+        with transaction.atomic(), audit.capture(request.user, NoteAudit.SOURCE_BULK, batch=True), changefeed.collect():
+            for grade_data in grades:
+                student_id = student_ids.get(str(grade_data.get('student_id')))
+                if student_id is None:
+                    continue
                 
                 # Create or update note
-                note, created = Note.objects.update_or_create(
-                    student=student,
-                    module=module,
-                    academic_year=academic_year,
-                    defaults={
-                        'note_controle': note_controle,
-                        'note_examen': note_examen,
-                        'saisie_par': request.user
-                    }
-                )
+                note = notes.get(student_id)
+                if note is None:
+                    note = notes[student_id] = Note(student_id=student_id, academic_year=academic_year)
+                note.module = module
+                note.note_controle = grade_data.get('note_controle')
+                note.note_examen = grade_data.get('note_examen')
+                note.saisie_par = request.user
+                note.save()
                 updated_count += 1
-            except User.DoesNotExist:
-                continue
         
+        metrics.NOTES_WRITTEN.inc(updated_count, source='bulk')
         return Response({
             'success': True,
             'updated_count': updated_count,
             'message': f'{updated_count} notes mises à jour avec succès'
         })
+
+    @action(detail=False, methods=['post'], permission_classes=[IsTeacherOnly],
+            parser_classes=[MultiPartParser, FormParser])
+    def import_grades(self, request):
+        """
+        TEACHER endpoint to import a whole grade sheet (CSV or XLSX)
+        POST /api/notes/import_grades/   (multipart/form-data)
+        Fields: file, module_id, academic_year, dry_run (optional, "true" = validate only)
+        File columns: cne ; note_controle ; note_examen
+        """
+        upload = request.FILES.get('file')
+        module_id = request.data.get('module_id')
+        academic_year = request.data.get('academic_year')
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+
+        if not upload or not module_id or not academic_year:
+            return Response(
+                {'error': 'file, module_id and academic_year are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            module = Module.objects.get(id=module_id, enseignant=request.user)
+        except (Module.DoesNotExist, ValueError):
+            return Response(
+                {'error': 'Module not found or not assigned to you'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            importer = GradeImporter(module, academic_year, user=request.user, dry_run=dry_run)
+        except archive.ArchiveError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            report = importer.run(iter_rows(upload, upload.name))
+        except (ValueError, UnicodeDecodeError, zipfile.BadZipFile) as e:
+            return Response({'error': f'Fichier illisible: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(report)
+
+
+# ============================================
+# DELIBERATION VIEWSET (Jury de semestre)
+# ============================================
+class DeliberationViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = Deliberation.objects.select_related('filiere').all()
+    serializer_class = DeliberationSerializer
+    permission_classes = [IsAdminOrDirection]
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        
+        # ADMIN sees deliberations of their departments
+        if self.request.user.role == 'ADMIN':
+            managed_depts = self.request.user.managed_departments.all()
+            queryset = queryset.filter(filiere__departement__in=managed_depts)
+        
+        for param in ['filiere', 'semestre', 'academic_year']:
+            value = self.request.query_params.get(param)
+            if value:
+                queryset = queryset.filter(**{param: value})
+        
+        return queryset
+    
+    @action(detail=False, methods=['post'])
+    def run(self, request):
+        """
+        Run the deliberation of a whole filiere for one semester
+        POST /api/deliberations/run/
+        Body: {"filiere": 1, "semestre": 1, "academic_year": "2024-2025",
+               "passing_average": 10, "eliminatory_note": 5}
+        """
+        serializer = DeliberationRunSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        filiere = data['filiere']
+        if request.user.role == 'ADMIN' and not request.user.managed_departments.filter(id=filiere.departement_id).exists():
+            return Response(
+                {'error': "Cette filière n'appartient pas à votre département."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        # numpy is only needed here: imported on first use, not at worker start-up
+        from . import deliberation
+        
+        result = deliberation.deliberate(
+            filiere, data['semestre'], data['academic_year'],
+            passing=data['passing_average'], eliminatory=data['eliminatory_note'],
+            user=request.user,
+        )
+        return Response(DeliberationSerializer(result).data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['get'])
+    def results(self, request, pk=None):
+        """
+        GET /api/deliberations/{id}/results/?decision=AJOURNE
+        Per-student results ordered by rank
+        """
+        snapshot = self.get_object()
+        results = snapshot.results.select_related('student')
+        decision = request.query_params.get('decision')
+        if decision:
+            results = results.filter(decision=decision)
+        return Response({
+            'deliberation': DeliberationSerializer(snapshot).data,
+            'results': DeliberationResultSerializer(results, many=True).data,
+        })
+
+
+# ============================================
+# BACKGROUND JOB VIEWSET
+# ============================================
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Heavy operations (exports, cleanups, rebuilds) run by `manage.py run_jobs`
+    POST /api/jobs/ -> 202 {"id": ..., "status": "QUEUED"}, then poll GET /api/jobs/{id}/
+    """
+    queryset = Job.objects.select_related('created_by').all()
+    serializer_class = JobSerializer
+    permission_classes = [IsAdminOrDirection]
+    pagination_class = AuditPagination
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        
+        # ADMIN sees the jobs they started, DIRECTION sees everything
+        if self.request.user.role == 'ADMIN':
+            queryset = queryset.filter(created_by=self.request.user)
+        
+        for param in ['task', 'status']:
+            value = self.request.query_params.get(param)
+            if value:
+                queryset = queryset.filter(**{param: value})
+        
+        return queryset
+    
+    def create(self, request):
+        serializer = JobCreateSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        job = jobs.enqueue(serializer.validated_data['task'], serializer.validated_data['params'], user=request.user)
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+    
+    @action(detail=False, methods=['get'])
+    def tasks(self, request):
+        """GET /api/jobs/tasks/ - tasks that can be started from the API"""
+        return Response([
+            {'task': name, 'label': spec['label']}
+            for name, spec in sorted(jobs.TASKS.items()) if jobs.startable(name, request.user)
+        ])
+    
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """POST /api/jobs/{id}/cancel/ - immediate if queued, at the next progress step if running"""
+        job = self.get_object()
+        if job.status not in Job.ACTIVE_STATUSES:
+            return Response(
+                {'error': f"Cette tâche est déjà terminée ({job.get_status_display()})."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(JobSerializer(jobs.cancel(job)).data)
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """GET /api/jobs/{id}/download/ - file produced by the job (exports)"""
+        job = self.get_object()
+        filename = (job.result or {}).get('file') if job.status == 'SUCCEEDED' else None
+        path = jobs.output_file(filename) if filename else None
+        if path is None:
+            return Response({'error': "Aucun fichier disponible pour cette tâche."}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename)
+
+
+# ============================================
+# ARCHIVE VIEWSET (closed academic years, read-only)
+# ============================================
+class ArchiveViewSet(viewsets.GenericViewSet):
+    """
+    Years moved out of the hot tables by `manage.py archive_year` (core/archive.py)
+    GET /api/archives/                                        -> archived years
+    GET /api/archives/inscriptions/?academic_year=2021-2022   -> same rows as /api/inscriptions/
+    GET /api/archives/notes/?academic_year=2021-2022          -> same rows as /api/notes/
+    Same scoping per role as the live endpoints.
+    """
+    queryset = ArchivedYear.objects.select_related('archived_by').all()
+    serializer_class = ArchivedYearSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def list(self, request):
+        return Response(self.get_serializer(self.get_queryset(), many=True).data)
+    
+    def _filter_year(self, queryset):
+        academic_year = self.request.query_params.get('academic_year')
+        if academic_year:
+            queryset = queryset.filter(academic_year=academic_year)
+        return queryset
+    
+    @action(detail=False, methods=['get'])
+    def inscriptions(self, request):
+        queryset = ArchivedInscription.objects.all()
+        if request.user.role == 'ETUDIANT':
+            queryset = queryset.filter(student=request.user)
+        elif request.user.role == 'ADMIN':
+            queryset = queryset.filter(filiere__departement__in=request.user.managed_departments.all())
+        status_filter = request.query_params.get('status')
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        return Response(projections.inscriptions(self._filter_year(queryset)))
+    
+    @action(detail=False, methods=['get'])
+    def notes(self, request):
+        queryset = ArchivedNote.objects.all()
+        if request.user.role == 'ENSEIGNANT':
+            queryset = queryset.filter(module__enseignant=request.user)
+        elif request.user.role == 'ETUDIANT':
+            queryset = queryset.filter(student=request.user)
+        return Response(projections.notes(self._filter_year(queryset)))
+
+
+# ============================================
+# CHANGE FEED (downstream consumers, see core/changefeed.py)
+# ============================================
+class ChangeFeedViewSet(viewsets.GenericViewSet):
+    """
+    GET  /api/changes/?consumer=finance&limit=500&topic=inscription.validated,grade.published
+         -> events after the consumer's committed offset (or after ?after=<cursor>)
+    POST /api/changes/ack/ {"consumer": "finance", "position": <next_cursor>}
+    GET  /api/changes/consumers/
+    ADMIN only receives the events of their departments.
+    """
+    queryset = ChangeFeedConsumer.objects.select_related('owner').all()
+    serializer_class = ChangeFeedConsumerSerializer
+    permission_classes = [IsAdminOrDirection]
+    
+    def _departement_ids(self):
+        if self.request.user.role == 'ADMIN':
+            return list(self.request.user.managed_departments.values_list('id', flat=True))
+        return None
+    
+    def _check_owner(self, consumer):
+        if consumer.owner_id not in (None, self.request.user.id) and self.request.user.role != 'DIRECTION':
+            return Response({'error': f"Le consommateur {consumer.name} appartient à un autre utilisateur."}, status=status.HTTP_403_FORBIDDEN)
+        return None
+    
+    def list(self, request):
+        config = changefeed.get_config()
+        consumer = None
+        name = request.query_params.get('consumer')
+        if name:
+            consumer = ChangeFeedConsumer.objects.filter(name=name).first()
+            denied = consumer and self._check_owner(consumer)
+            if denied:
+                return denied
+        
+        try:
+            after = int(request.query_params.get('after', consumer.position if consumer else 0))
+            limit = min(int(request.query_params.get('limit', config['PAGE_SIZE'])), config['MAX_PAGE_SIZE'])
+        except ValueError:
+            return Response({'error': 'after et limit doivent être des entiers.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        topics = [t for t in request.query_params.get('topic', '').split(',') if t]
+        unknown = set(topics) - set(changefeed.TOPICS)
+        if unknown:
+            return Response({'error': f"Topics inconnus: {', '.join(sorted(unknown))}"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        events, next_cursor, has_more = changefeed.read(after, max(limit, 1), topics, self._departement_ids(), config)
+        return Response({
+            'consumer': name,
+            'after': after,
+            'next_cursor': next_cursor,
+            'has_more': has_more,
+            'events': ChangeEventSerializer(events, many=True).data,
+        })
+    
+    @action(detail=False, methods=['post'])
+    def ack(self, request):
+        """Commit the offset of a consumer (created on its first ack)"""
+        serializer = ChangeFeedAckSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        consumer, _ = ChangeFeedConsumer.objects.get_or_create(name=data['consumer'], defaults={'owner': request.user})
+        denied = self._check_owner(consumer)
+        if denied:
+            return denied
+        latest = changefeed.latest_position()
+        if data['position'] > latest:
+            return Response({'error': f"Position {data['position']} au-delà du dernier événement ({latest})."}, status=status.HTTP_400_BAD_REQUEST)
+        
+        changefeed.acknowledge(consumer, data['position'], reset=data['reset'])
+        return Response(self.get_serializer(consumer).data)
+    
+    @action(detail=False, methods=['get'])
+    def consumers(self, request):
+        queryset = self.get_queryset()
+        if request.user.role == 'ADMIN':
+            queryset = queryset.filter(owner=request.user)
+        latest = changefeed.latest_position()
+        return Response({
+            'latest': latest,
+            'consumers': self.get_serializer(queryset, many=True).data,
+        })
+
+
+# ============================================
+# RANKING VIEWSET (Leaderboard par filière)
+# ============================================
+class RankingPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class RankingViewSet(viewsets.GenericViewSet):
+    queryset = LeaderboardEntry.objects.select_related('student', 'filiere').all()
+    serializer_class = LeaderboardEntrySerializer
+    pagination_class = RankingPagination
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        
+        # ADMIN sees the rankings of their departments
+        if self.request.user.role == 'ADMIN':
+            managed_depts = self.request.user.managed_departments.all()
+            queryset = queryset.filter(filiere__departement__in=managed_depts)
+        
+        return queryset
     
+    def list(self, request):
+        """
+        GET /api/rankings/?filiere=1&academic_year=2024-2025&page=2&page_size=50
+        Dense ranks of one filiere, read in rank order from the leaderboard index
+        """
+        if request.user.role == 'ETUDIANT':
+            return Response({'error': 'Utilisez /api/rankings/student/.'}, status=status.HTTP_403_FORBIDDEN)
+        
+        filiere_id = request.query_params.get('filiere')
+        academic_year = request.query_params.get('academic_year')
+        if not filiere_id or not academic_year:
+            return Response(
+                {'error': 'filiere and academic_year are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        queryset = self.get_queryset().filter(
+            filiere_id=filiere_id, academic_year=academic_year
+        ).order_by('rank', 'student_id')
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+    
+    @action(detail=False, methods=['get'])
+    def student(self, request):
+        """
+        Rank of one student in each of their filieres (no re-sorting)
+        GET /api/rankings/student/                       -> ETUDIANT: own ranks
+        GET /api/rankings/student/?student_id=12         -> other roles
+        Optional: &filiere=1 &academic_year=2024-2025 &page_size=50
+        Returns rank, total students and the list page containing the student.
+        """
+        if request.user.role == 'ETUDIANT':
+            student_id = request.user.id
+        else:
+            student_id = request.query_params.get('student_id')
+            if not student_id:
+                return Response({'error': 'student_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        partition = LeaderboardEntry.objects.filter(
+            filiere=OuterRef('filiere'), academic_year=OuterRef('academic_year')
+        ).values('filiere')
+        entries = self.get_queryset().filter(student_id=student_id).annotate(
+            total=Subquery(partition.annotate(c=Count('id')).values('c')),
+            ahead=Subquery(partition.filter(rank__lt=OuterRef('rank')).annotate(c=Count('id')).values('c')),
+        )
+        for param in ['filiere', 'academic_year']:
+            value = request.query_params.get(param)
+            if value:
+                entries = entries.filter(**{param: value})
+        
+        try:
+            page_size = min(int(request.query_params.get('page_size', RankingPagination.page_size)), RankingPagination.max_page_size)
+        except ValueError:
+            page_size = RankingPagination.page_size
+        
+        data = []
+        for entry in entries:
+            item = self.get_serializer(entry).data
+            item['total'] = entry.total
+            item['page'] = (entry.ahead or 0) // page_size + 1
+            data.append(item)
+        return Response(data)
+
 
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
 def academic_performance(request):
-    # 1. Moyenne Générale de l'École
-    global_avg = Note.objects.aggregate(Avg('note_finale'))['note_finale__avg'] or 0
-    
-    # 2. Taux de Réussite (Notes >= 10)
-    total_notes = Note.objects.count() or 1
-    passing_notes = Note.objects.filter(note_finale__gte=10).count()
-    success_rate = round((passing_notes / total_notes) * 100, 1)
-
-    # 3. Performance par Filière (Pour le graphique)
-    # On groupe par Filière et on fait la moyenne des notes finales
-    perf_by_filiere = (
-        Note.objects
-        .values('module__filiere__name')
-        .annotate(moyenne=Avg('note_finale'))
-        .order_by('-moyenne')
-    )
+    # Same payload as the "performance" section of /api/bootstrap/
+    return Response(bootstrap.performance())
+
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def enrollment_trends(request):
+    """
+    GET /api/admin/enrollment_trends/?start=2024-09-01&end=2025-08-31&granularity=month
+        optional: &filiere=1 &departement=2 &academic_year=2024-2025
+    Created / validated / rejected inscriptions per period, read from the daily rollup
+    """
+    if request.user.role not in ['ADMIN', 'DIRECTION']:
+        return Response({'error': 'Accès réservé à l\'administration.'}, status=status.HTTP_403_FORBIDDEN)
+    
+    granularity = request.query_params.get('granularity', 'month')
+    if granularity not in rollups.GRANULARITIES:
+        return Response(
+            {'error': f"granularity doit être l'une de: {', '.join(rollups.GRANULARITIES)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
-    chart_data = [
-        {"name": item['module__filiere__name'], "value": round(item['moyenne'], 2)} 
-        for item in perf_by_filiere if item['module__filiere__name']
-    ]
-
-    # 4. Top 5 Étudiants (Majors de Promo)
-    # On calcule la moyenne de chaque étudiant
-    top_students = (
-        Note.objects
-        .values('student__first_name', 'student__last_name', 'module__filiere__name')
-        .annotate(general_avg=Avg('note_finale'))
-        .order_by('-general_avg')[:5] # Les 5 meilleurs
+    queryset = EnrollmentRollup.objects.all()
+    
+    # ADMIN only sees their departments
+    if request.user.role == 'ADMIN':
+        queryset = queryset.filter(filiere__departement__in=request.user.managed_departments.all())
+    
+    try:
+        start = request.query_params.get('start')
+        if start:
+            queryset = queryset.filter(date__gte=date.fromisoformat(start))
+        end = request.query_params.get('end')
+        if end:
+            queryset = queryset.filter(date__lte=date.fromisoformat(end))
+    except ValueError:
+        return Response({'error': 'Les dates doivent être au format YYYY-MM-DD.'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    filiere_id = request.query_params.get('filiere')
+    if filiere_id:
+        queryset = queryset.filter(filiere_id=filiere_id)
+    departement_id = request.query_params.get('departement')
+    if departement_id:
+        queryset = queryset.filter(filiere__departement_id=departement_id)
+    academic_year = request.query_params.get('academic_year')
+    if academic_year:
+        queryset = queryset.filter(academic_year=academic_year)
+    
+    return Response({
+        'granularity': granularity,
+        'series': rollups.trends(queryset, granularity),
+    })
+
+# ============================================
+# BULK STUDENT PROVISIONING
+# ============================================
+@api_view(['POST'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAdminOrDirection])
+@parser_classes([MultiPartParser, FormParser])
+def import_students(request):
+    """
+    POST /api/admin/import_students/   (multipart/form-data)
+    Fields: file, dry_run (optional, "true" = validate only), send_emails (optional, default true)
+    File columns: cne ; last_name ; first_name ; email [; password]
+    dry_run answers with the validation report; otherwise the accounts are
+    created by an import_students job: 202 + job, the report is its result.
+    """
+    upload = request.FILES.get('file')
+    if not upload:
+        return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+    dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+    send_emails = str(request.data.get('send_emails', 'true')).lower() in ('1', 'true', 'yes')
+
+    if dry_run:
+        try:
+            report = StudentImporter(dry_run=True).run(iter_rows(upload, upload.name))
+        except (ValueError, UnicodeDecodeError, zipfile.BadZipFile) as e:
+            return Response({'error': f'Fichier illisible: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report)
+
+    # Thousands of PBKDF2 hashes: done by a job worker, not in the request
+    path = jobs.save_upload(upload)
+    job = jobs.enqueue(
+        'import_students', {'path': path, 'filename': upload.name, 'send_emails': send_emails}, user=request.user
     )
+    return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
-    top_list = [
-        {
-            "name": f"{s['student__last_name'].upper()} {s['student__first_name']}",
-            "filiere": s['module__filiere__name'],
-            "average": round(s['general_avg'], 2)
-        }
-        for s in top_students
-    ]
 
+# ============================================
+# PAGE BOOTSTRAP (one request per page load)
+# ============================================
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def bootstrap_view(request):
+    """
+    GET /api/bootstrap/                                   -> every section of the user's role
+    GET /api/bootstrap/?include=dashboard,departements    -> only these sections
+    Sections per role: see core/bootstrap.py
+    """
+    include = request.query_params.get('include')
+    if include is not None:
+        include = {name.strip() for name in include.split(',') if name.strip()}
+        unknown = include - set(bootstrap.SECTIONS.get(request.user.role, ()))
+        if unknown:
+            return Response(
+                {'error': f"Sections inconnues pour ce rôle: {', '.join(sorted(unknown))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    return Response(bootstrap.build(request.user, include))
+
+
+# ============================================
+# SEARCH (FTS5 on SQLite, LIKE fallback elsewhere)
+# ============================================
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def search_view(request):
+    """
+    GET /api/search/?q=ben ali&type=user,module&page=1&page_size=20
+    Ranked prefix search over users (CNE, name, email), modules and filieres.
+    Students can only search modules and filieres.
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'Le paramètre q est requis.'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    allowed = set(search.KINDS)
+    if request.user.role == 'ETUDIANT':
+        allowed.discard(search.KIND_USER)
+    requested = request.query_params.get('type')
+    kinds = [k for k in (requested.split(',') if requested else search.KINDS) if k in allowed]
+    
+    try:
+        page = max(int(request.query_params.get('page', 1)), 1)
+        page_size = min(max(int(request.query_params.get('page_size', 20)), 1), 100)
+    except ValueError:
+        return Response({'error': 'page et page_size doivent être des entiers.'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    total, results = search.search(query, kinds=kinds, limit=page_size, offset=(page - 1) * page_size)
     return Response({
-        "global_average": round(global_avg, 2),
-        "success_rate": success_rate,
-        "chart_data": chart_data,
-        "top_students": top_list
-    })
\ No newline at end of file
+        'query': query,
+        'count': total,
+        'page': page,
+        'page_size': page_size,
+        'results': results,
+    })
+
+# ============================================
+# OPENAPI SCHEMA
+# ============================================
+def schema_view(request):
+    """
+    GET /api/schema/[?format=json]
+    Prebuilt OpenAPI schema (core/openapi.py), 304 when If-None-Match matches.
+    Plain Django view: DRF content negotiation would reject OpenAPI Accept headers.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponse(status=405, headers={'Allow': 'GET, HEAD'})
+    fmt = request.GET.get('format')
+    if fmt not in openapi.FORMATS:
+        fmt = 'json' if 'json' in request.headers.get('Accept', '') else 'yaml'
+    schema = openapi.load()[fmt]
+    headers = {'ETag': schema['etag'], 'Cache-Control': 'public, max-age=0, must-revalidate', 'Vary': 'Accept'}
+    if schema['etag'] in request.headers.get('If-None-Match', ''):
+        return HttpResponse(status=304, headers=headers)
+    return HttpResponse(schema['content'], content_type=openapi.FORMATS[fmt], headers=headers)
+
+
+# ============================================
+# METRICS ENDPOINT (Prometheus scrape target)
+# ============================================
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def metrics_view(request):
+    """
+    GET /metrics
+    Prometheus text exposition, merged across worker processes.
+    Restricted to METRICS_ALLOWED_IPS or the METRICS_TOKEN bearer (see metrics.scrape_allowed).
+    """
+    if not metrics.scrape_allowed(request):
+        return HttpResponse(status=403)
+    return HttpResponse(
+        metrics.REGISTRY.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+# ============================================
+# PUSHED EVENTS (Server-Sent Events)
+# ============================================
+def _stream_user(request):
+    """JWT from the Authorization header or ?token= (EventSource cannot set headers), else session"""
+    authenticator = JWTAuthentication()
+    header = authenticator.get_header(request)
+    raw_token = authenticator.get_raw_token(header) if header else request.GET.get('token')
+    if raw_token:
+        try:
+            return authenticator.get_user(authenticator.get_validated_token(raw_token))
+        except (InvalidToken, AuthenticationFailed):
+            return None
+    return request.user if request.user.is_authenticated else None
+
+
+async def event_stream(request):
+    """
+    GET /api/events/?token=<access>   (text/event-stream)
+    First event: snapshot ({"pending_count": n} for ADMIN/DIRECTION), then
+    inscription.created / inscription.validated / inscription.rejected /
+    grades.published deltas scoped to the user. "resync" asks the client to re-fetch.
+    Served without holding a thread under ASGI (see academiyahub/asgi.py).
+    """
+    user = await sync_to_async(_stream_user)(request)
+    if user is None:
+        return JsonResponse({'error': 'Authentification requise.'}, status=401)
+    
+    accept = await sync_to_async(events.audience)(user)
+    broker = events.get_broker()
+    asynchronous = isinstance(request, ASGIRequest)
+    # Subscribe before the snapshot so no event falls in between
+    subscription = broker.subscribe(accept, asynchronous=asynchronous)
+    initial_state = await sync_to_async(events.snapshot)(user)
+    
+    body = (events.astream if asynchronous else events.stream)(subscription, initial_state)
+    response = StreamingHttpResponse(body, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # disable proxy buffering (nginx)
+    return response
@@ -0,0 +1,145 @@
+"""
+Worker warm-up, run before a worker accepts traffic
+
+Without it the first requests of every new worker pay for lazy work:
+URL pattern compilation, serializer field maps (model _meta caches), the
+database backend (driver import, connection settings checked), translation
+catalogs and the OpenAPI schema.
+
+Called from wsgi.py / asgi.py when settings.WARMUP['ENABLED'] is true.
+Django connections are per thread: the warm-up connection is only reused
+when requests are served by the thread that ran the warm-up (WSGI worker,
+CONN_MAX_AGE > 0). Under ASGI each request runs in its own thread, so the
+warm-up runs in a helper thread and closes its connection when done. With
+`gunicorn --preload`, call warm_up() from the post_fork hook instead, so
+that the connection belongs to the worker.
+
+    python manage.py startup_profile    # measures the effect
+"""
+import asyncio
+import importlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'SERIALIZER_APPS': ('core', 'users'),
+    'PRELOAD': (),  # heavy modules imported lazily by views (e.g. 'core.deliberation' -> numpy)
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'WARMUP', {})}
+
+
+def _walk_patterns(patterns):
+    from django.urls import URLResolver
+
+    count = 0
+    for pattern in patterns:
+        pattern.pattern.regex  # compiled lazily on first access
+        count += 1
+        if isinstance(pattern, URLResolver):
+            count += _walk_patterns(pattern.url_patterns)
+    return count
+
+
+def _subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _subclasses(subclass)
+
+
+def warm_database():
+    """Open each connection of the current thread (import, settings, credentials, round trip)"""
+    from django.db import connections
+
+    for alias in connections:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+    return len(connections.all())
+
+
+def warm_urls():
+    from django.urls import get_resolver
+
+    resolver = get_resolver()
+    resolver.reverse_dict  # populates reverse/namespace dicts
+    return _walk_patterns(resolver.url_patterns)
+
+
+def warm_serializers(apps):
+    from rest_framework import serializers
+
+    count = 0
+    for cls in set(_subclasses(serializers.Serializer)):
+        if cls.__module__.split('.')[0] not in apps:
+            continue
+        try:
+            cls(context={}).fields
+            count += 1
+        except Exception:
+            logger.warning('Warm-up: %s.%s skipped', cls.__module__, cls.__name__, exc_info=True)
+    return count
+
+
+def warm_misc():
+    from django.utils import timezone, translation
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    from . import openapi
+
+    translation.activate(settings.LANGUAGE_CODE)
+    timezone.get_current_timezone()
+    JWTAuthentication()
+    openapi.load()
+
+
+def warm_up(config=None):
+    """Run every step, returns {step: milliseconds}; failures are logged, never raised"""
+    config = config or get_config()
+    steps = [
+        ('database', warm_database),
+        ('urls', warm_urls),
+        ('serializers', lambda: warm_serializers(config['SERIALIZER_APPS'])),
+        ('misc', warm_misc),
+        ('preload', lambda: [importlib.import_module(name) for name in config['PRELOAD']]),
+    ]
+    timings = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.warning('Warm-up step %s failed', name, exc_info=True)
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    logger.info('Worker warm-up: %s', timings)
+    return timings
+
+
+def run_on_startup():
+    if not get_config()['ENABLED']:
+        return None
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return warm_up()
+    # Imported from a running event loop (uvicorn): the ORM refuses sync calls there.
+    # The helper thread never serves a request: its connections are closed, not kept.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(_warm_up_and_close).result()
+
+
+def _warm_up_and_close():
+    from django.db import connections
+
+    try:
+        return warm_up()
+    finally:
+        connections.close_all()
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 
 class User(AbstractUser):
     # Roles Enum
@@ -18,5 +19,14 @@ class User(AbstractUser):
     # Governance: Who created this user? (Traceability)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Student lookups by CNE (grade import, bulk provisioning) and email (login)
+            models.Index(fields=['cne'], name='users_user_cne_idx'),
+            models.Index(fields=['email'], name='users_user_email_idx'),
+            # Case-insensitive duplicate checks (bulk provisioning)
+            models.Index(Lower('email'), name='users_user_email_lower_idx'),
+        ]
+
     def __str__(self):
         return f"{self.username} ({self.role})"
\ No newline at end of file
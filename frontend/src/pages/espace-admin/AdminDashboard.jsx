@@ -1,10 +1,11 @@
-import { useQuery } from "@tanstack/react-query";
+import { useEffect } from "react";
+import { useQuery, useQueryClient } from "@tanstack/react-query";
 import {
     BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer,
     PieChart, Pie, Cell
 } from 'recharts';
 import { Users, BookOpen, GraduationCap, TrendingUp, Loader2, AlertCircle } from "lucide-react";
-import api from "../../services/api"; 
+import api, { eventsAPI } from "../../services/api"; 
 
 const COLORS = ['#2563eb', '#f59e0b', '#10b981', '#ef4444', '#8b5cf6'];
 
@@ -20,6 +21,22 @@ export default function AdminDashboard() {
         retry: 1
     });
 
+    // Live updates: patch the pending counter, re-fetch only when rates change
+    const queryClient = useQueryClient();
+    useEffect(() => {
+        const updatePending = ({ pending_delta }) => queryClient.setQueryData(['adminDashboard'], (old) => old && ({
+            ...old,
+            kpi: old.kpi.map((k) => k.icon === 'Clock' ? { ...k, value: k.value + pending_delta } : k)
+        }));
+        const refetch = () => queryClient.invalidateQueries({ queryKey: ['adminDashboard'] });
+        return eventsAPI.subscribe({
+            'inscription.created': updatePending,
+            'inscription.validated': refetch,
+            'inscription.rejected': refetch,
+            resync: refetch,
+        });
+    }, [queryClient]);
+
     // 2. LOADING STATE
     if (isLoading) {
         return (
@@ -1,10 +1,10 @@
 import { useState, useMemo } from 'react';
-import { useQuery } from "@tanstack/react-query";
+import { useQuery, useQueryClient } from "@tanstack/react-query";
 import { 
     FileSpreadsheet, FileText, Search, Printer, 
     Filter, Loader2, AlertCircle, Building2, BookOpen 
 } from "lucide-react";
-import api from "../../services/api";
+import { syncAPI } from "../../services/api";
 
 // --- ROBUST PDF IMPORTS ---
 import jsPDF from "jspdf";
@@ -20,12 +20,12 @@ export default function Rapports() {
     const [selectedYear, setSelectedYear] = useState("ALL");
 
     // --- 2. FETCH DATA ---
+    // Refetches only the inscriptions changed since the last load (delta sync)
+    const queryClient = useQueryClient();
     const { data: inscriptions = [], isLoading } = useQuery({
         queryKey: ['allInscriptions'],
-        queryFn: async () => {
-            const res = await api.get('/inscriptions/');
-            return res.data;
-        }
+        queryFn: ({ queryKey }) => syncAPI.fetch('/inscriptions/', queryClient.getQueryData(queryKey)),
+        select: (data) => data.rows
     });
 
     // --- 3. DYNAMIC DROPDOWNS ---
@@ -1,4 +1,5 @@
-import { useQuery } from "@tanstack/react-query";
+import { useEffect } from "react";
+import { useQuery, useQueryClient } from "@tanstack/react-query";
 import { 
     BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, 
     PieChart, Pie, Cell, Legend 
@@ -8,7 +9,7 @@ import {
     TrendingUp, Activity, AlertCircle, Loader2, Clock,
     Maximize, Filter as FilterIcon 
 } from "lucide-react";
-import api from "../../services/api"; // Ensure this path matches your project structure
+import api, { eventsAPI } from "../../services/api"; // Ensure this path matches your project structure
 
 const COLORS = ['#0ea5e9', '#22c55e', '#eab308', '#ef4444', '#8b5cf6'];
 
@@ -23,6 +24,22 @@ export default function Stats() {
         }
     });
 
+    // Live updates: patch the pending counter, re-fetch only when rates change
+    const queryClient = useQueryClient();
+    useEffect(() => {
+        const updatePending = ({ pending_delta }) => queryClient.setQueryData(['directionStats'], (old) => old && ({
+            ...old,
+            kpi: old.kpi.map((k) => k.icon === 'Clock' ? { ...k, value: k.value + pending_delta } : k)
+        }));
+        const refetch = () => queryClient.invalidateQueries({ queryKey: ['directionStats'] });
+        return eventsAPI.subscribe({
+            'inscription.created': updatePending,
+            'inscription.validated': refetch,
+            'inscription.rejected': refetch,
+            resync: refetch,
+        });
+    }, [queryClient]);
+
     if (isLoading) return <LoadingState />;
     if (isError) return <ErrorState />;
 
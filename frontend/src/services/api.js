@@ -334,6 +334,22 @@ export const inscriptionAPI = {
     return response.data;
   },
 
+  /**
+   * Validate or reject many pending inscriptions at once (ADMIN only)
+   * @param {number[]} ids - Inscription IDs
+   * @param {string} status - 'VALIDATED' or 'REJECTED'
+   * @param {string} rejection_reason - Required if status is REJECTED
+   * @returns {Promise<{processed: number, summary: Object, results: Array<{id, outcome}>}>}
+   */
+  bulkValidate: async (ids, status, rejection_reason = '') => {
+    const response = await api.post('/inscriptions/bulk_validate/', {
+      ids,
+      status,
+      rejection_reason,
+    });
+    return response.data;
+  },
+
   /**
    * Update inscription
    */
@@ -374,6 +390,15 @@ export const statsAPI = {
       };
     }
   },
+
+  /**
+   * Get enrollment trends from the daily rollup (ADMIN/DIRECTION)
+   * @param {Object} params - {start, end, granularity: 'day'|'week'|'month'|'year', filiere, departement, academic_year}
+   */
+  getEnrollmentTrends: async (params = {}) => {
+    const response = await api.get('/admin/enrollment_trends/', { params });
+    return response.data;
+  },
 };
 
 // ============================================
@@ -477,6 +502,32 @@ export const noteAPI = {
     return response.data;
   },
 
+  /**
+   * Change history of a note (audit log)
+   */
+  getHistory: async (id) => {
+    const response = await api.get(`/notes/${id}/history/`);
+    return response.data;
+  },
+
+  /**
+   * Grade changes (teacher: own changes; admin: filter by actor)
+   * @param {Object} params - {actor, note, page, page_size}
+   */
+  getAuditLog: async (params = {}) => {
+    const response = await api.get('/notes/audit_log/', { params });
+    return response.data;
+  },
+
+  /**
+   * Histograms, percentiles, median and std deviation of the grades
+   * @param {Object} params - one of {module, filiere, departement} + optional academic_year
+   */
+  getDistribution: async (params) => {
+    const response = await api.get('/notes/distribution/', { params });
+    return response.data;
+  },
+
   // ===== TEACHER-SPECIFIC ENDPOINTS =====
 
   /**
@@ -514,6 +565,178 @@ export const noteAPI = {
     });
     return response.data;
   },
+
+  /**
+   * Import a grade sheet (CSV or XLSX: cne ; note_controle ; note_examen)
+   * @param {number} moduleId
+   * @param {string} academicYear
+   * @param {File} file
+   * @param {boolean} dryRun - validate only
+   */
+  importGrades: async (moduleId, academicYear, file, dryRun = false) => {
+    const formData = new FormData();
+    formData.append('file', file);
+    formData.append('module_id', moduleId);
+    formData.append('academic_year', academicYear);
+    formData.append('dry_run', dryRun);
+    const response = await api.post('/notes/import_grades/', formData, {
+      headers: { 'Content-Type': 'multipart/form-data' }
+    });
+    return response.data;
+  },
+};
+
+// ============================================
+// PUSHED EVENTS (Server-Sent Events)
+// ============================================
+export const eventsAPI = {
+  /**
+   * Subscribe to server-pushed events (scoped to the logged-in user)
+   * @param {Object} handlers - {snapshot, 'inscription.created', 'inscription.validated',
+   *                             'inscription.rejected', 'grades.published', resync}
+   * @returns {Function} unsubscribe
+   */
+  subscribe: (handlers) => {
+    // EventSource cannot send headers: the access token goes in the query string
+    const token = localStorage.getItem('access_token') || '';
+    const source = new EventSource(`${BASE_URL}/events/?token=${encodeURIComponent(token)}`);
+    Object.entries(handlers).forEach(([type, handler]) => {
+      source.addEventListener(type, (event) => handler(JSON.parse(event.data)));
+    });
+    return () => source.close();
+  },
+};
+
+// ============================================
+// BACKGROUND JOBS (exports, cleanups, rebuilds)
+// ============================================
+export const jobAPI = {
+  /**
+   * Start a background job, returns the queued job (poll get() for progress)
+   * @param {string} task - e.g. 'export_inscriptions'
+   * @param {Object} params - e.g. {status: 'PENDING', filiere: 1}
+   */
+  start: async (task, params = {}) => {
+    const response = await api.post('/jobs/', { task, params });
+    return response.data;
+  },
+
+  getAll: async (params = {}) => {
+    const response = await api.get('/jobs/', { params });
+    return response.data;
+  },
+
+  get: async (id) => {
+    const response = await api.get(`/jobs/${id}/`);
+    return response.data;
+  },
+
+  getTasks: async () => {
+    const response = await api.get('/jobs/tasks/');
+    return response.data;
+  },
+
+  cancel: async (id) => {
+    const response = await api.post(`/jobs/${id}/cancel/`);
+    return response.data;
+  },
+
+  /**
+   * Download the file produced by a finished job (CSV export)
+   */
+  download: async (id) => {
+    const response = await api.get(`/jobs/${id}/download/`, { responseType: 'blob' });
+    return response.data;
+  },
+};
+
+
+// ============================================
+// PAGE BOOTSTRAP (one request per page load)
+// ============================================
+export const bootstrapAPI = {
+  /**
+   * Everything the current user's page needs (sections depend on the role)
+   * @param {string[]} include - optional subset, e.g. ['dashboard', 'filieres']
+   */
+  get: async (include = null) => {
+    const params = include ? { include: include.join(',') } : {};
+    const response = await api.get('/bootstrap/', { params });
+    return response.data;
+  },
+};
+
+// ============================================
+// DELTA SYNC (?updated_since= on list endpoints)
+// ============================================
+export const syncAPI = {
+  /**
+   * Local copy of a list endpoint, refreshed with only what changed
+   * @param {string} path - e.g. '/inscriptions/'
+   * @param {{rows: Array, watermark: string}|null} previous - result of the last call
+   * @returns {{rows: Array, watermark: string}}
+   */
+  fetch: async (path, previous = null) => {
+    if (previous?.watermark) {
+      try {
+        const { data } = await api.get(path, { params: { updated_since: previous.watermark } });
+        const byId = new Map(previous.rows.map((row) => [row.id, row]));
+        data.deleted.forEach((id) => byId.delete(id));
+        const added = [];
+        data.results.forEach((row) => (byId.has(row.id) ? byId.set(row.id, row) : added.push(row)));
+        // Deltas are oldest first: new rows go on top, like the full list
+        return { rows: [...added.reverse(), ...byId.values()], watermark: data.watermark };
+      } catch (error) {
+        // 410: watermark older than the tombstone retention, full resync below
+        if (error.response?.status !== 410) throw error;
+      }
+    }
+    const response = await api.get(path);
+    return { rows: response.data, watermark: response.headers['x-sync-watermark'] };
+  },
+};
+
+// ============================================
+// ARCHIVED ACADEMIC YEARS (read-only)
+// ============================================
+export const archiveAPI = {
+  getYears: async () => {
+    const response = await api.get('/archives/');
+    return response.data;
+  },
+
+  getInscriptions: async (academicYear, filters = {}) => {
+    const response = await api.get('/archives/inscriptions/', { params: { academic_year: academicYear, ...filters } });
+    return response.data;
+  },
+
+  getNotes: async (academicYear) => {
+    const response = await api.get('/archives/notes/', { params: { academic_year: academicYear } });
+    return response.data;
+  },
+};
+
+// ============================================
+// BULK STUDENT PROVISIONING
+// ============================================
+export const studentImportAPI = {
+  /**
+   * Import student accounts (CSV or XLSX: cne ; last_name ; first_name ; email [; password])
+   * dryRun: validation report; otherwise 202 + job (poll jobAPI.get(id), report in job.result)
+   * @param {File} file
+   * @param {boolean} dryRun
+   * @param {boolean} sendEmails - queue the welcome emails
+   */
+  upload: async (file, dryRun = false, sendEmails = true) => {
+    const formData = new FormData();
+    formData.append('file', file);
+    formData.append('dry_run', dryRun);
+    formData.append('send_emails', sendEmails);
+    const response = await api.post('/admin/import_students/', formData, {
+      headers: { 'Content-Type': 'multipart/form-data' }
+    });
+    return response.data;
+  },
 };
 
 